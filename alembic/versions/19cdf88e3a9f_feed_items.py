@@ -0,0 +1,54 @@
+"""Materialized per-user feed, filled on write.
+
+Revision ID: 19cdf88e3a9f
+Revises: 6d1f0c3a9e47
+Create Date: 2026-10-18 11:26:07.540913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "19cdf88e3a9f"
+down_revision: Union[str, None] = "6d1f0c3a9e47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feed_items",
+        sa.Column("user_id", postgresql.UUID(), nullable=False),
+        sa.Column("article_id", postgresql.UUID(), nullable=False),
+        # copy of articles.created_date, so the feed is read from one index
+        sa.Column("created_date", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["article_id"], ["articles.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "article_id"),
+    )
+    op.create_index(
+        "ix_feed_items_user_id_created_date_article_id",
+        "feed_items",
+        ["user_id", "created_date", "article_id"],
+    )
+
+    op.execute(
+        """
+        INSERT INTO feed_items (user_id, article_id, created_date)
+        SELECT uf.user_id, a.id, a.created_date
+        FROM user_follows uf
+        JOIN articles a ON a.author_user_id = uf.following_user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_feed_items_user_id_created_date_article_id", table_name="feed_items"
+    )
+    op.drop_table("feed_items")
@@ -0,0 +1,30 @@
+"""Index articles by (created_date, id) for keyset pagination.
+
+Revision ID: 2baf61e9cdf9
+Revises: aaddef142d08
+Create Date: 2026-10-18 09:12:31.412087
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2baf61e9cdf9"
+down_revision: Union[str, None] = "aaddef142d08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_articles_created_date_id",
+        "articles",
+        ["created_date", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_articles_created_date_id", table_name="articles")
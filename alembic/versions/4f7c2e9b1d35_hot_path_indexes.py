@@ -0,0 +1,65 @@
+"""Index the foreign keys and orderings of the hot query paths.
+
+articles(created_date) is already served by ix_articles_created_date_id. The
+second column of each index lets its queries read the order (or the joined id)
+from the index as well.
+
+Revision ID: 4f7c2e9b1d35
+Revises: 19cdf88e3a9f
+Create Date: 2026-10-18 14:02:44.905316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f7c2e9b1d35"
+down_revision: Union[str, None] = "19cdf88e3a9f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # author filter and the SQL feed, newest first
+    (
+        "ix_articles_author_user_id_created_date_id",
+        "articles",
+        ["author_user_id", "created_date", "id"],
+    ),
+    # tag lists of a page of articles
+    ("ix_article_tags_article_id_tag_id", "article_tags", ["article_id", "tag_id"]),
+    # followers of an author, fan-out walks them by user_id
+    (
+        "ix_user_follows_following_user_id_user_id",
+        "user_follows",
+        ["following_user_id", "user_id"],
+    ),
+    # comments of an article, oldest first
+    (
+        "ix_article_comments_article_id_created_date",
+        "article_comments",
+        ["article_id", "created_date"],
+    ),
+    # favorited-by filter
+    (
+        "ix_article_favorites_user_id_article_id",
+        "article_favorites",
+        ["user_id", "article_id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY doesn't block writes to the tables while the indexes are built,
+    # but can't run inside the migration's transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
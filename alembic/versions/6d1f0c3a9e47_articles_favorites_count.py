@@ -0,0 +1,49 @@
+"""Denormalize the article favorites count onto articles.
+
+Revision ID: 6d1f0c3a9e47
+Revises: 2baf61e9cdf9
+Create Date: 2026-10-18 10:03:52.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6d1f0c3a9e47"
+down_revision: Union[str, None] = "2baf61e9cdf9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "articles",
+        sa.Column(
+            "favorites_count",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+    )
+
+    # backfill, later drift is fixed with `flask repair-favorites-count`
+    op.execute(
+        """
+        UPDATE articles a
+        SET favorites_count = f.favorites_count
+        FROM (
+            SELECT article_id, COUNT(*) AS favorites_count
+            FROM article_favorites
+            GROUP BY article_id
+        ) f
+        WHERE a.id = f.article_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("articles", "favorites_count")
@@ -0,0 +1,219 @@
+"""
+Serve a Flask app from an ASGI server, awaiting `async def` views on the server's
+event loop instead of holding a worker thread for each request in flight.
+"""
+
+import sys
+import asyncio
+import inspect
+import threading
+import typing as typ
+from io import BytesIO
+import collections.abc as cabc
+from flask import Flask, Response, request_started
+from flask.globals import _cv_app, _cv_request
+
+ASGIScope = typ.Dict[str, typ.Any]
+ASGIReceive = typ.Callable[[], typ.Awaitable[dict]]
+ASGISend = typ.Callable[[dict], typ.Awaitable[None]]
+
+
+def _environ_from_scope(scope: ASGIScope, body: bytes) -> dict:
+    """The WSGI environ of an HTTP request, for Flask's request context."""
+    root_path, path = scope.get("root_path", ""), scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        # WSGI carries the raw bytes of the path, as latin-1
+        "SCRIPT_NAME": root_path.encode().decode("latin-1"),
+        "PATH_INFO": path.encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ["SERVER_NAME"], environ["SERVER_PORT"] = server_name, str(server_port)
+    if client := scope.get("client"):
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = client[0], str(client[1])
+
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # the body is read whole, chunked requests (without a Content-Length) included,
+    # and Werkzeug reads a chunked one only to the end of an input marked terminated
+    environ["CONTENT_LENGTH"] = str(len(body))
+    environ["wsgi.input_terminated"] = True
+    return environ
+
+
+async def _read_request_body(receive: ASGIReceive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+async def _iter_response_body(
+    response: Response, environ: dict
+) -> typ.AsyncIterator[bytes]:
+    body = response.response
+    if not isinstance(body, cabc.AsyncIterable):
+        # leaves out the body of HEAD, 204 and 304 responses, and encodes str chunks
+        for chunk in response.get_app_iter(environ):
+            yield chunk
+        return
+
+    try:
+        if environ["REQUEST_METHOD"] != "HEAD" and response.status_code not in (
+            204,
+            304,
+        ):
+            async for chunk in body:
+                yield chunk.encode() if isinstance(chunk, str) else chunk
+    finally:
+        # e.g. return the connection a streaming view reads from when the client left
+        if isinstance(body, cabc.AsyncGenerator):
+            await body.aclose()
+
+
+async def _read_response_body(response: Response, environ: dict) -> typ.List[bytes]:
+    return [chunk async for chunk in _iter_response_body(response, environ)]
+
+
+class AsyncFlask(Flask):
+    """
+    A Flask app whose views may be coroutines, served by `asgi_app`. Requests push
+    the usual contexts and run the usual hooks and error handlers, only async
+    views are awaited on the event loop (plain views still block it while they
+    run). Responses may stream async iterables.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shutdown_funcs: typ.List[typ.Callable[[], typ.Awaitable[None]]] = []
+        self._loop: typ.Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def ensure_sync(self, func: typ.Callable) -> typ.Callable:
+        # async views return coroutines, awaited by `full_dispatch_request_async`
+        return func
+
+    def on_shutdown(self, func: typ.Callable[[], typ.Awaitable[None]]):
+        """Await `func` when the ASGI server shuts down, e.g. to close pools."""
+        self.shutdown_funcs.append(func)
+        return func
+
+    async def full_dispatch_request_async(self) -> Response:
+        """`full_dispatch_request`, awaiting async views."""
+        self._got_first_request = True
+        try:
+            request_started.send(self, _async_wrapper=self.ensure_sync)
+            rv = self.preprocess_request()
+            if rv is None:
+                rv = self.dispatch_request()
+                if inspect.isawaitable(rv):
+                    rv = await rv
+        except Exception as e:
+            rv = self.handle_user_exception(e)
+        return self.finalize_request(rv)
+
+    async def handle_request(self, environ: dict) -> Response:
+        """`wsgi_app` up to the response, its body is left to the caller to send."""
+        ctx = self.request_context(environ)
+        error: typ.Optional[BaseException] = None
+        try:
+            try:
+                ctx.push()
+                return await self.full_dispatch_request_async()
+            except Exception as e:
+                error = e
+                return self.handle_exception(e)
+            except:  # noqa: E722
+                error = sys.exc_info()[1]
+                raise
+        finally:
+            if "werkzeug.debug.preserve_context" in environ:
+                environ["werkzeug.debug.preserve_context"](_cv_app.get())
+                environ["werkzeug.debug.preserve_context"](_cv_request.get())
+
+            if error is not None and self.should_ignore_error(error):
+                error = None
+
+            ctx.pop(error)
+
+    async def asgi_app(self, scope: ASGIScope, receive: ASGIReceive, send: ASGISend):
+        """The ASGI application, e.g. for `uvicorn realworld.asgi:asgi_app`."""
+        if scope["type"] == "lifespan":
+            return await self._handle_lifespan(receive, send)
+        if scope["type"] != "http":
+            raise NotImplementedError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        environ = _environ_from_scope(scope, await _read_request_body(receive))
+        response = await self.handle_request(environ)
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in response.get_wsgi_headers(
+                            environ
+                        ).to_wsgi_list()
+                    ],
+                }
+            )
+            async for chunk in _iter_response_body(response, environ):
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            response.close()
+
+    async def _handle_lifespan(self, receive: ASGIReceive, send: ASGISend):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for func in self.shutdown_funcs:
+                    await func()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _run(self, coro: typ.Awaitable):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="asgi-loop", daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def wsgi_app(self, environ: dict, start_response: typ.Callable):
+        """
+        WSGI requests (e.g. of the test client) go through the same async dispatch,
+        on an event loop of the app's own, with streamed bodies read to the end.
+        """
+        response = self._run(self.handle_request(environ))
+        if isinstance(response.response, cabc.AsyncIterable):
+            response.response = self._run(_read_response_body(response, environ))
+        return response(environ, start_response)
@@ -0,0 +1,182 @@
+"""
+`realworld.api.core.db` for the ASGI app (`realworld.asgi`): the same pool settings,
+read-only connections, replica routing and after-commit callbacks, on asyncpg
+connections that wait for Postgres without holding a thread.
+
+Handlers stay synchronous functions of a `Connection`, and run on the async
+connections through `AsyncConnection.run_sync`.
+"""
+
+import time
+import logging
+import itertools
+import typing as typ
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.interfaces import BindTyping
+from contextlib import AsyncExitStack, asynccontextmanager
+from flask import has_request_context
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+import realworld.api.core.db as db
+from realworld.api.core.auth import get_user_id_from_token
+
+T = typ.TypeVar("T")
+
+# async engine per engine of `db`, sharing its URL and pool settings
+_ASYNC_ENGINES: typ.Dict[Engine, AsyncEngine] = {}
+
+logger = logging.getLogger(__name__)
+
+
+def _register_codecs(dbapi_connection, _):
+    # psycopg2 hands uuids to the handlers as strings, asyncpg would decode them
+    dbapi_connection.run_async(
+        lambda conn: conn.set_type_codec(
+            "uuid", encoder=str, decoder=str, schema="pg_catalog", format="text"
+        )
+    )
+
+
+def _get_async_engine(engine: Engine) -> AsyncEngine:
+    if engine not in _ASYNC_ENGINES:
+        async_engine = create_async_engine(
+            engine.url.set(drivername="postgresql+asyncpg"),
+            **db._POOL_OPTIONS,
+            connect_args={
+                "server_settings": {
+                    "application_name": db.DB_APPLICATION_NAME,
+                    "statement_timeout": str(db.DB_STATEMENT_TIMEOUT),
+                }
+            },
+        )
+        # the queries leave parameter types to Postgres, as with psycopg2 (which
+        # sends literals), rather than comparing uuid columns with `$1::VARCHAR`
+        async_engine.sync_engine.dialect.bind_typing = BindTyping.NONE
+        event.listen(async_engine.sync_engine, "connect", _register_codecs)
+        _ASYNC_ENGINES[engine] = async_engine
+    return _ASYNC_ENGINES[engine]
+
+
+def pool_stats() -> typ.Dict[str, typ.Any]:
+    """`db.pool_stats` of the async pools."""
+    return {
+        **db._engine_pool_stats(_get_async_engine(db._ENGINE).sync_engine),
+        "checkouts": db._CHECKOUT_STATS.checkouts,
+        "checkout_wait_ms_avg": round(
+            db._CHECKOUT_STATS.wait_ms_total / max(db._CHECKOUT_STATS.checkouts, 1), 3
+        ),
+        "checkout_wait_ms_max": round(db._CHECKOUT_STATS.wait_ms_max, 3),
+        "replicas": [
+            db._engine_pool_stats(_get_async_engine(engine).sync_engine)
+            for engine in db._REPLICA_ENGINES
+        ],
+    }
+
+
+async def dispose_engines():
+    """Close the pooled connections, before the event loop they belong to stops."""
+    for async_engine in _ASYNC_ENGINES.values():
+        await async_engine.dispose()
+
+
+@asynccontextmanager
+async def _connect(
+    read_only: bool = False, engine: typ.Optional[Engine] = None
+) -> typ.AsyncIterator[AsyncConnection]:
+    """`db._connect` on the async twin of `engine` (the primary by default)."""
+    start = time.perf_counter()
+    async with _get_async_engine(engine or db._ENGINE).connect() as conn:
+        db._CHECKOUT_STATS.record((time.perf_counter() - start) * 1000)
+        if read_only:
+            yield await conn.execution_options(isolation_level="AUTOCOMMIT")
+        else:
+            async with conn.begin():
+                yield conn
+
+
+async def _connect_to_replica(
+    stack: AsyncExitStack, min_lsn: typ.Optional[str]
+) -> typ.Optional[AsyncConnection]:
+    replica = db._pick_replica()
+    async with AsyncExitStack() as replica_stack:
+        try:
+            conn = await replica_stack.enter_async_context(_connect(True, replica))
+            replayed = min_lsn is None or await conn.run_sync(db._has_replayed, min_lsn)
+        except db._REPLICA_UNAVAILABLE:
+            logger.warning("Replica %s unavailable", replica.url, exc_info=True)
+            return None
+        if replayed:
+            await stack.enter_async_context(replica_stack.pop_all())
+            return conn
+    return None
+
+
+async def _remember_write(user_id: str):
+    async with _connect(True) as conn:
+        db._RECENT_WRITES.set(user_id, await conn.run_sync(db._get_wal_lsn))
+
+
+@asynccontextmanager
+async def get_async_db_connection(
+    read_only: typ.Optional[bool] = None,
+) -> typ.AsyncIterator[AsyncConnection]:
+    """
+    `db.get_db_connection` for async views. Run handlers on it with
+    `await db_conn.run_sync(handler, *args)`, or see `run_handler`.
+    """
+    if read_only is None:
+        read_only = db._is_read_only_request()
+    user_id = (
+        get_user_id_from_token()
+        if db._REPLICA_ENGINES and has_request_context()
+        else None
+    )
+
+    async with AsyncExitStack() as stack:
+        conn = None
+        if read_only and db._REPLICA_ENGINES:
+            conn = await _connect_to_replica(
+                stack, user_id and db._RECENT_WRITES.get(user_id)
+            )
+        if conn is None:
+            conn = await stack.enter_async_context(_connect(read_only))
+
+        try:
+            yield conn
+        except Exception:
+            logger.exception("An error occurred, rolling back")
+            conn.info.pop(db._AFTER_COMMIT_KEY, None)
+            raise
+        after_commit = conn.info.pop(db._AFTER_COMMIT_KEY, [])
+
+    if not read_only and user_id and db._is_write_request():
+        await _remember_write(user_id)
+    db._run_after_commit(after_commit)
+
+
+async def run_handler(
+    func: typ.Callable[[Connection], T], read_only: typ.Optional[bool] = None
+) -> T:
+    """
+    `func(db_conn)` on a connection of its own, a handler with its other arguments
+    bound by `functools.partial`. Independent reads of a request can run
+    concurrently, e.g. with `asyncio.gather`, as each waits on its own connection
+    (and snapshot).
+    """
+    async with get_async_db_connection(read_only) as db_conn:
+        return await db_conn.run_sync(func)
+
+
+async def iter_in_batches(
+    db_conn: AsyncConnection, items: typ.Iterable[T], batch_size: int
+) -> typ.AsyncIterator[T]:
+    """
+    Iterate `items` that read from `db_conn` as they go (e.g. through a server-side
+    cursor), `batch_size` items per `run_sync` round.
+    """
+    iterator = iter(items)
+    while batch := await db_conn.run_sync(
+        lambda _: list(itertools.islice(iterator, batch_size))
+    ):
+        for item in batch:
+            yield item
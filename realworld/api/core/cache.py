@@ -0,0 +1,88 @@
+import time
+import weakref
+import threading
+import typing as typ
+from collections import OrderedDict
+
+_MISSING = object()
+
+# every cache created in this process, so they can be cleared together (e.g. in tests)
+_CACHES: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+
+class TTLCache:
+    """
+    Thread-safe, process-local LRU cache with a per-entry time to live.
+
+    Holds at most `maxsize` entries, evicting the least recently used one when full,
+    and treats entries older than `ttl` seconds as missing. Named caches report their
+    counters through `cache_stats`.
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 60.0, name: typ.Optional[str] = None
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        _CACHES.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: typ.Hashable, default: typ.Any = None) -> typ.Any:
+        with self._lock:
+            expires_at, value = self._entries.get(key, (None, _MISSING))
+            if value is _MISSING or expires_at <= time.monotonic():
+                if value is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: typ.Hashable, value: typ.Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: typ.Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate: typ.Callable[[typ.Any, typ.Any], bool]) -> None:
+        """Delete every entry for which `predicate(key, value)` is true."""
+        with self._lock:
+            for key in [k for k, (_, v) in self._entries.items() if predicate(k, v)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> typ.Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def clear_all_caches() -> None:
+    for cache in list(_CACHES):
+        cache.clear()
+
+
+def cache_stats() -> typ.Dict[str, typ.Dict[str, int]]:
+    return {cache.name: cache.stats() for cache in list(_CACHES) if cache.name}
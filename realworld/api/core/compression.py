@@ -0,0 +1,177 @@
+import os
+import gzip
+import zlib
+import typing as typ
+from flask import Flask, Response, request
+from realworld.api.core.etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # optional, br is offered only when installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, zstd is offered only when installed
+    zstandard = None
+
+# responses with smaller bodies are sent as is, compressing them saves next to nothing
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# content codings to offer, in order of preference, among those available
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+COMPRESS_STREAMS = os.getenv("COMPRESS_STREAMS", "TRUE").upper()
+# streamed output is flushed to the client after at least this many input bytes
+COMPRESSION_STREAM_FLUSH_SIZE = int(os.getenv("COMPRESSION_STREAM_FLUSH_SIZE", "65536"))
+
+_COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html")
+
+
+class StreamCompressor(typ.NamedTuple):
+    compress: typ.Callable[[bytes], bytes]
+    flush: typ.Callable[[], bytes]
+    finish: typ.Callable[[], bytes]
+
+
+class Codec(typ.NamedTuple):
+    compress: typ.Callable[[bytes], bytes]
+    compressor: typ.Callable[[], StreamCompressor]
+
+
+def _gzip_compressor() -> StreamCompressor:
+    compressobj = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return StreamCompressor(
+        compress=compressobj.compress,
+        flush=lambda: compressobj.flush(zlib.Z_SYNC_FLUSH),
+        finish=compressobj.flush,
+    )
+
+
+def _brotli_compressor() -> StreamCompressor:
+    compressor = brotli.Compressor(quality=5)
+    return StreamCompressor(
+        compress=compressor.process, flush=compressor.flush, finish=compressor.finish
+    )
+
+
+def _zstd_compressor() -> StreamCompressor:
+    compressobj = zstandard.ZstdCompressor(level=3).compressobj()
+    return StreamCompressor(
+        compress=compressobj.compress,
+        flush=lambda: compressobj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        finish=compressobj.flush,
+    )
+
+
+_CODECS: typ.Dict[str, Codec] = {
+    # mtime=0 so the same body always compresses to the same bytes
+    "gzip": Codec(lambda body: gzip.compress(body, 6, mtime=0), _gzip_compressor),
+}
+if brotli is not None:
+    # quality 5 rather than the default 11, which is meant for static assets
+    _CODECS["br"] = Codec(
+        lambda body: brotli.compress(body, quality=5), _brotli_compressor
+    )
+if zstandard is not None:
+    _CODECS["zstd"] = Codec(
+        lambda body: zstandard.ZstdCompressor(level=3).compress(body), _zstd_compressor
+    )
+
+AVAILABLE_ENCODINGS = [
+    encoding for encoding in COMPRESSION_ENCODINGS if encoding in _CODECS
+]
+
+
+def negotiate_encoding() -> typ.Optional[str]:
+    """The preferred available content coding the request accepts, if any."""
+    return request.accept_encodings.best_match(AVAILABLE_ENCODINGS)
+
+
+def _is_compressible(response: Response) -> bool:
+    return (
+        response.mimetype in _COMPRESSIBLE_MIMETYPES
+        and 200 <= response.status_code < 300
+        and response.status_code != 204
+        and "Content-Encoding" not in response.headers
+        and not response.direct_passthrough
+    )
+
+
+def _iter_compressed(
+    chunks: typ.Iterable[bytes], compressor: StreamCompressor
+) -> typ.Iterator[bytes]:
+    pending = 0
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+        pending += len(chunk)
+        # flush now and then, so the client keeps receiving rows while the body
+        # is produced without losing the ratio to a flush after every chunk
+        if pending >= COMPRESSION_STREAM_FLUSH_SIZE:
+            yield compressor.flush()
+            pending = 0
+    yield compressor.finish()
+
+
+async def _aiter_compressed(
+    chunks: typ.AsyncIterable[bytes], compressor: StreamCompressor
+) -> typ.AsyncIterator[bytes]:
+    """`_iter_compressed` of the async bodies the ASGI app streams."""
+    pending = 0
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+        pending += len(chunk)
+        if pending >= COMPRESSION_STREAM_FLUSH_SIZE:
+            yield compressor.flush()
+            pending = 0
+    yield compressor.finish()
+
+
+def compress_response(
+    response: Response, encoding: typ.Optional[str] = None
+) -> Response:
+    """
+    Compress the body of `response` with `encoding` (by default negotiated from the
+    request's Accept-Encoding), unless it is too small, not a compressible type or
+    already encoded. Streamed bodies are compressed as they are produced when
+    COMPRESS_STREAMS is on. Strong ETags get the coding appended, since the
+    compressed bytes are a different representation.
+    """
+    if not _is_compressible(response):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = encoding or negotiate_encoding()
+    if encoding is None:
+        return response
+
+    codec = _CODECS[encoding]
+    if response.is_streamed:
+        if COMPRESS_STREAMS != "TRUE":
+            return response
+        if isinstance(response.response, typ.AsyncIterable):
+            response.response = _aiter_compressed(response.response, codec.compressor())
+        else:
+            response.response = _iter_compressed(
+                response.iter_encoded(), codec.compressor()
+            )
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESSION_MIN_SIZE:
+            return response
+        compressed = codec.compress(body)
+        if len(compressed) >= len(body):
+            return response
+        response.set_data(compressed)
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(encoded_etag(etag, encoding))
+    return response
+
+
+def init_compression(app: Flask):
+    """Compress the responses of `app` per request, see `compress_response`."""
+    app.after_request(compress_response)
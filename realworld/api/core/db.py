@@ -1,37 +1,505 @@
 import os
+import time
+import heapq
+import logging
+import itertools
+import threading
 import typing as typ
-from sqlalchemy import create_engine
-from contextlib import contextmanager
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.orm.session import Session, Connection
+import psycopg2.extensions
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import Pool, QueuePool
+from contextlib import ExitStack, contextmanager
+from flask import has_request_context, request
+from sqlalchemy.exc import (
+    DBAPIError,
+    OperationalError,
+    ResourceClosedError,
+    StatementError,
+)
+from sqlalchemy.engine import Connection, Engine, Result, Row
+from sqlalchemy.engine.interfaces import BindTyping
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+from sqlalchemy.sql import text as satext
+from sqlalchemy.sql.elements import TextClause
+from realworld.api.core.cache import TTLCache
+from realworld.api.core.auth import get_user_id_from_token
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# seconds to wait for a free connection before giving up on the request
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# seconds after which a connection is replaced, -1 keeps connections forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "TRUE").upper()
+# milliseconds, 0 lets statements run as long as they take
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "realworld-flask")
+# GET and HEAD requests read in autocommit mode, see `get_db_connection`
+DB_READ_ONLY_GETS = os.getenv("DB_READ_ONLY_GETS", "TRUE").upper()
+_READ_ONLY_METHODS = ("GET", "HEAD")
+# SQLAlchemy driver of the primary, psycopg (3) lets `pipeline` batch statements
+DB_DRIVER_PSYCOPG2 = "psycopg2"
+DB_DRIVER_PSYCOPG = "psycopg"
+DB_DRIVER = os.getenv("DB_DRIVER", DB_DRIVER_PSYCOPG2)
+
+# comma-separated SQLAlchemy URLs of streaming replicas serving read-only connections
+DB_REPLICA_URLS = [url for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url]
+REPLICA_ROUTING_ROUND_ROBIN = "round_robin"
+REPLICA_ROUTING_LEAST_CONNECTIONS = "least_connections"
+DB_REPLICA_ROUTING = os.getenv("DB_REPLICA_ROUTING", REPLICA_ROUTING_ROUND_ROBIN)
+# seconds after a write during which the writer's reads need a replica that has
+# replayed it, past that any replica is assumed to have caught up. Writes are
+# remembered per process: with several workers, route a user's requests to the
+# same one (sticky sessions) to keep the guarantee
+DB_READ_YOUR_WRITES_WINDOW = float(os.getenv("DB_READ_YOUR_WRITES_WINDOW", "10"))
+
+
+_POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING == "TRUE",
+)
+
+
+def _load_uuids_as_str(dbapi_connection, _):
+    # psycopg (3) is optional, it's only imported by engines using its driver
+    from psycopg.types.string import TextLoader  # type: ignore[import-not-found]
+
+    dbapi_connection.adapters.register_loader("uuid", TextLoader)
+
+
+_PSYCOPG2_UUID_AS_STR = psycopg2.extensions.new_type(
+    (2950,), "UUID_AS_STR", lambda value, cursor: value
+)
+_PSYCOPG2_UUID_ARRAY_AS_STR = psycopg2.extensions.new_array_type(
+    (2951,), "UUID_ARRAY_AS_STR", _PSYCOPG2_UUID_AS_STR
+)
+
+
+def _cast_uuids_as_str(dbapi_connection, _):
+    # overrides the `uuid.UUID` casters SQLAlchemy registers on psycopg2 connections
+    psycopg2.extensions.register_type(_PSYCOPG2_UUID_AS_STR, dbapi_connection)
+    psycopg2.extensions.register_type(_PSYCOPG2_UUID_ARRAY_AS_STR, dbapi_connection)
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(
+        url,
+        **_POOL_OPTIONS,
+        connect_args={
+            "application_name": DB_APPLICATION_NAME,
+            "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}",
+        },
+    )
+    if engine.dialect.driver == DB_DRIVER_PSYCOPG:
+        # behave like psycopg2: parameter types are left to Postgres (rather than
+        # comparing uuid columns with `%(id)s::VARCHAR`), uuids are read as str
+        engine.dialect.bind_typing = BindTyping.NONE
+        event.listen(engine, "connect", _load_uuids_as_str)
+    elif engine.dialect.driver == DB_DRIVER_PSYCOPG2:
+        # every driver reads ids as str, like the JWT's user ids they're compared with
+        event.listen(engine, "connect", _cast_uuids_as_str)
+    return engine
+
 
-_ENGINE = create_engine(
-    f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_HOST')}/{os.getenv('POSTGRES_DB')}"
+_ENGINE = _create_engine(
+    f"postgresql+{DB_DRIVER}://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_HOST')}/{os.getenv('POSTGRES_DB')}"
 )
+_REPLICA_ENGINES = [_create_engine(url) for url in DB_REPLICA_URLS]
+_REPLICA_COUNTER = itertools.count()
+
+# user id -> primary WAL position after the user's last write
+_RECENT_WRITES = TTLCache(
+    maxsize=100_000, ttl=DB_READ_YOUR_WRITES_WINDOW, name="recent_writes"
+)
+
+_AFTER_COMMIT_KEY = "realworld_after_commit"
+
+logger = logging.getLogger(__name__)
+
+
+class _CheckoutStats:
+    """Counters of the time requests wait for a pooled connection."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+
+_CHECKOUT_STATS = _CheckoutStats()
+
+
+class _DelayedCalls:
+    """
+    Calls run once their delay has passed, all on one background thread (started on
+    first use) rather than a sleeping thread each.
+    """
+
+    def __init__(self):
+        self._queue: typ.List[typ.Tuple[float, int, typ.Callable[[], typ.Any]]] = []
+        self._counter = itertools.count()  # keeps calls due at once in order
+        self._condition = threading.Condition()
+        self._thread: typ.Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, func: typ.Callable[[], typ.Any]) -> None:
+        with self._condition:
+            heapq.heappush(
+                self._queue, (time.monotonic() + delay, next(self._counter), func)
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="delayed-calls", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    self._condition.wait(
+                        self._queue[0][0] - time.monotonic() if self._queue else None
+                    )
+                _, _, func = heapq.heappop(self._queue)
+            try:
+                func()
+            except Exception:
+                logger.exception("Delayed call %r failed", func)
+
+
+_DELAYED_CALLS = _DelayedCalls()
+
+
+def _checked_out(pool: Pool) -> int:
+    # other pools (e.g. NullPool, StaticPool) don't count their connections
+    return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+
+def _engine_pool_stats(engine: Engine) -> typ.Dict[str, typ.Union[int, float]]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"size": 0, "checked_out": 0, "overflow": 0, "saturation": 0.0}
+    capacity = DB_POOL_SIZE + max(DB_MAX_OVERFLOW, 0)
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(pool.checkedout() / capacity, 3),
+    }
+
+
+def pool_stats() -> typ.Dict[str, typ.Any]:
+    """
+    Connections in use against the most the pool hands out (saturation 1.0 means
+    requests queue for a connection), per replica too, and how long checkouts waited.
+    """
+    return {
+        **_engine_pool_stats(_ENGINE),
+        "checkouts": _CHECKOUT_STATS.checkouts,
+        "checkout_wait_ms_avg": round(
+            _CHECKOUT_STATS.wait_ms_total / max(_CHECKOUT_STATS.checkouts, 1), 3
+        ),
+        "checkout_wait_ms_max": round(_CHECKOUT_STATS.wait_ms_max, 3),
+        "replicas": [_engine_pool_stats(engine) for engine in _REPLICA_ENGINES],
+    }
+
+
+@contextmanager
+def _connect(
+    read_only: bool = False, engine: typ.Optional[Engine] = None
+) -> typ.Iterator[Connection]:
+    """
+    A pooled connection (of the primary unless `engine` is given) in a transaction,
+    committed on exit (rolled back on error) and returned to the pool. Read-only
+    connections run in autocommit mode instead, with neither BEGIN nor COMMIT sent.
+    """
+    start = time.perf_counter()
+    with (engine or _ENGINE).connect() as conn:
+        _CHECKOUT_STATS.record((time.perf_counter() - start) * 1000)
+        if read_only:
+            # the pool resets the isolation level when the connection is returned
+            yield conn.execution_options(isolation_level="AUTOCOMMIT")
+        else:
+            with conn.begin():
+                yield conn
+
+
+def _is_read_only_request() -> bool:
+    return (
+        DB_READ_ONLY_GETS == "TRUE"
+        and has_request_context()
+        and request.method in _READ_ONLY_METHODS
+    )
+
+
+def _is_write_request() -> bool:
+    # streamed GETs hold a transaction too, but write nothing
+    return has_request_context() and request.method not in _READ_ONLY_METHODS
 
-_Session = sessionmaker(bind=_ENGINE)
 
+# a replica that can't be reached (asyncpg raises OSErrors, e.g. connection refused,
+# as they are) leaves the read to the primary
+_REPLICA_UNAVAILABLE = (OperationalError, OSError)
 
-def _create_db_connection() -> typ.Tuple[Session, Connection]:
-    """Create a new database connection."""
-    session = _Session()
-    conn = session.connection()
-    return session, conn
+
+def _pick_replica() -> Engine:
+    if DB_REPLICA_ROUTING == REPLICA_ROUTING_LEAST_CONNECTIONS:
+        return min(_REPLICA_ENGINES, key=lambda engine: _checked_out(engine.pool))
+    return _REPLICA_ENGINES[next(_REPLICA_COUNTER) % len(_REPLICA_ENGINES)]
+
+
+def _connect_to_replica(
+    stack: ExitStack, min_lsn: typ.Optional[str]
+) -> typ.Optional[Connection]:
+    """
+    A read-only replica connection, entered into `stack`. None if the picked replica
+    hasn't replayed the WAL up to `min_lsn` yet, or can't be reached.
+    """
+    replica = _pick_replica()
+    with ExitStack() as replica_stack:
+        try:
+            conn = replica_stack.enter_context(_connect(True, replica))
+            replayed = min_lsn is None or _has_replayed(conn, min_lsn)
+        except _REPLICA_UNAVAILABLE:
+            logger.warning("Replica %s unavailable", replica.url, exc_info=True)
+            return None
+        if replayed:
+            stack.enter_context(replica_stack.pop_all())
+            return conn
+    return None
+
+
+def _has_replayed(conn: Connection, lsn: str) -> bool:
+    # NULL, so False, on the primary. The LSN is bound as text, asyncpg would
+    # expect an int for a pg_lsn parameter
+    return bool(
+        conn.execute(
+            satext(
+                "SELECT pg_last_wal_replay_lsn() >= CAST(CAST(:lsn AS text) AS pg_lsn)"
+            ).bindparams(lsn=lsn)
+        ).scalar()
+    )
+
+
+def _get_wal_lsn(conn: Connection) -> str:
+    return conn.execute(
+        satext("SELECT CAST(pg_current_wal_lsn() AS text)")
+    ).scalar_one()
+
+
+def _remember_write(user_id: str):
+    """Have `user_id`'s reads wait for replicas to replay what was just committed."""
+    with _connect(True) as conn:
+        _RECENT_WRITES.set(user_id, _get_wal_lsn(conn))
+
+
+def call_after_commit(db_conn: Connection, func: typ.Callable[[], typ.Any]):
+    """
+    Run `func` once the transaction of `db_conn` (from `get_db_connection`) commits,
+    e.g. to invalidate caches or enqueue background work that must see the writes.
+    Dropped if the transaction rolls back.
+    """
+    db_conn.info.setdefault(_AFTER_COMMIT_KEY, []).append(func)
+
+
+def call_after_replication(db_conn: Connection, func: typ.Callable[[], typ.Any]):
+    """
+    `call_after_commit`, and with replicas once more after DB_READ_YOUR_WRITES_WINDOW,
+    for cache invalidations: a lagging replica may hand the rows from before the
+    write to a cache in between.
+    """
+
+    def run():
+        func()
+        if _REPLICA_ENGINES:
+            _DELAYED_CALLS.call_later(DB_READ_YOUR_WRITES_WINDOW, func)
+
+    call_after_commit(db_conn, run)
+
+
+def _run_after_commit(callbacks: typ.List[typ.Callable[[], typ.Any]]):
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            # the transaction is already committed, don't fail the request
+            logger.exception("After commit callback %r failed", callback)
+
+
+def _pipeline_error(
+    error: Exception, dbapi_error: typ.Type[Exception]
+) -> StatementError:
+    # SQLAlchemy's exception for the driver's (e.g. IntegrityError), without the
+    # statement: the error may belong to any statement queued before
+    return DBAPIError.instance(None, None, error, dbapi_error)
+
+
+class PipelineResult(typ.Protocol):
+    """
+    The rows of a statement queued on a `Pipeline`, a `CursorResult` when it was
+    sent as it was queued and a `PipelinedResult` otherwise.
+    """
+
+    def fetchone(self) -> typ.Optional[Row[typ.Any]]: ...
+
+    def fetchall(self) -> typ.Sequence[Row[typ.Any]]: ...
+
+    def one(self) -> Row[typ.Any]: ...
+
+    def scalar(self) -> typ.Any: ...
+
+
+def _driver_connection(db_conn: Connection) -> typ.Any:
+    # the psycopg connection under SQLAlchemy's, gone once it's invalidated
+    driver_connection = db_conn.connection.driver_connection
+    if driver_connection is None:
+        raise ResourceClosedError("This connection is closed")
+    return driver_connection
+
+
+class PipelinedResult:
+    """
+    The rows of a statement queued on a `Pipeline`, as SQLAlchemy `Row`s. Reading
+    them before the pipeline ends sends what is queued so far and waits.
+    """
+
+    def __init__(self, cursor, dbapi_error: typ.Type[Exception]):
+        self._cursor = cursor
+        self._dbapi_error = dbapi_error
+        self._result: typ.Optional[Result[typ.Any]] = None
+
+    def _read(self) -> Result[typ.Any]:
+        if self._result is None:
+            try:
+                rows = self._cursor.fetchall()
+            except self._dbapi_error as e:
+                raise _pipeline_error(e, self._dbapi_error) from e
+            keys = [column.name for column in self._cursor.description]
+            self._result = IteratorResult(SimpleResultMetaData(keys), iter(rows))
+        return self._result
+
+    def fetchone(self) -> typ.Optional[Row[typ.Any]]:
+        return self._read().fetchone()
+
+    def fetchall(self) -> typ.Sequence[Row[typ.Any]]:
+        return self._read().fetchall()
+
+    def one(self) -> Row[typ.Any]:
+        return self._read().one()
+
+    def scalar(self) -> typ.Any:
+        return self._read().scalar()
+
+
+class Pipeline:
+    """Statements queued on a connection, see `pipeline`."""
+
+    def __init__(self, db_conn: Connection, pipelined: bool):
+        self._db_conn = db_conn
+        self._pipelined = pipelined
+
+    def execute(self, statement: TextClause) -> PipelineResult:
+        """Queue `statement`, a `text()` with its parameters bound."""
+        if not self._pipelined:
+            return self._db_conn.execute(statement)
+
+        compiled = statement.compile(dialect=self._db_conn.dialect)
+        sql, parameters = str(compiled), compiled.params
+        dbapi_error = self._db_conn.dialect.loaded_dbapi.Error
+        cursor = _driver_connection(self._db_conn).cursor()
+        # cursor events as for `Connection.execute`, e.g. for statement logging
+        for listener in self._db_conn.dispatch.before_cursor_execute:
+            sql, parameters = listener(
+                self._db_conn, cursor, sql, parameters, None, False
+            )
+        try:
+            cursor.execute(sql, parameters)
+        except dbapi_error as e:
+            raise _pipeline_error(e, dbapi_error) from e
+        self._db_conn.dispatch.after_cursor_execute(
+            self._db_conn, cursor, sql, parameters, None, False
+        )
+        return PipelinedResult(cursor, dbapi_error)
 
 
 @contextmanager
-def get_db_connection():
-    """Context manager for handling database transactions."""
+def pipeline(db_conn: Connection) -> typ.Iterator[Pipeline]:
+    """
+    Queue the statements of a handler with `.execute` and send them together, one
+    round trip rather than one per statement, in Postgres' pipeline mode. They run
+    in order in the transaction of `db_conn`, so later ones see the writes of
+    earlier ones, but none can depend on what another returns. A failing statement
+    aborts those queued after it, its error is raised by the next call that hears
+    back from the server (queuing, reading a result or the end of the block).
+    Pipelines need a psycopg (3) connection (DB_DRIVER=psycopg), on others each
+    statement is sent as it is queued.
 
-    session, conn = _create_db_connection()
+        with pipeline(db_conn) as p:
+            inserted = p.execute(satext("INSERT ... RETURNING id"))
+            author = p.execute(satext("SELECT ..."))
+        inserted.fetchone(), author.fetchone()
+    """
+    if db_conn.dialect.driver != DB_DRIVER_PSYCOPG:
+        yield Pipeline(db_conn, pipelined=False)
+        return
 
+    dbapi_error = db_conn.dialect.loaded_dbapi.Error
     try:
-        yield conn
-        session.commit()
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+        with _driver_connection(db_conn).pipeline():
+            yield Pipeline(db_conn, pipelined=True)
+    except dbapi_error as e:
+        raise _pipeline_error(e, dbapi_error) from e
+
+
+@contextmanager
+def get_db_connection(read_only: typ.Optional[bool] = None):
+    """
+    Context manager for handling database transactions.
+
+    `read_only` connections (by default those of GET and HEAD requests) skip the
+    transaction: each statement runs on its own snapshot, without the BEGIN and
+    COMMIT round trips. Multi-statement reads that need one snapshot, or server-side
+    cursors (`yield_per`), must pass `read_only=False`.
+
+    With DB_REPLICA_URLS, read-only connections go to a replica (see
+    DB_REPLICA_ROUTING), except for a user whose own recent write that replica
+    hasn't replayed yet, who reads from the primary instead, as does everyone when
+    the replica can't be reached. Recent writes are tracked by the process that
+    served them, see DB_READ_YOUR_WRITES_WINDOW.
+    """
+    if read_only is None:
+        read_only = _is_read_only_request()
+    user_id = (
+        get_user_id_from_token() if _REPLICA_ENGINES and has_request_context() else None
+    )
+
+    with ExitStack() as stack:
+        conn = None
+        if read_only and _REPLICA_ENGINES:
+            # users who just wrote read from a replica only once it has their write
+            conn = _connect_to_replica(stack, user_id and _RECENT_WRITES.get(user_id))
+        if conn is None:
+            conn = stack.enter_context(_connect(read_only))
+
+        try:
+            yield conn
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            # `info` outlives the checkout, don't leak callbacks to the next one
+            conn.info.pop(_AFTER_COMMIT_KEY, None)
+            raise e
+        after_commit = conn.info.pop(_AFTER_COMMIT_KEY, [])
+
+    if not read_only and user_id and _is_write_request():
+        _remember_write(user_id)
+    _run_after_commit(after_commit)
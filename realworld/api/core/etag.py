@@ -0,0 +1,92 @@
+import hashlib
+import inspect
+import typing as typ
+from functools import wraps
+from flask import Response, make_response, request
+
+
+def compute_etag(*parts: typ.Any) -> str:
+    """A strong ETag for the version described by `parts` (e.g. ids and timestamps)."""
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The ETag of the representation of `etag` compressed with `encoding`."""
+    return f"{etag}-{encoding}"
+
+
+def _get_matching_etag(etag: str) -> typ.Optional[str]:
+    if request.if_none_match.contains(etag):
+        return etag
+    # the client may hold a compressed representation of the same version
+    return next(
+        (tag for tag in request.if_none_match if tag.startswith(f"{etag}-")), None
+    )
+
+
+def not_modified(etag: str) -> typ.Optional[Response]:
+    """
+    A 304 response if the request's If-None-Match matches `etag` or one of its
+    compressed representations, else None.
+    """
+    if (matching_etag := _get_matching_etag(etag)) is None:
+        return None
+
+    response = Response(status=304)
+    response.set_etag(matching_etag)
+    return response
+
+
+def etag_from_content(func):
+    """
+    Tag successful responses of the view with a strong ETag hashed from their body,
+    and answer a matching If-None-Match with an empty 304. Async views too.
+    """
+
+    def tag(rv) -> Response:
+        response = make_response(rv)
+        if response.status_code == 200 and not response.is_streamed:
+            response.add_etag()
+            return not_modified(response.get_etag()[0]) or response
+        return response
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwds):
+            return tag(await func(*args, **kwds))
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwds):
+        return tag(func(*args, **kwds))
+
+    return wrapper
+
+
+def vary_by_viewer(func):
+    """
+    Mark the view's responses, 304s included, as varying with the Authorization
+    header, so shared caches don't serve (or validate) one viewer's representation
+    of e.g. `favorited` / `following` for another. Async views too.
+    """
+
+    def vary(rv) -> Response:
+        response = make_response(rv)
+        response.vary.add("Authorization")
+        return response
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwds):
+            return vary(await func(*args, **kwds))
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwds):
+        return vary(func(*args, **kwds))
+
+    return wrapper
@@ -1,8 +1,18 @@
+import os
 import humps
 import typing as typ
+from uuid import UUID
 from datetime import datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from pydantic import BaseModel, field_serializer
 
+# validate models built from trusted data anyway and compare, meant for tests
+VALIDATE_TRUSTED_MODELS = os.getenv("VALIDATE_TRUSTED_MODELS", "FALSE").upper()
+
+# model class -> defaults of its optional fields, for `from_trusted`
+_FIELD_DEFAULTS: typ.Dict[type, dict] = {}
+_object_setattr = object.__setattr__
+
 
 #
 # Base Models
@@ -20,6 +30,39 @@ class BaseCamelModel(BaseModel):
             kwargs["by_alias"] = True
         return super().model_dump(*args, **kwargs)
 
+    @classmethod
+    def from_trusted(cls, **values):
+        """
+        Build the model without validation from values (by field name) that are
+        already of the field types, e.g. typed database columns. Request bodies must use
+        the validating constructor.
+
+        Sets the instance state directly, `model_construct` costs more than validating.
+        """
+        if (defaults := _FIELD_DEFAULTS.get(cls)) is None:
+            defaults = _FIELD_DEFAULTS[cls] = {
+                name: field.get_default(call_default_factory=True)
+                for name, field in cls.model_fields.items()
+                if not field.is_required()
+            }
+
+        model = cls.__new__(cls)
+        _object_setattr(
+            model, "__dict__", {**defaults, **values} if defaults else values
+        )
+        _object_setattr(model, "__pydantic_fields_set__", set(values))
+        _object_setattr(model, "__pydantic_extra__", None)
+        _object_setattr(model, "__pydantic_private__", None)
+
+        if VALIDATE_TRUSTED_MODELS == "TRUE":
+            validated = cls(**values)
+            if model != validated:
+                raise AssertionError(
+                    f"Trusted {cls.__name__} differs from its validated form: "
+                    f"{model!r} != {validated!r}"
+                )
+        return model
+
 
 #
 # Pagination Models
@@ -31,6 +74,22 @@ class PaginationParams(BaseCamelModel):
     offset: typ.Optional[int] = None
 
 
+class PageCursor(BaseCamelModel):
+    """Opaque keyset position, the (created_date, id) of the last row of a page."""
+
+    created_date: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        return urlsafe_b64encode(self.model_dump_json().encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PageCursor":
+        """Raises ValueError if the cursor is malformed."""
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return cls.model_validate_json(urlsafe_b64decode(padded.encode()))
+
+
 #
 # Core Models
 #
@@ -65,11 +124,12 @@ class DBUser(BaseCamelModel):
     updated_date: typ.Optional[datetime] = None
 
 
-class Article(BaseCamelModel):
+class ArticleSummary(BaseCamelModel):
+    """An article without its body, for list pages."""
+
     slug: str
     title: str
     description: str
-    body: str
     tag_list: list[str]
     created_at: datetime
     updated_at: datetime
@@ -80,3 +140,7 @@ class Article(BaseCamelModel):
     @field_serializer("created_at", "updated_at", when_used="unless-none")
     def serialize_datetime(self, value: datetime, info):
         return value.isoformat()
+
+
+class Article(ArticleSummary):
+    body: str
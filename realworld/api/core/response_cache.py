@@ -0,0 +1,91 @@
+import inspect
+import typing as typ
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, make_response, request
+from realworld.api.core.cache import TTLCache
+from realworld.api.core.auth import get_user_id_from_token
+from realworld.api.core.compression import compress_response, negotiate_encoding
+
+
+class CachedResponse(typ.NamedTuple):
+    body: bytes
+    status: int
+    content_type: str
+    headers: typ.Dict[str, str]
+
+
+def _get_cache_key() -> typ.Tuple[str, str, typ.Optional[str]]:
+    # the same parameters in any order (or repeated in any order) share an entry,
+    # and so do clients with different Accept-Encoding negotiating the same coding
+    return (
+        request.path,
+        urlencode(sorted(request.args.items(multi=True))),
+        negotiate_encoding(),
+    )
+
+
+def cache_anonymous_responses(cache: TTLCache):
+    """
+    Serve requests without a valid token from `cache`, keyed by path and normalized
+    query string and negotiated content coding. Stores the serialized (and already
+    compressed) body of successful responses, so hits skip the view, the database,
+    serialization and compression. Authenticated requests call the view as usual.
+    Place it between `@blueprint.route` and the view (sync or async).
+    """
+
+    def get_cached(cache_key) -> typ.Optional[Response]:
+        if cached := cache.get(cache_key):
+            return Response(
+                cached.body,
+                status=cached.status,
+                content_type=cached.content_type,
+                headers=cached.headers,
+            )
+        return None
+
+    def store(cache_key, rv) -> Response:
+        response = make_response(rv)
+        if response.status_code == 200 and not response.is_streamed:
+            response = compress_response(response, cache_key[2])
+            cache.set(
+                cache_key,
+                CachedResponse(
+                    body=response.get_data(),
+                    status=response.status_code,
+                    content_type=response.content_type,
+                    headers={
+                        header: response.headers[header]
+                        for header in ("Content-Encoding", "Vary")
+                        if header in response.headers
+                    },
+                ),
+            )
+        return response
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwds):
+                if get_user_id_from_token() is not None:
+                    return await func(*args, **kwds)
+
+                cache_key = _get_cache_key()
+                return get_cached(cache_key) or store(
+                    cache_key, await func(*args, **kwds)
+                )
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwds):
+            if get_user_id_from_token() is not None:
+                return func(*args, **kwds)
+
+            cache_key = _get_cache_key()
+            return get_cached(cache_key) or store(cache_key, func(*args, **kwds))
+
+        return wrapper
+
+    return decorator
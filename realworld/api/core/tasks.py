@@ -0,0 +1,24 @@
+import os
+import logging
+import typing as typ
+from concurrent.futures import Future, ThreadPoolExecutor
+
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "2"))
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS, thread_name_prefix="realworld-background"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _log_failure(future: Future):
+    if exc := future.exception():
+        logger.error("Background task failed", exc_info=exc)
+
+
+def run_in_background(func: typ.Callable, *args, **kwargs) -> Future:
+    """Run `func` on the process-local background worker pool, outside the request."""
+    future = _EXECUTOR.submit(func, *args, **kwargs)
+    future.add_done_callback(_log_failure)
+    return future
@@ -0,0 +1,367 @@
+import asyncio
+import typing as typ
+from functools import partial
+from flask import Blueprint, Response, request
+from flask.typing import ResponseReturnValue
+from realworld.api.core.async_db import (
+    get_async_db_connection,
+    iter_in_batches,
+    run_handler,
+)
+from realworld.api.core.encoding import (
+    json_response,
+    iter_json_array,
+    streamed_json_response,
+)
+import realworld.api.routes.v1.articles.handler as articles_handler
+from realworld.api.core.auth import get_user_id_from_token
+from realworld.api.core.response_cache import cache_anonymous_responses
+from realworld.api.core.etag import not_modified, etag_from_content, vary_by_viewer
+from realworld.api.routes.v1.articles.routes import (
+    _INVALID_TOKEN,
+    _ARTICLE_NOT_FOUND,
+    _get_filters,
+    _get_page_params,
+    _get_stream_param,
+    _article_response,
+    _comment_response,
+    _articles_stream_end,
+    _multiple_articles_response,
+)
+from realworld.api.routes.v1.articles.models import (
+    GetTagsResponse,
+    CreateArticleRequest,
+    UpdateArticleRequest,
+    CreateCommentRequest,
+    MultipleCommentsResponse,
+)
+
+# `realworld.api.routes.v1.articles.routes` for the ASGI app, on async connections
+articles_blueprint = Blueprint("articles_endpoints", __name__)
+tags_blueprint = Blueprint("tags_endpoints", __name__, url_prefix="/tags")
+
+
+def _streamed_articles_response(
+    curr_user_id: typ.Optional[str], count_mode: str, filters: dict, **query_kwargs
+) -> Response:
+    """`routes._streamed_articles_response`, reading STREAM_BATCH_SIZE rows a round."""
+
+    async def generate() -> typ.AsyncIterator[str]:
+        # server-side cursors need a transaction
+        async with get_async_db_connection(read_only=False) as db_conn:
+            articles = await db_conn.run_sync(
+                partial(
+                    articles_handler.ArticleStream,
+                    curr_user_id=curr_user_id,
+                    **query_kwargs,
+                    **filters,
+                )
+            )
+            yield '{"articles":'
+            async for chunk in iter_in_batches(
+                db_conn, iter_json_array(articles), articles_handler.STREAM_BATCH_SIZE
+            ):
+                yield chunk
+
+            articles_count = (
+                articles.count
+                if count_mode == articles_handler.COUNT_MODE_NONE
+                else await db_conn.run_sync(
+                    partial(articles_handler.count_articles, mode=count_mode, **filters)
+                )
+            )
+            yield _articles_stream_end(articles, articles_count)
+
+    return streamed_json_response(generate())
+
+
+@articles_blueprint.route("/articles", methods=["GET"])
+@cache_anonymous_responses(articles_handler.ANONYMOUS_RESPONSE_CACHE)
+async def get_articles() -> ResponseReturnValue:
+    """
+    `routes.get_articles`. The page and the count are independent reads, they run
+    concurrently on connections of their own.
+    """
+    user_id = get_user_id_from_token()
+    try:
+        params = _get_page_params()
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    filters = _get_filters()
+    if _get_stream_param(params.limit):
+        return _streamed_articles_response(
+            user_id,
+            params.count_mode,
+            filters,
+            cursor=params.cursor,
+            limit=params.limit,
+            offset=params.offset,
+            view=params.view,
+        )
+
+    page = run_handler(
+        partial(
+            articles_handler.get_articles,
+            curr_user_id=user_id,
+            cursor=params.cursor,
+            limit=params.limit,
+            offset=params.offset,
+            view=params.view,
+            **filters,
+        )
+    )
+    if params.count_mode == articles_handler.COUNT_MODE_NONE:
+        articles, next_cursor = await page
+        articles_count = len(articles)
+    else:
+        (articles, next_cursor), articles_count = await asyncio.gather(
+            page,
+            run_handler(
+                partial(
+                    articles_handler.count_articles, mode=params.count_mode, **filters
+                )
+            ),
+        )
+
+    return _multiple_articles_response(
+        articles, articles_count, next_cursor, params.view
+    )
+
+
+@articles_blueprint.route("/articles/feed", methods=["GET"])
+async def get_feed() -> ResponseReturnValue:
+    """`routes.get_feed`, with the page and the count read concurrently."""
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    try:
+        params = _get_page_params()
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    page = run_handler(
+        partial(
+            articles_handler.get_feed_articles,
+            curr_user_id=user_id,
+            cursor=params.cursor,
+            limit=params.limit,
+            offset=params.offset,
+            view=params.view,
+        )
+    )
+    if params.count_mode == articles_handler.COUNT_MODE_NONE:
+        articles, next_cursor = await page
+        articles_count = len(articles)
+    else:
+        (articles, next_cursor), articles_count = await asyncio.gather(
+            page,
+            run_handler(
+                partial(
+                    articles_handler.count_articles,
+                    mode=params.count_mode,
+                    curr_user_id=user_id,
+                    curr_user_feed=True,
+                )
+            ),
+        )
+
+    return _multiple_articles_response(
+        articles, articles_count, next_cursor, params.view
+    )
+
+
+@articles_blueprint.route("/articles/<string:slug>", methods=["GET"])
+@vary_by_viewer
+async def get_article(slug: str) -> ResponseReturnValue:
+    """`routes.get_article`, conditional GETs included."""
+    async with get_async_db_connection() as db_conn:
+        version = await db_conn.run_sync(
+            partial(
+                articles_handler.get_article_version,
+                slug=slug,
+                curr_user_id=get_user_id_from_token(),
+            )
+        )
+        if not version:
+            return _ARTICLE_NOT_FOUND
+
+        if response := not_modified(version.etag):
+            return response
+
+        article = await db_conn.run_sync(
+            partial(articles_handler.get_article_by_version, version=version)
+        )
+
+    return _article_response(article, etag=version.etag)
+
+
+@articles_blueprint.route("/articles", methods=["POST"])
+async def create_article() -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    data = CreateArticleRequest.model_validate(request.json)
+    article = await run_handler(
+        partial(
+            articles_handler.create_article, curr_user_id=user_id, data=data.article
+        )
+    )
+
+    return _article_response(article)
+
+
+@articles_blueprint.route("/articles/<string:slug>", methods=["PUT"])
+async def update_article(slug) -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    data = UpdateArticleRequest.model_validate(request.json)
+    article = await run_handler(
+        partial(
+            articles_handler.update_article,
+            curr_slug=slug,
+            curr_user_id=user_id,
+            data=data.article,
+        )
+    )
+
+    return _article_response(article)
+
+
+@articles_blueprint.route("/articles/<string:slug>", methods=["DELETE"])
+async def delete_article(slug: str) -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    if not await run_handler(
+        partial(articles_handler.delete_article, slug=slug, curr_user_id=user_id)
+    ):
+        return _ARTICLE_NOT_FOUND
+
+    return {"message": "Article deleted"}
+
+
+#
+# Comments
+#
+@articles_blueprint.route("/articles/<string:slug>/comments", methods=["POST"])
+async def create_comment(slug: str) -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    data = CreateCommentRequest.model_validate(request.json)
+    _, comment = await run_handler(
+        partial(
+            articles_handler.create_article_comment,
+            slug=slug,
+            curr_user_id=user_id,
+            data=data.comment,
+        )
+    )
+
+    return _comment_response(comment)
+
+
+def _streamed_comments_response(slug: str, curr_user_id: typ.Optional[str]) -> Response:
+    """`routes._streamed_comments_response`, reading STREAM_BATCH_SIZE rows a round."""
+
+    async def generate() -> typ.AsyncIterator[str]:
+        # server-side cursors need a transaction
+        async with get_async_db_connection(read_only=False) as db_conn:
+            comments = await db_conn.run_sync(
+                partial(
+                    articles_handler.iter_article_comments,
+                    slug=slug,
+                    curr_user_id=curr_user_id,
+                    yield_per=articles_handler.STREAM_BATCH_SIZE,
+                )
+            )
+            yield '{"comments":'
+            async for chunk in iter_in_batches(
+                db_conn, iter_json_array(comments), articles_handler.STREAM_BATCH_SIZE
+            ):
+                yield chunk
+            yield "}\n"
+
+    return streamed_json_response(generate())
+
+
+@articles_blueprint.route("/articles/<string:slug>/comments", methods=["GET"])
+@vary_by_viewer
+@etag_from_content
+async def get_comments(slug: str) -> ResponseReturnValue:
+    """`stream=true` streams the comments as they're read (without an ETag)."""
+    curr_user_id = get_user_id_from_token()
+    if _get_stream_param():
+        return _streamed_comments_response(slug, curr_user_id)
+
+    comments = await run_handler(
+        partial(
+            articles_handler.get_article_comments,
+            slug=slug,
+            curr_user_id=curr_user_id,
+        )
+    )
+
+    return json_response(MultipleCommentsResponse(comments=comments))
+
+
+@articles_blueprint.route(
+    "/articles/<string:slug>/comments/<string:comment_id>", methods=["DELETE"]
+)
+async def delete_comment(slug: str, comment_id: str) -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    await run_handler(
+        partial(
+            articles_handler.delete_article_comment,
+            slug=slug,
+            comment_id=comment_id,
+            curr_user_id=user_id,
+        )
+    )
+
+    return {"message": "Comment deleted"}
+
+
+#
+# Favorites
+#
+@articles_blueprint.route("/articles/<string:slug>/favorite", methods=["POST"])
+async def favorite_article(slug: str) -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    article = await run_handler(
+        partial(articles_handler.add_article_favorite, slug=slug, curr_user_id=user_id)
+    )
+
+    return _article_response(article)
+
+
+@articles_blueprint.route("/articles/<string:slug>/favorite", methods=["DELETE"])
+async def unfavorite_article(slug: str) -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    article = await run_handler(
+        partial(
+            articles_handler.delete_article_favorite, slug=slug, curr_user_id=user_id
+        )
+    )
+
+    return _article_response(article)
+
+
+#
+# Tags
+#
+@tags_blueprint.route("", methods=["GET"])
+@etag_from_content
+@cache_anonymous_responses(articles_handler.ANONYMOUS_RESPONSE_CACHE)
+async def get_tags() -> ResponseReturnValue:
+    tags = await run_handler(articles_handler.get_all_tags)
+
+    return json_response(GetTagsResponse(tags=tags))
@@ -1,9 +1,30 @@
+import os
 import re
+import json
 import typing as typ
 from uuid import uuid4
+from datetime import datetime
 from sqlalchemy.engine import Connection
 from sqlalchemy.sql import text as satext
-from realworld.api.core.models import Article, Profile, Comment
+from sqlalchemy.sql.elements import TextClause
+from realworld.api.core.cache import TTLCache
+from realworld.api.core.etag import compute_etag
+from realworld.api.core.ids import uuid7
+from realworld.api.core.tasks import run_in_background
+from realworld.api.core.db import (
+    get_db_connection,
+    call_after_commit,
+    call_after_replication,
+    pipeline,
+)
+from realworld.api.core.models import (
+    Article,
+    ArticleSummary,
+    Profile,
+    Comment,
+    PageCursor,
+)
+from realworld.api.routes.v1.articles.timelines import AuthorTimelines, merge_timelines
 
 from realworld.api.routes.v1.articles.models import (
     CreateArticleData,
@@ -11,6 +32,143 @@ from realworld.api.routes.v1.articles.models import (
     CreateCommentData,
 )
 
+# articlesCount modes, `auto` counts exactly unless the list is unfiltered and the
+# planner estimates at least ARTICLES_COUNT_ESTIMATE_THRESHOLD articles
+COUNT_MODE_AUTO = "auto"
+COUNT_MODE_EXACT = "exact"
+COUNT_MODE_ESTIMATE = "estimate"
+COUNT_MODE_NONE = "none"
+COUNT_MODES = (COUNT_MODE_AUTO, COUNT_MODE_EXACT, COUNT_MODE_ESTIMATE, COUNT_MODE_NONE)
+
+ARTICLES_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv("ARTICLES_COUNT_ESTIMATE_THRESHOLD", "100000")
+)
+ARTICLES_COUNT_CACHE_TTL = float(os.getenv("ARTICLES_COUNT_CACHE_TTL", "10"))
+
+_ARTICLES_COUNT_CACHE = TTLCache(
+    maxsize=4096, ttl=ARTICLES_COUNT_CACHE_TTL, name="articles_count"
+)
+
+# new articles are copied into the feed_items of up to FEED_FANOUT_INLINE_LIMIT
+# followers within the request, the rest are handled by a background worker
+FEED_FANOUT_INLINE_LIMIT = int(os.getenv("FEED_FANOUT_INLINE_LIMIT", "1000"))
+FEED_FANOUT_BATCH_SIZE = int(os.getenv("FEED_FANOUT_BATCH_SIZE", "5000"))
+
+# how feed pages are assembled, `sql` reads feed_items and `timeline` merges the
+# in-memory timelines of followed authors (falling back to `sql` when they can't
+# cover the page)
+FEED_ENGINE_SQL = "sql"
+FEED_ENGINE_TIMELINE = "timeline"
+FEED_ENGINE = os.getenv("FEED_ENGINE", FEED_ENGINE_SQL)
+
+# what list and feed pages include, `summary` leaves out the body (and doesn't
+# select it)
+VIEW_FULL = "full"
+VIEW_SUMMARY = "summary"
+VIEWS = (VIEW_FULL, VIEW_SUMMARY)
+
+# who renders article list and feed pages, `python` builds `Article`s from shared
+# cards and `postgres` has the database encode the page as a JSON array
+ARTICLES_RENDERER_PYTHON = "python"
+ARTICLES_RENDERER_POSTGRES = "postgres"
+ARTICLES_RENDERER = os.getenv("ARTICLES_RENDERER", ARTICLES_RENDERER_PYTHON)
+
+# listings are streamed when asked to (`stream=true`) or for a `limit` of at least
+# STREAM_MIN_LIMIT, reading STREAM_BATCH_SIZE rows per server-side cursor fetch
+STREAM_MIN_LIMIT = int(os.getenv("STREAM_MIN_LIMIT", "500"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+_AUTHOR_TIMELINES = AuthorTimelines(
+    max_authors=int(os.getenv("FEED_TIMELINE_MAX_AUTHORS", "10000")),
+    length=int(os.getenv("FEED_TIMELINE_LENGTH", "200")),
+    ttl=float(os.getenv("FEED_TIMELINE_TTL", "300")),
+    name="author_timelines",
+)
+
+
+class ArticleCard(typ.NamedTuple):
+    """
+    The viewer-independent part of an article (content, tags, counts and author
+    profile), shared by every viewer and every list or detail query that includes it.
+    """
+
+    id: str
+    author_user_id: str
+    article: ArticleSummary  # as seen by an anonymous viewer, an `Article` unless
+    # the card was built for the summary view
+
+    def for_viewer(self, favorited: bool, following: bool) -> ArticleSummary:
+        if not (favorited or following):
+            return self.article
+
+        return self.article.model_copy(
+            update={
+                "favorited": favorited,
+                "author": self.article.author.model_copy(
+                    update={"following": following}
+                ),
+            }
+        )
+
+
+class ArticlesJSON:
+    """A page of articles encoded as a JSON array, `len()` is the number of articles."""
+
+    __slots__ = ("json", "count")
+
+    def __init__(self, json: str, count: int):
+        self.json = json
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class ArticleVersion(typ.NamedTuple):
+    """Everything a viewer's rendering of an article depends on, except its content."""
+
+    id: str
+    updated_date: datetime
+    favorites_count: int
+    author_username: str
+    author_bio: typ.Optional[str]
+    author_image: typ.Optional[str]
+    favorited: bool
+    following: bool
+
+    @property
+    def etag(self) -> str:
+        return compute_etag(*self)
+
+    def describes(self, card: ArticleCard) -> bool:
+        article = card.article
+        return (
+            article.updated_at == self.updated_date
+            and article.favorites_count == self.favorites_count
+            and article.author.username == self.author_username
+            and article.author.bio == self.author_bio
+            and article.author.image == self.author_image
+        )
+
+
+_ARTICLE_CARD_CACHE = TTLCache(
+    maxsize=int(os.getenv("ARTICLE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ARTICLE_CACHE_TTL", "30")),
+    name="article_cards",
+)
+_ARTICLE_ID_BY_SLUG_CACHE = TTLCache(
+    maxsize=int(os.getenv("ARTICLE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ARTICLE_CACHE_TTL", "30")),
+    name="article_ids_by_slug",
+)
+
+# serialized anonymous article list and tag responses, see `cache_anonymous_responses`
+ANONYMOUS_RESPONSE_CACHE = TTLCache(
+    maxsize=int(os.getenv("ANONYMOUS_RESPONSE_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("ANONYMOUS_RESPONSE_CACHE_TTL", "5")),
+    name="anonymous_responses",
+)
+
 #
 # Helpers
 #
@@ -22,26 +180,26 @@ def generate_slug(title: str) -> str:
     return f"{slug}-{uuid4().hex[:8]}"
 
 
-def _get_curr_profile_by_id(db_conn: Connection, user_id: str) -> Profile:
-    result = db_conn.execute(
-        satext(
-            """
-            SELECT username, bio, image_url
-            FROM users
-            WHERE id = :user_id
-            """
-        ).bindparams(user_id=user_id)
-    ).fetchone()
+def _curr_profile_query(user_id: str) -> TextClause:
+    return satext(
+        """
+        SELECT username, bio, image_url
+        FROM users
+        WHERE id = :user_id
+        """
+    ).bindparams(user_id=user_id)
+
 
-    return Profile(
-        username=result.username,
-        bio=result.bio,
-        image=result.image_url,
+def _curr_profile_from_row(row) -> Profile:
+    return Profile.from_trusted(
+        username=row.username,
+        bio=row.bio,
+        image=row.image_url,
         following=False,  # unable to follow yourself
     )
 
 
-def _base_get_articles_query(
+def _get_articles_filters(
     *,
     article_id: typ.Optional[int] = None,
     slug: typ.Optional[str] = None,
@@ -50,17 +208,12 @@ def _base_get_articles_query(
     author_username_filter: typ.Optional[str] = None,
     favorited_by_username_filter: typ.Optional[str] = None,
     curr_user_feed: typ.Optional[bool] = False,
-    limit: typ.Optional[int] = 20,
-    offset: typ.Optional[int] = 0,
-):
+) -> typ.Tuple[typ.List[str], typ.List[str], dict]:
+    """Joins, where clauses and params (on `articles a JOIN users u`) for the filters."""
 
     joins = []
     where_clauses = []
-    params = {
-        "limit": limit,
-        "offset": offset,
-        "curr_user_id": curr_user_id,
-    }
+    params = {}
 
     if article_id:
         params["article_id"] = article_id
@@ -88,55 +241,494 @@ def _base_get_articles_query(
 
     if curr_user_feed and curr_user_id:
         params["curr_user_id"] = curr_user_id
-        joins.append("JOIN user_follows uf ON a.author_user_id = uf.following_user_id")
-        where_clauses.append("uf.user_id = :curr_user_id")
+        joins.append("JOIN feed_items fi ON a.id = fi.article_id")
+        where_clauses.append("fi.user_id = :curr_user_id")
+
+    return joins, where_clauses, params
+
+
+def _base_get_articles_query(
+    *,
+    cursor: typ.Optional[PageCursor] = None,
+    limit: typ.Optional[int] = 20,
+    offset: typ.Optional[int] = 0,
+    **filters,
+):
+    joins, where_clauses, params = _get_articles_filters(**filters)
+    params["limit"] = limit
+    params["offset"] = offset
+
+    # the feed sorts on its feed_items copy of the key to read a single index range
+    sort_columns = ("a.created_date", "a.id")
+    if filters.get("curr_user_feed") and filters.get("curr_user_id"):
+        sort_columns = ("fi.created_date", "fi.article_id")
+
+    if cursor:
+        # keyset pagination, rows strictly after the cursor in sort order
+        params["cursor_created_date"] = cursor.created_date
+        params["cursor_id"] = str(cursor.id)
+        where_clauses.append(
+            f"({', '.join(sort_columns)}) "
+            "< (:cursor_created_date, CAST(:cursor_id AS uuid))"
+        )
 
     where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
     return satext(
         f"""
+            SELECT a.id, a.created_date
+            FROM articles a
+            JOIN users u ON a.author_user_id = u.id
+            {" ".join(joins)}
+            {where_clause}
+            ORDER BY {", ".join(f"{column} DESC" for column in sort_columns)}
+            LIMIT :limit
+            OFFSET :offset
+        """
+    ).bindparams(**params)
+
+
+def _fetch_article_page(
+    db_conn: Connection, *, limit: typ.Optional[int], **query_kwargs
+) -> typ.Tuple[typ.List[str], typ.Optional[str]]:
+    """Fetch one page of article ids and the cursor of the page that follows it."""
+    if query_kwargs.get("cursor"):
+        query_kwargs["offset"] = 0  # cursor takes precedence over offset
+
+    # fetch one extra row to learn whether there is a next page
+    rows = db_conn.execute(
+        _base_get_articles_query(
+            limit=limit + 1 if limit is not None else None, **query_kwargs
+        )
+    ).fetchall()
+
+    if limit is None or len(rows) <= limit:
+        return [row.id for row in rows], None
+
+    if not (rows := rows[:limit]):
+        return [], None  # limit=0, no last row to resume after
+
+    next_cursor = PageCursor(created_date=rows[-1].created_date, id=rows[-1].id)
+    return [row.id for row in rows], next_cursor.encode()
+
+
+def _fetch_timeline_feed_page(
+    db_conn: Connection,
+    curr_user_id: str,
+    cursor: typ.Optional[PageCursor],
+    limit: typ.Optional[int],
+    offset: typ.Optional[int],
+) -> typ.Optional[typ.Tuple[typ.List[str], typ.Optional[str]]]:
+    """
+    Feed page from the followed authors' in-memory timelines, same result shape as
+    `_fetch_article_page`. None if the timelines can't cover the page.
+    """
+    if not limit or limit < 1:
+        return None
+
+    author_ids = (
+        db_conn.execute(
+            satext(
+                """
+                SELECT following_user_id
+                FROM user_follows
+                WHERE user_id = :curr_user_id
+                """
+            ).bindparams(curr_user_id=curr_user_id)
+        )
+        .scalars()
+        .all()
+    )
+
+    merged = merge_timelines(
+        _AUTHOR_TIMELINES.get_many(db_conn, author_ids),
+        after=(cursor.created_date, str(cursor.id)) if cursor else None,
+        offset=0 if cursor else offset or 0,
+        limit=limit,
+    )
+    if merged is None:
+        return None
+
+    entries, has_more = merged
+
+    next_cursor = None
+    if has_more:
+        created_date, article_id = entries[-1]
+        next_cursor = PageCursor(created_date=created_date, id=article_id).encode()
+
+    return [article_id for _, article_id in entries], next_cursor
+
+
+def _get_card_key(article_id: str, view: str) -> typ.Hashable:
+    return article_id if view == VIEW_FULL else (view, article_id)
+
+
+def _get_article_cards(
+    db_conn: Connection,
+    article_ids: typ.List[str],
+    use_cache: bool = True,
+    view: str = VIEW_FULL,
+) -> typ.Dict[str, ArticleCard]:
+    """
+    Cards for the given article ids, missing ones are built with one query for the
+    articles and one for their tags. Deleted articles are left out.
+    """
+    cards, missing_ids = {}, []
+    for article_id in article_ids:
+        card_key = _get_card_key(article_id, view)
+        if use_cache and (card := _ARTICLE_CARD_CACHE.get(card_key)):
+            cards[article_id] = card
+        else:
+            missing_ids.append(article_id)
+
+    if not missing_ids:
+        return cards
+
+    rows = db_conn.execute(
+        satext(
+            f"""
             SELECT
                 a.id,
                 a.slug,
                 a.title,
                 a.description,
-                a.body,
+                {"a.body," if view == VIEW_FULL else ""}
                 a.created_date,
                 a.updated_date,
+                a.favorites_count,
+                u.id AS author_user_id,
                 u.username AS author_username,
                 u.bio AS author_bio,
-                u.image_url AS author_image,
-                (
-                    SELECT COUNT(*)
-                    FROM article_favorites f
-                    WHERE f.article_id = a.id
-                ) AS favorites_count,
-                (
-                    SELECT COUNT(*)
-                    FROM article_favorites f
-                    WHERE f.article_id = a.id AND f.user_id = :curr_user_id
-                ) AS favorited_by_curr_user,
-                (
-                    SELECT COUNT(*)
-                    FROM user_follows uf
-                    WHERE uf.user_id = :curr_user_id
-                    AND uf.following_user_id = u.id
-                ) > 0 AS is_curr_user_following,
-                (
-                    SELECT ARRAY_AGG(t.name)
-                    FROM tags t
-                    JOIN article_tags at ON t.id = at.tag_id
-                    WHERE at.article_id = a.id
-                ) AS tag_list
+                u.image_url AS author_image
+            FROM articles a
+            JOIN users u ON a.author_user_id = u.id
+            WHERE a.id = ANY(CAST(:article_ids AS uuid[]))
+            """
+        ).bindparams(article_ids=missing_ids)
+    ).fetchall()
+
+    tags_by_article = dict(
+        db_conn.execute(
+            satext(
+                """
+                SELECT at.article_id, ARRAY_AGG(t.name) AS tag_list
+                FROM article_tags at
+                JOIN tags t ON t.id = at.tag_id
+                WHERE at.article_id = ANY(CAST(:article_ids AS uuid[]))
+                GROUP BY at.article_id
+                """
+            ).bindparams(article_ids=missing_ids)
+        ).fetchall()
+    )
+
+    for row in rows:
+        article = dict(
+            slug=row.slug,
+            title=row.title,
+            description=row.description,
+            tag_list=tags_by_article.get(row.id) or [],
+            created_at=row.created_date,
+            updated_at=row.updated_date,
+            favorited=False,
+            favorites_count=row.favorites_count,
+            author=Profile.from_trusted(
+                bio=row.author_bio,
+                username=row.author_username,
+                following=False,
+                image=row.author_image,
+            ),
+        )
+        cards[row.id] = ArticleCard(
+            id=row.id,
+            # str, like the user ids cards are invalidated and overlaid by
+            author_user_id=str(row.author_user_id),
+            article=(
+                Article.from_trusted(body=row.body, **article)
+                if view == VIEW_FULL
+                else ArticleSummary.from_trusted(**article)
+            ),
+        )
+        if use_cache:
+            _ARTICLE_CARD_CACHE.set(_get_card_key(row.id, view), cards[row.id])
+
+    return cards
+
+
+def _get_viewer_overlay(
+    db_conn: Connection, curr_user_id: typ.Optional[str], cards: typ.List[ArticleCard]
+) -> typ.Tuple[typ.Set[str], typ.Set[str]]:
+    """The ids of the cards' articles the viewer favorited, and authors they follow."""
+    if not curr_user_id or not cards:
+        return set(), set()
+
+    rows = db_conn.execute(
+        satext(
+            """
+            SELECT 'favorited' AS kind, article_id AS id
+            FROM article_favorites
+            WHERE user_id = :curr_user_id
+            AND article_id = ANY(CAST(:article_ids AS uuid[]))
+            UNION ALL
+            SELECT 'following' AS kind, following_user_id AS id
+            FROM user_follows
+            WHERE user_id = :curr_user_id
+            AND following_user_id = ANY(CAST(:author_ids AS uuid[]))
+            """
+        ).bindparams(
+            curr_user_id=curr_user_id,
+            article_ids=[card.id for card in cards],
+            author_ids=list({card.author_user_id for card in cards}),
+        )
+    ).fetchall()
+
+    favorited_ids = {row.id for row in rows if row.kind == "favorited"}
+    following_ids = {str(row.id) for row in rows if row.kind == "following"}
+    return favorited_ids, following_ids
+
+
+def _render_articles(
+    db_conn: Connection,
+    article_ids: typ.List[str],
+    curr_user_id: typ.Optional[str],
+    use_cache: bool = True,
+    view: str = VIEW_FULL,
+) -> typ.List[ArticleSummary]:
+    """
+    Articles in the order of `article_ids`, shared cards plus the viewer's overlay.
+    `Article`s, or `ArticleSummary`s for the summary view.
+    """
+    cards_by_id = _get_article_cards(db_conn, article_ids, use_cache, view)
+    cards = [cards_by_id[id_] for id_ in article_ids if id_ in cards_by_id]
+
+    favorited_ids, following_ids = _get_viewer_overlay(db_conn, curr_user_id, cards)
+    return [
+        card.for_viewer(
+            favorited=card.id in favorited_ids,
+            following=card.author_user_id in following_ids,
+        )
+        for card in cards
+    ]
+
+
+def _isoformat_sql(column: str) -> str:
+    """
+    SQL rendering the timestamptz `column` like `datetime.isoformat()`, which (unlike
+    Postgres) writes microseconds as six digits, and leaves them out when zero.
+    """
+    return f"""(
+        to_char({column}, 'YYYY-MM-DD"T"HH24:MI:SS')
+        || CASE WHEN to_char({column}, 'US') = '000000'
+            THEN '' ELSE to_char({column}, '.US') END
+        || to_char({column}, 'TZH:TZM')
+    )"""
+
+
+def _render_articles_json(
+    db_conn: Connection,
+    article_ids: typ.List[str],
+    curr_user_id: typ.Optional[str],
+    view: str = VIEW_FULL,
+) -> ArticlesJSON:
+    """
+    The page as the JSON array of the `articles` response field, encoded by Postgres
+    in the order of `article_ids`. Same values as `_render_articles`, but the keys
+    follow the `Article` field order and non-ASCII text isn't escaped.
+    """
+    # cast to text, psycopg2 would parse a json column back into Python objects
+    result = db_conn.execute(
+        satext(
+            f"""
+            SELECT
+                CAST(COALESCE(
+                    json_agg(
+                        json_build_object(
+                            'slug', a.slug,
+                            'title', a.title,
+                            'description', a.description,
+                            {"'body', a.body," if view == VIEW_FULL else ""}
+                            'tagList', COALESCE(tags.tag_list, '[]'),
+                            'createdAt', {_isoformat_sql("a.created_date")},
+                            'updatedAt', {_isoformat_sql("a.updated_date")},
+                            'favorited', EXISTS (
+                                SELECT 1
+                                FROM article_favorites af
+                                WHERE af.article_id = a.id
+                                AND af.user_id = CAST(:curr_user_id AS uuid)
+                            ),
+                            'favoritesCount', a.favorites_count,
+                            'author', json_build_object(
+                                'username', u.username,
+                                'following', EXISTS (
+                                    SELECT 1
+                                    FROM user_follows uf
+                                    WHERE uf.following_user_id = u.id
+                                    AND uf.user_id = CAST(:curr_user_id AS uuid)
+                                ),
+                                'bio', u.bio,
+                                'image', u.image_url
+                            )
+                        )
+                        ORDER BY page.position
+                    ),
+                    '[]'
+                ) AS text) AS articles,
+                COUNT(*) AS count
+            FROM unnest(CAST(:article_ids AS uuid[]))
+                WITH ORDINALITY AS page(article_id, position)
+            JOIN articles a ON a.id = page.article_id
+            JOIN users u ON a.author_user_id = u.id
+            LEFT JOIN LATERAL (
+                SELECT json_agg(t.name) AS tag_list
+                FROM article_tags at
+                JOIN tags t ON t.id = at.tag_id
+                WHERE at.article_id = a.id
+            ) tags ON TRUE
+            """
+        ).bindparams(article_ids=article_ids, curr_user_id=curr_user_id)
+    ).fetchone()
+
+    return ArticlesJSON(json=result.articles, count=result.count)
+
+
+def _render_page(
+    db_conn: Connection,
+    article_ids: typ.List[str],
+    curr_user_id: typ.Optional[str],
+    view: str,
+) -> typ.Union[typ.List[ArticleSummary], ArticlesJSON]:
+    if ARTICLES_RENDERER == ARTICLES_RENDERER_POSTGRES:
+        return _render_articles_json(db_conn, article_ids, curr_user_id, view)
+    return _render_articles(db_conn, article_ids, curr_user_id, view=view)
+
+
+def _estimate_articles_count(
+    db_conn: Connection,
+    joins: typ.List[str],
+    where_clauses: typ.List[str],
+    params: dict,
+) -> int:
+    if not where_clauses:
+        estimate = db_conn.execute(
+            satext(
+                """
+                SELECT CAST(reltuples AS bigint)
+                FROM pg_class
+                WHERE oid = CAST('articles' AS regclass)
+                """
+            )
+        ).scalar()
+        return max(estimate or 0, 0)  # -1 until the table is first analyzed
+
+    plan = db_conn.execute(
+        satext(
+            f"""
+            EXPLAIN (FORMAT JSON)
+            SELECT 1
             FROM articles a
             JOIN users u ON a.author_user_id = u.id
             {" ".join(joins)}
-            {where_clause}
-            ORDER BY a.created_date DESC
-            LIMIT :limit
-            OFFSET :offset
+            WHERE {" AND ".join(where_clauses)}
+            """
+        ).bindparams(**params)
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _fan_out_article_batch(
+    db_conn: Connection,
+    article_id: str,
+    after_user_id: typ.Optional[str],
+    batch_size: int,
+) -> typ.Tuple[typ.Optional[str], int]:
+    """
+    Add the article to the feed of the next `batch_size` followers of its author,
+    ordered by id after `after_user_id`. Returns the last follower id and batch size.
+    """
+    result = db_conn.execute(
+        _fan_out_article_batch_query(article_id, after_user_id, batch_size)
+    ).fetchone()
+
+    return result.last_user_id, result.batch_size
+
+
+def _fan_out_article_batch_query(
+    article_id: str, after_user_id: typ.Optional[str], batch_size: int
+) -> TextClause:
+    return satext(
         """
-    ).bindparams(**params)
+        WITH batch AS (
+            SELECT uf.user_id
+            FROM user_follows uf
+            JOIN articles a ON a.author_user_id = uf.following_user_id
+            WHERE a.id = :article_id
+            AND (
+                CAST(:after_user_id AS uuid) IS NULL
+                OR uf.user_id > CAST(:after_user_id AS uuid)
+            )
+            ORDER BY uf.user_id
+            LIMIT :batch_size
+        ),
+        inserted AS (
+            INSERT INTO feed_items (user_id, article_id, created_date)
+            SELECT b.user_id, a.id, a.created_date
+            FROM batch b
+            JOIN articles a ON a.id = :article_id
+            ON CONFLICT DO NOTHING
+        )
+        SELECT
+            (SELECT user_id FROM batch ORDER BY user_id DESC LIMIT 1) AS last_user_id,
+            (SELECT COUNT(*) FROM batch) AS batch_size
+        """
+    ).bindparams(
+        article_id=article_id, after_user_id=after_user_id, batch_size=batch_size
+    )
+
+
+def fan_out_article(article_id: str, after_user_id: typ.Optional[str] = None):
+    """Add an article to its author's followers' feeds, one transaction per batch."""
+    while True:
+        with get_db_connection() as db_conn:
+            after_user_id, batch_size = _fan_out_article_batch(
+                db_conn, article_id, after_user_id, FEED_FANOUT_BATCH_SIZE
+            )
+        if batch_size < FEED_FANOUT_BATCH_SIZE:
+            return
+
+
+def _invalidate_article(
+    db_conn: Connection, article_id: str, slug: typ.Optional[str] = None
+):
+    """Drop the cached card (and slug lookup) once the transaction of `db_conn` commits."""
+
+    def invalidate():
+        for view in VIEWS:
+            _ARTICLE_CARD_CACHE.delete(_get_card_key(article_id, view))
+        if slug:
+            _ARTICLE_ID_BY_SLUG_CACHE.delete(slug)
+
+    call_after_replication(db_conn, invalidate)
+    _invalidate_anonymous_responses(db_conn)
+
+
+def _invalidate_anonymous_responses(db_conn: Connection):
+    """
+    Drop every cached anonymous list and tags response once `db_conn` commits, any
+    article, favorite or tag write may change any of them.
+    """
+    call_after_replication(db_conn, ANONYMOUS_RESPONSE_CACHE.clear)
+
+
+def invalidate_author_articles(db_conn: Connection, author_user_id: str):
+    """Drop an author's cached cards once `db_conn` commits, e.g. on profile changes."""
+    call_after_replication(
+        db_conn,
+        lambda: _ARTICLE_CARD_CACHE.discard_where(
+            lambda _, card: str(card.author_user_id) == str(author_user_id)
+        ),
+    )
+    _invalidate_anonymous_responses(db_conn)
 
 
 #
@@ -144,6 +736,43 @@ def _base_get_articles_query(
 #
 
 
+def count_articles(
+    db_conn: Connection, *, mode: str = COUNT_MODE_AUTO, **filters
+) -> int:
+    """
+    Total number of articles matching the `_get_articles_filters` filters, cached
+    per filter for ARTICLES_COUNT_CACHE_TTL seconds.
+    """
+    cache_key = (mode, tuple(sorted(filters.items())))
+    if (count := _ARTICLES_COUNT_CACHE.get(cache_key)) is not None:
+        return count
+
+    joins, where_clauses, params = _get_articles_filters(**filters)
+
+    count = None
+    if mode == COUNT_MODE_ESTIMATE or (mode == COUNT_MODE_AUTO and not where_clauses):
+        count = _estimate_articles_count(db_conn, joins, where_clauses, params)
+        if mode == COUNT_MODE_AUTO and count < ARTICLES_COUNT_ESTIMATE_THRESHOLD:
+            count = None  # small enough to count exactly
+
+    if count is None:
+        where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        count = db_conn.execute(
+            satext(
+                f"""
+                SELECT COUNT(*)
+                FROM articles a
+                JOIN users u ON a.author_user_id = u.id
+                {" ".join(joins)}
+                {where_clause}
+                """
+            ).bindparams(**params)
+        ).scalar()
+
+    _ARTICLES_COUNT_CACHE.set(cache_key, count)
+    return count
+
+
 def get_articles(
     db_conn: Connection,
     *,
@@ -151,149 +780,297 @@ def get_articles(
     filter_tag: typ.Optional[str] = None,
     author_username_filter: typ.Optional[str] = None,
     favorited_by_username_filter: typ.Optional[str] = None,
+    cursor: typ.Optional[PageCursor] = None,
     limit: typ.Optional[int] = 20,
     offset: typ.Optional[int] = 0,
-) -> typ.List[Article]:
-    articles = db_conn.execute(
-        _base_get_articles_query(
-            curr_user_id=curr_user_id,
-            filter_tag=filter_tag,
-            author_username_filter=author_username_filter,
-            favorited_by_username_filter=favorited_by_username_filter,
-            limit=limit,
-            offset=offset,
-        )
-    ).fetchall()
+    view: str = VIEW_FULL,
+) -> typ.Tuple[typ.Union[typ.List[ArticleSummary], ArticlesJSON], typ.Optional[str]]:
+    article_ids, next_cursor = _fetch_article_page(
+        db_conn,
+        curr_user_id=curr_user_id,
+        filter_tag=filter_tag,
+        author_username_filter=author_username_filter,
+        favorited_by_username_filter=favorited_by_username_filter,
+        cursor=cursor,
+        limit=limit,
+        offset=offset,
+    )
 
-    return [
-        Article(
-            id=article.id,
-            slug=article.slug,
-            title=article.title,
-            description=article.description,
-            body=article.body,
-            tag_list=article.tag_list if article.tag_list else [],
-            created_at=article.created_date,
-            updated_at=article.updated_date,
-            favorited=bool(article.favorited_by_curr_user),
-            favorites_count=article.favorites_count,
-            author=Profile(
-                bio=article.author_bio,
-                username=article.author_username,
-                following=bool(article.is_curr_user_following),
-                image=article.author_image,
-            ),
-        )
-        for article in articles
-    ]
+    return _render_page(db_conn, article_ids, curr_user_id, view), next_cursor
 
 
 def get_feed_articles(
     db_conn: Connection,
     curr_user_id: str,
+    cursor: typ.Optional[PageCursor] = None,
     limit: typ.Optional[int] = 20,
     offset: typ.Optional[int] = 0,
-) -> typ.List[Article]:
-    articles = db_conn.execute(
-        _base_get_articles_query(
+    view: str = VIEW_FULL,
+) -> typ.Tuple[typ.Union[typ.List[ArticleSummary], ArticlesJSON], typ.Optional[str]]:
+    page = None
+    if FEED_ENGINE == FEED_ENGINE_TIMELINE:
+        page = _fetch_timeline_feed_page(db_conn, curr_user_id, cursor, limit, offset)
+
+    if page is None:
+        page = _fetch_article_page(
+            db_conn,
             curr_user_id=curr_user_id,
             curr_user_feed=True,
+            cursor=cursor,
             limit=limit,
             offset=offset,
         )
-    ).fetchall()
 
-    return [
-        Article(
-            id=article.id,
-            slug=article.slug,
-            title=article.title,
-            description=article.description,
-            body=article.body,
-            tag_list=article.tag_list if article.tag_list else [],
-            created_at=article.created_date,
-            updated_at=article.updated_date,
-            favorited=bool(article.favorited_by_curr_user),
-            favorites_count=article.favorites_count,
-            author=Profile(
-                bio=article.author_bio,
-                username=article.author_username,
-                following=bool(article.is_curr_user_following),
-                image=article.author_image,
-            ),
-        )
-        for article in articles
-    ]
+    article_ids, next_cursor = page
+    return _render_page(db_conn, article_ids, curr_user_id, view), next_cursor
+
+
+class ArticleStream:
+    """
+    Articles of a listing (same arguments as `get_articles`), read through a
+    server-side cursor and rendered STREAM_BATCH_SIZE at a time, so memory doesn't
+    grow with the number of articles. `count` and `next_cursor` are set once iterated.
+    """
+
+    def __init__(
+        self,
+        db_conn: Connection,
+        *,
+        curr_user_id: typ.Optional[str] = None,
+        cursor: typ.Optional[PageCursor] = None,
+        limit: typ.Optional[int] = None,
+        offset: typ.Optional[int] = 0,
+        view: str = VIEW_FULL,
+        **filters,
+    ):
+        self.count = 0
+        self.next_cursor: typ.Optional[str] = None
+        self._db_conn = db_conn
+        self._curr_user_id = curr_user_id
+        self._limit = limit
+        self._view = view
+        self._query = _base_get_articles_query(
+            curr_user_id=curr_user_id,
+            cursor=cursor,
+            # one extra row to learn whether there is a next page
+            limit=limit + 1 if limit is not None else None,
+            offset=0 if cursor else offset,
+            **filters,
+        ).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    def __iter__(self) -> typ.Iterator[ArticleSummary]:
+        seen, last_row, has_more = 0, None, False
+        result = self._db_conn.execute(self._query)
+        for rows in result.partitions():
+            if self._limit is not None and seen + len(rows) > self._limit:
+                rows, has_more = rows[: self._limit - seen], True
+
+            if rows:
+                seen, last_row = seen + len(rows), rows[-1]
+                # bypass the card cache, a long listing would evict the hot cards
+                for article in _render_articles(
+                    self._db_conn,
+                    [row.id for row in rows],
+                    self._curr_user_id,
+                    use_cache=False,
+                    view=self._view,
+                ):
+                    self.count += 1
+                    yield article
+
+            if has_more:
+                result.close()
+                break
+
+        if has_more and last_row:
+            self.next_cursor = PageCursor(
+                created_date=last_row.created_date, id=last_row.id
+            ).encode()
 
 
 def get_article_by_slug(
-    db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
+    db_conn: Connection,
+    slug: str,
+    curr_user_id: typ.Optional[str],
+    use_cache: bool = True,
 ) -> typ.Optional[Article]:
-    article = db_conn.execute(
-        _base_get_articles_query(slug=slug, curr_user_id=curr_user_id)
+    """
+    Write paths pass `use_cache=False` so they neither read a stale entry nor cache
+    data their transaction has not committed yet.
+    """
+    article_id = _ARTICLE_ID_BY_SLUG_CACHE.get(slug) if use_cache else None
+    if article_id is None:
+        article_id = db_conn.execute(
+            satext("SELECT id FROM articles WHERE slug = :slug").bindparams(slug=slug)
+        ).scalar()
+
+        if not article_id:
+            return None
+
+        if use_cache:
+            _ARTICLE_ID_BY_SLUG_CACHE.set(slug, article_id)
+
+    articles = _render_articles(db_conn, [article_id], curr_user_id, use_cache)
+    return articles[0] if articles else None
+
+
+def get_article_version(
+    db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
+) -> typ.Optional[ArticleVersion]:
+    """Cheap probe for conditional GETs, reads neither the body nor the tags."""
+    result = db_conn.execute(
+        satext(
+            """
+            SELECT
+                a.id,
+                a.updated_date,
+                a.favorites_count,
+                u.username AS author_username,
+                u.bio AS author_bio,
+                u.image_url AS author_image,
+                EXISTS (
+                    SELECT 1
+                    FROM article_favorites af
+                    WHERE af.article_id = a.id
+                    AND af.user_id = :curr_user_id
+                ) AS favorited,
+                EXISTS (
+                    SELECT 1
+                    FROM user_follows uf
+                    WHERE uf.following_user_id = a.author_user_id
+                    AND uf.user_id = :curr_user_id
+                ) AS following
+            FROM articles a
+            JOIN users u ON a.author_user_id = u.id
+            WHERE a.slug = :slug
+            """
+        ).bindparams(slug=slug, curr_user_id=curr_user_id)
     ).fetchone()
 
-    if not article:
+    return ArticleVersion(*result) if result else None
+
+
+def get_article_by_version(
+    db_conn: Connection, version: ArticleVersion
+) -> typ.Optional[Article]:
+    """
+    The article as `version` describes it, the version's flags stand in for the viewer
+    overlay. A cached card older than the version (written by another process) is
+    rebuilt, so the body always matches the version's ETag.
+    """
+    card = _get_article_cards(db_conn, [version.id]).get(version.id)
+    if card and not version.describes(card):
+        _ARTICLE_CARD_CACHE.delete(version.id)
+        card = _get_article_cards(db_conn, [version.id]).get(version.id)
+
+    if not card:
         return None
 
-    return Article(
-        id=article.id,
-        slug=article.slug,
-        title=article.title,
-        description=article.description,
-        body=article.body,
-        tag_list=article.tag_list if article.tag_list else [],
-        created_at=article.created_date,
-        updated_at=article.updated_date,
-        favorited=bool(article.favorited_by_curr_user),
-        favorites_count=article.favorites_count,
-        author=Profile(
-            bio=article.author_bio,
-            username=article.author_username,
-            following=bool(article.is_curr_user_following),
-            image=article.author_image,
-        ),
-    )
+    return card.for_viewer(favorited=version.favorited, following=version.following)
 
 
 def create_article(
     db_conn: Connection, curr_user_id: str, data: CreateArticleData
 ) -> Article:
-    article = db_conn.execute(
-        satext(
-            """
-            INSERT INTO articles (author_user_id, slug, title, description, body)
-            VALUES (:author_user_id, :slug, :title, :description, :body)
-            RETURNING id, slug
-            """
-        ).bindparams(
-            author_user_id=curr_user_id,
-            slug=generate_slug(data.title),
-            title=data.title,
-            description=data.description,
-            body=data.body,
-        )
-    ).fetchone()
+    """
+    Built from what the statements return rather than read back. The article id is
+    generated here, so the article and its author, the tags and the fan-out are
+    queued on one pipeline.
+    """
+    article_id = str(uuid7())
+    # repeated tags are tagged once, in the order they first appear
+    tag_list = list(dict.fromkeys(data.tag_list or []))
 
-    if data.tag_list:
-        db_conn.execute(
+    with pipeline(db_conn) as p:
+        inserted = p.execute(
             satext(
                 """
-                WITH upserted_tags AS (
-                    INSERT INTO tags (name)
-                    VALUES (:name)
-                    ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
-                    RETURNING id
+                WITH inserted AS (
+                    INSERT INTO articles (id, author_user_id, slug, title, description, body)
+                    VALUES (:id, :author_user_id, :slug, :title, :description, :body)
+                    RETURNING
+                        id,
+                        author_user_id,
+                        slug,
+                        title,
+                        description,
+                        body,
+                        created_date,
+                        updated_date
                 )
-                INSERT INTO article_tags (article_id, tag_id)
-                SELECT :article_id, id
-                FROM upserted_tags
+                SELECT
+                    i.*,
+                    u.username AS author_username,
+                    u.bio AS author_bio,
+                    u.image_url AS author_image
+                FROM inserted i
+                JOIN users u ON u.id = i.author_user_id
                 """
-            ),
-            [{"name": tag, "article_id": article.id} for tag in data.tag_list],
+            ).bindparams(
+                id=article_id,
+                author_user_id=curr_user_id,
+                slug=generate_slug(data.title),
+                title=data.title,
+                description=data.description,
+                body=data.body,
+            )
+        )
+        if tag_list:
+            p.execute(
+                satext(
+                    """
+                    WITH upserted_tags AS (
+                        INSERT INTO tags (name)
+                        -- sorted, so concurrent upserts of the same tags lock them in
+                        -- the same order and can't deadlock
+                        SELECT name
+                        FROM unnest(CAST(:names AS text[])) AS name
+                        ORDER BY name
+                        ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                        RETURNING id
+                    )
+                    INSERT INTO article_tags (article_id, tag_id)
+                    SELECT CAST(:article_id AS uuid), id
+                    FROM upserted_tags
+                    """
+                ).bindparams(names=tag_list, article_id=article_id)
+            )
+        fanned_out = p.execute(
+            _fan_out_article_batch_query(article_id, None, FEED_FANOUT_INLINE_LIMIT)
+        )
+
+    article = inserted.one()
+    last_user_id, batch_size = fanned_out.one()
+    if batch_size == FEED_FANOUT_INLINE_LIMIT:
+        # more followers than we fan out to inline, the worker picks up the rest
+        call_after_commit(
+            db_conn,
+            lambda: run_in_background(fan_out_article, article.id, last_user_id),
         )
 
-    return get_article_by_slug(db_conn, article.slug, curr_user_id)
+    call_after_commit(
+        db_conn,
+        lambda: _AUTHOR_TIMELINES.add(curr_user_id, article.id, article.created_date),
+    )
+    _invalidate_anonymous_responses(db_conn)
+
+    return Article.from_trusted(
+        slug=article.slug,
+        title=article.title,
+        description=article.description,
+        body=article.body,
+        tag_list=tag_list,
+        created_at=article.created_date,
+        updated_at=article.updated_date,
+        favorited=False,
+        favorites_count=0,
+        author=Profile.from_trusted(
+            username=article.author_username,
+            bio=article.author_bio,
+            image=article.author_image,
+            following=False,  # unable to follow yourself
+        ),
+    )
 
 
 def update_article(
@@ -314,7 +1091,7 @@ def update_article(
             update_str += f"{key} = :{key}, "
             params[key] = value
 
-    db_conn.execute(
+    updated = db_conn.execute(
         satext(
             f"""
             UPDATE articles
@@ -322,66 +1099,88 @@ def update_article(
                 updated_date = CURRENT_TIMESTAMP
             WHERE slug = :slug
             AND author_user_id = :curr_user_id
+            RETURNING id
             """
         ).bindparams(
             slug=curr_slug,
             curr_user_id=curr_user_id,
             **params,
         )
-    )
+    ).fetchone()
+
+    if updated:
+        _invalidate_article(db_conn, updated.id, curr_slug)
 
     slug = new_slug if new_slug else curr_slug
-    return get_article_by_slug(db_conn, slug, curr_user_id)
+    return get_article_by_slug(db_conn, slug, curr_user_id, use_cache=False)
 
 
 def delete_article(db_conn: Connection, slug: str, curr_user_id: str) -> bool:
-    result = db_conn.execute(
+    deleted = db_conn.execute(
         satext(
             """
             DELETE FROM articles
             WHERE slug = :slug
             AND author_user_id = :curr_user_id
+            RETURNING id
             """
         ).bindparams(slug=slug, curr_user_id=curr_user_id)
+    ).fetchone()
+
+    if not deleted:
+        return False
+
+    _invalidate_article(db_conn, deleted.id, slug)
+    call_after_commit(
+        db_conn, lambda: _AUTHOR_TIMELINES.remove(curr_user_id, deleted.id)
     )
-    return bool(result.rowcount)
+    return True
 
 
 def create_article_comment(
     db_conn: Connection, slug: str, curr_user_id: str, data: CreateCommentData
 ) -> typ.Tuple[bool, Comment]:
-    result = db_conn.execute(
-        satext(
-            """
-            INSERT INTO article_comments (article_id, commenter_user_id, body)
-            VALUES (
-                (SELECT id FROM articles WHERE slug = :slug),
-                :curr_user_id,
-                :body
+    # the author is read in the same round trip as the insert
+    with pipeline(db_conn) as p:
+        inserted = p.execute(
+            satext(
+                """
+                INSERT INTO article_comments (id, article_id, commenter_user_id, body)
+                VALUES (
+                    :id,
+                    (SELECT id FROM articles WHERE slug = :slug),
+                    :curr_user_id,
+                    :body
+                )
+                RETURNING id, created_date, body
+                """
+            ).bindparams(
+                id=str(uuid7()), slug=slug, curr_user_id=curr_user_id, body=data.body
             )
-            RETURNING id, created_date, body
-            """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id, body=data.body)
-    ).fetchone()
+        )
+        author = p.execute(_curr_profile_query(curr_user_id))
 
-    if not result:
+    if not (result := inserted.fetchone()):
         return False, None
 
-    return True, Comment(
+    return True, Comment.from_trusted(
         id=str(result.id),
         created_at=result.created_date,
         updated_at=result.created_date,
         body=result.body,
-        author=_get_curr_profile_by_id(db_conn, curr_user_id),
+        author=_curr_profile_from_row(author.one()),
     )
 
 
-def get_article_comments(
-    db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
-) -> typ.List[Comment]:
-    result = db_conn.execute(
-        satext(
-            """
+def iter_article_comments(
+    db_conn: Connection,
+    slug: str,
+    curr_user_id: typ.Optional[str],
+    yield_per: typ.Optional[int] = None,
+) -> typ.Iterator[Comment]:
+    """Pass `yield_per` to read the comments through a server-side cursor."""
+    query = satext(
+        """
             SELECT
                 ac.id,
                 ac.body,
@@ -401,30 +1200,29 @@ def get_article_comments(
             JOIN articles a ON ac.article_id = a.id
             WHERE a.slug = :slug
             """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id)
-    ).fetchall()
+    ).bindparams(slug=slug, curr_user_id=curr_user_id)
+    if yield_per:
+        query = query.execution_options(yield_per=yield_per)
 
-    if not result:
-        return []
-
-    comments = []
-    for row in result:
-        comments.append(
-            Comment(
-                id=str(row.id),
-                body=row.body,
-                created_at=row.created_date,
-                updated_at=row.updated_date,
-                author=Profile(
-                    username=row.username,
-                    bio=row.bio,
-                    image=row.image_url,
-                    following=bool(row.is_following),
-                ),
-            )
+    for row in db_conn.execute(query):
+        yield Comment.from_trusted(
+            id=str(row.id),
+            body=row.body,
+            created_at=row.created_date,
+            updated_at=row.updated_date,
+            author=Profile.from_trusted(
+                username=row.username,
+                bio=row.bio,
+                image=row.image_url,
+                following=bool(row.is_following),
+            ),
         )
 
-    return comments
+
+def get_article_comments(
+    db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
+) -> typ.List[Comment]:
+    return list(iter_article_comments(db_conn, slug, curr_user_id))
 
 
 def delete_article_comment(
@@ -443,40 +1241,187 @@ def delete_article_comment(
     return True
 
 
-def add_article_favorite(
-    db_conn: Connection, slug: str, curr_user_id: str
+# the favorite row written by add/delete, `article` holds the article by slug
+_FAVORITE_CHANGES = {
+    True: """
+        INSERT INTO article_favorites (article_id, user_id)
+        SELECT id, :user_id
+        FROM article
+        ON CONFLICT DO NOTHING
+        RETURNING article_id
+        """,
+    False: """
+        DELETE FROM article_favorites
+        WHERE article_id = (SELECT id FROM article)
+        AND user_id = :user_id
+        RETURNING article_id
+        """,
+}
+
+
+def _set_article_favorite(
+    db_conn: Connection, slug: str, curr_user_id: str, favorited: bool
 ) -> typ.Optional[Article]:
-    db_conn.execute(
+    """
+    Add or delete the favorite, adjust the denormalized count by the number of rows
+    that changed and return the article the response needs, in one statement.
+    """
+    row = db_conn.execute(
         satext(
+            f"""
+            WITH article AS (
+                SELECT
+                    id,
+                    author_user_id,
+                    slug,
+                    title,
+                    description,
+                    body,
+                    created_date,
+                    updated_date,
+                    favorites_count
+                FROM articles
+                WHERE slug = :slug
+            ),
+            changed AS ({_FAVORITE_CHANGES[favorited]}),
+            counted AS (
+                UPDATE articles
+                SET favorites_count = favorites_count + :delta * (
+                    SELECT COUNT(*) FROM changed
+                )
+                WHERE id IN (SELECT article_id FROM changed)
+                RETURNING favorites_count
+            )
+            SELECT
+                a.id,
+                a.slug,
+                a.title,
+                a.description,
+                a.body,
+                a.created_date,
+                a.updated_date,
+                -- the statement's snapshot doesn't see its own update, read it back
+                COALESCE(
+                    (SELECT favorites_count FROM counted), a.favorites_count
+                ) AS favorites_count,
+                EXISTS (SELECT 1 FROM changed) AS changed,
+                ARRAY(
+                    SELECT t.name
+                    FROM article_tags at
+                    JOIN tags t ON t.id = at.tag_id
+                    WHERE at.article_id = a.id
+                ) AS tag_list,
+                u.username AS author_username,
+                u.bio AS author_bio,
+                u.image_url AS author_image,
+                EXISTS (
+                    SELECT 1
+                    FROM user_follows uf
+                    WHERE uf.user_id = :user_id
+                    AND uf.following_user_id = u.id
+                ) AS following
+            FROM article a
+            JOIN users u ON u.id = a.author_user_id
             """
-            INSERT INTO article_favorites (article_id, user_id)
-            SELECT a.id, :user_id
-            FROM articles a
-            WHERE a.slug = :slug 
-            ON CONFLICT DO NOTHING
-            """
-        ).bindparams(slug=slug, user_id=curr_user_id)
+        ).bindparams(slug=slug, user_id=curr_user_id, delta=1 if favorited else -1)
+    ).fetchone()
+
+    if not row:
+        return None
+
+    if row.changed:
+        _invalidate_article(db_conn, row.id)
+    return Article.from_trusted(
+        slug=row.slug,
+        title=row.title,
+        description=row.description,
+        body=row.body,
+        tag_list=row.tag_list,
+        created_at=row.created_date,
+        updated_at=row.updated_date,
+        favorited=favorited,
+        favorites_count=row.favorites_count,
+        author=Profile.from_trusted(
+            username=row.author_username,
+            bio=row.author_bio,
+            image=row.author_image,
+            following=row.following,
+        ),
     )
-    return get_article_by_slug(db_conn, slug, curr_user_id)
+
+
+def add_article_favorite(
+    db_conn: Connection, slug: str, curr_user_id: str
+) -> typ.Optional[Article]:
+    return _set_article_favorite(db_conn, slug, curr_user_id, favorited=True)
 
 
 def delete_article_favorite(
     db_conn: Connection, slug: str, curr_user_id: str
 ) -> typ.Optional[Article]:
-    db_conn.execute(
+    return _set_article_favorite(db_conn, slug, curr_user_id, favorited=False)
+
+
+def repair_favorites_counts(
+    db_conn: Connection, after_id: typ.Optional[str] = None, batch_size: int = 1000
+) -> typ.Tuple[typ.Optional[str], int]:
+    """
+    Recount `articles.favorites_count` for the next `batch_size` articles ordered by
+    id after `after_id`, fixing any that drifted. Returns the last article id in the
+    batch (None once all articles were visited) and the number of repaired rows.
+
+    Run it in a transaction: the batch stays locked until it commits, so favorites
+    can't change the counts between the recount and the update.
+    """
+    # locking first waits out favorites in flight, the recount's snapshot is taken
+    # after they commit and later ones wait for the repair to commit
+    batch_ids = (
+        db_conn.execute(
+            satext(
+                """
+            SELECT id
+            FROM articles
+            WHERE CAST(:after_id AS uuid) IS NULL OR id > CAST(:after_id AS uuid)
+            ORDER BY id
+            LIMIT :batch_size
+            FOR UPDATE
+            """
+            ).bindparams(after_id=after_id, batch_size=batch_size)
+        )
+        .scalars()
+        .all()
+    )
+    if not batch_ids:
+        return None, 0
+
+    repaired = db_conn.execute(
         satext(
             """
-            DELETE FROM article_favorites
-            WHERE article_id = (
-                SELECT id
-                FROM articles
-                WHERE slug = :slug
+            WITH recounted AS MATERIALIZED (
+                SELECT
+                    b.id,
+                    (
+                        SELECT COUNT(*)
+                        FROM article_favorites f
+                        WHERE f.article_id = b.id
+                    ) AS favorites_count
+                FROM unnest(CAST(:batch_ids AS uuid[])) AS b(id)
+            ),
+            repaired AS (
+                UPDATE articles a
+                SET favorites_count = r.favorites_count
+                FROM recounted r
+                WHERE a.id = ANY(CAST(:batch_ids AS uuid[]))
+                AND a.id = r.id
+                AND a.favorites_count != r.favorites_count
+                RETURNING a.id
             )
-            AND user_id = :user_id
+            SELECT COUNT(*) FROM repaired
             """
-        ).bindparams(slug=slug, user_id=curr_user_id)
-    )
-    return get_article_by_slug(db_conn, slug, curr_user_id)
+        ).bindparams(batch_ids=[str(id_) for id_ in batch_ids])
+    ).scalar()
+
+    return str(batch_ids[-1]), repaired
 
 
 def get_all_tags(db_conn: Connection) -> typ.List[str]:
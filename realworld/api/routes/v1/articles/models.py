@@ -1,5 +1,5 @@
 import typing as typ
-from realworld.api.core.models import BaseCamelModel, Article, Comment
+from realworld.api.core.models import BaseCamelModel, Article, ArticleSummary, Comment
 
 
 # GET /api/articles
@@ -52,6 +52,13 @@ class SingleArticleResponse(BaseCamelModel):
 class MultipleArticlesResponse(BaseCamelModel):
     articles: typ.List[Article]
     articles_count: int
+    next_cursor: typ.Optional[str] = None
+
+
+class MultipleArticleSummariesResponse(BaseCamelModel):
+    articles: typ.List[ArticleSummary]
+    articles_count: int
+    next_cursor: typ.Optional[str] = None
 
 
 class MultipleCommentsResponse(BaseCamelModel):
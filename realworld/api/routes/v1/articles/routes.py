@@ -1,7 +1,19 @@
-from flask import Blueprint, request
+import json
+import typing as typ
+from flask import Blueprint, Response, request
+from flask.typing import ResponseReturnValue
 from realworld.api.core.db import get_db_connection
+from realworld.api.core.encoding import (
+    json_response,
+    raw_json_response,
+    iter_json_array,
+    streamed_json_response,
+)
 import realworld.api.routes.v1.articles.handler as articles_handler
+from realworld.api.core.models import Article, ArticleSummary, Comment, PageCursor
 from realworld.api.core.auth import validate_token, get_user_id_from_token
+from realworld.api.core.response_cache import cache_anonymous_responses
+from realworld.api.core.etag import not_modified, etag_from_content, vary_by_viewer
 from realworld.api.routes.v1.articles.models import (
     # GetArticlesQueryParams,
     # GetFeedQueryParams,
@@ -12,6 +24,7 @@ from realworld.api.routes.v1.articles.models import (
     CreateCommentResponse,
     SingleArticleResponse,
     MultipleArticlesResponse,
+    MultipleArticleSummariesResponse,
     MultipleCommentsResponse,
 )
 
@@ -19,99 +32,301 @@ from realworld.api.routes.v1.articles.models import (
 articles_blueprint = Blueprint("articles_endpoints", __name__)
 tags_blueprint = Blueprint("tags_endpoints", __name__, url_prefix="/tags")
 
+# the request parsing and response shaping below are shared with `async_routes`
+_INVALID_TOKEN = {"message": "Invalid token"}, 401
+_ARTICLE_NOT_FOUND = {"message": "Article not found"}, 404
+
+
+def _get_count_param() -> str:
+    """Raises ValueError if the `count` query parameter is not a known count mode."""
+    count_mode = request.args.get("count", articles_handler.COUNT_MODE_AUTO)
+    if count_mode not in articles_handler.COUNT_MODES:
+        raise ValueError(f"Unknown count mode: {count_mode}")
+    return count_mode
+
+
+def _get_cursor_param() -> typ.Optional[PageCursor]:
+    """Raises ValueError if the `cursor` query parameter is malformed."""
+    if not (cursor := request.args.get("cursor")):
+        return None
+
+    try:
+        return PageCursor.decode(cursor)
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
+
+
+def _get_view_param() -> str:
+    """Raises ValueError if the `view` query parameter is not a known view."""
+    view = request.args.get("view", articles_handler.VIEW_FULL)
+    if view not in articles_handler.VIEWS:
+        raise ValueError(f"Unknown view: {view}")
+    return view
+
+
+def _get_stream_param(limit: typ.Optional[int] = None) -> bool:
+    if request.args.get("stream", "").lower() in ("1", "true"):
+        return True
+    return limit is not None and limit >= articles_handler.STREAM_MIN_LIMIT
+
+
+class _PageParams(typ.NamedTuple):
+    cursor: typ.Optional[PageCursor]
+    count_mode: str
+    view: str
+    limit: int
+    offset: int
+
+
+def _get_page_params() -> _PageParams:
+    """Raises ValueError if a query parameter of article lists is malformed."""
+    return _PageParams(
+        cursor=_get_cursor_param(),
+        count_mode=_get_count_param(),
+        view=_get_view_param(),
+        limit=int(request.args.get("limit", 20)),
+        offset=int(request.args.get("offset", 0)),
+    )
+
+
+def _get_filters() -> typ.Dict[str, typ.Optional[str]]:
+    return dict(
+        filter_tag=request.args.get("tag"),
+        author_username_filter=request.args.get("author"),
+        favorited_by_username_filter=request.args.get("favorited"),
+    )
+
+
+def _articles_stream_end(
+    articles: articles_handler.ArticleStream, articles_count: int
+) -> str:
+    return (
+        f',"articlesCount":{articles_count},'
+        f'"nextCursor":{json.dumps(articles.next_cursor)}}}\n'
+    )
+
+
+def _streamed_articles_response(
+    curr_user_id: typ.Optional[str], count_mode: str, filters: dict, **query_kwargs
+) -> Response:
+    """
+    Same body as `_multiple_articles_response`, sent while the articles are read.
+    The count and next cursor come last (keys are sorted), once they are known.
+    """
+
+    def generate() -> typ.Iterator[str]:
+        # server-side cursors need a transaction
+        with get_db_connection(read_only=False) as db_conn:
+            articles = articles_handler.ArticleStream(
+                db_conn, curr_user_id=curr_user_id, **query_kwargs, **filters
+            )
+            yield '{"articles":'
+            yield from iter_json_array(articles)
+
+            articles_count = (
+                articles.count
+                if count_mode == articles_handler.COUNT_MODE_NONE
+                else articles_handler.count_articles(
+                    db_conn, mode=count_mode, **filters
+                )
+            )
+            yield _articles_stream_end(articles, articles_count)
+
+    return streamed_json_response(generate())
+
+
+def _multiple_articles_response(
+    articles: typ.Union[typ.List[ArticleSummary], articles_handler.ArticlesJSON],
+    articles_count: int,
+    next_cursor: typ.Optional[str],
+    view: str,
+) -> Response:
+    if isinstance(articles, articles_handler.ArticlesJSON):
+        # same envelope as an encoded MultipleArticlesResponse, around the page
+        # Postgres already encoded
+        return raw_json_response(
+            f'{{"articles":{articles.json},"articlesCount":{articles_count},'
+            f'"nextCursor":{json.dumps(next_cursor)}}}\n'
+        )
+
+    response_cls = (
+        MultipleArticlesResponse
+        if view == articles_handler.VIEW_FULL
+        else MultipleArticleSummariesResponse
+    )
+    return json_response(
+        response_cls(
+            articles=articles,
+            articles_count=articles_count,
+            next_cursor=next_cursor,
+        )
+    )
+
+
+def _article_response(
+    article: typ.Optional[Article], etag: typ.Optional[str] = None
+) -> ResponseReturnValue:
+    if not article:
+        return _ARTICLE_NOT_FOUND
+
+    response = json_response(SingleArticleResponse(article=article))
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+def _comment_response(comment: typ.Optional[Comment]) -> ResponseReturnValue:
+    # None when there's no article to comment on
+    if not comment:
+        return _ARTICLE_NOT_FOUND
+    return json_response(CreateCommentResponse(comment=comment))
+
 
 @articles_blueprint.route("/articles", methods=["GET"])
-def get_articles() -> dict:
+@cache_anonymous_responses(articles_handler.ANONYMOUS_RESPONSE_CACHE)
+def get_articles() -> ResponseReturnValue:
     """
-    Returns most recent articles globally by default, provide tag, author or favorited query parameter to filter results
+    Returns most recent articles globally by default, provide tag, author or favorited query parameter to filter results.
+    Pass the returned `nextCursor` as `cursor` to fetch the next page (`offset` is still supported).
+    `count` selects how `articlesCount` is computed: auto (default), exact, estimate or none.
+    `view=summary` leaves out the article bodies.
+    Large pages (or `stream=true`) are streamed as the articles are read.
     """
     user_id = get_user_id_from_token()
+    try:
+        params = _get_page_params()
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    filters = _get_filters()
+    if _get_stream_param(params.limit):
+        return _streamed_articles_response(
+            user_id,
+            params.count_mode,
+            filters,
+            cursor=params.cursor,
+            limit=params.limit,
+            offset=params.offset,
+            view=params.view,
+        )
+
     with get_db_connection() as db_conn:
-        articles = articles_handler.get_articles(
+        articles, next_cursor = articles_handler.get_articles(
             db_conn,
             curr_user_id=user_id,
-            filter_tag=request.args.get("tag"),
-            author_username_filter=request.args.get("author"),
-            favorited_by_username_filter=request.args.get("favorited"),
-            limit=int(request.args.get("limit", 20)),
-            offset=int(request.args.get("offset", 0)),
+            cursor=params.cursor,
+            limit=params.limit,
+            offset=params.offset,
+            view=params.view,
+            **filters,
+        )
+        articles_count = (
+            len(articles)
+            if params.count_mode == articles_handler.COUNT_MODE_NONE
+            else articles_handler.count_articles(
+                db_conn, mode=params.count_mode, **filters
+            )
         )
 
-    return MultipleArticlesResponse(
-        articles=articles,
-        articles_count=len(articles),
-    ).model_dump()
+    return _multiple_articles_response(
+        articles, articles_count, next_cursor, params.view
+    )
 
 
 @validate_token
 @articles_blueprint.route("/articles/feed", methods=["GET"])
-def get_feed() -> dict:
+def get_feed() -> ResponseReturnValue:
     """
     Returns articles created by followed users, ordered by most recent first.
+    Takes the same `cursor`, `count` and `view` parameters as the article list.
     """
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
+
+    try:
+        params = _get_page_params()
+    except ValueError as e:
+        return {"message": str(e)}, 400
 
     with get_db_connection() as db_conn:
-        articles = articles_handler.get_feed_articles(
+        articles, next_cursor = articles_handler.get_feed_articles(
             db_conn,
             user_id,
-            limit=int(request.args.get("limit", 20)),
-            offset=int(request.args.get("offset", 0)),
+            cursor=params.cursor,
+            limit=params.limit,
+            offset=params.offset,
+            view=params.view,
+        )
+        articles_count = (
+            len(articles)
+            if params.count_mode == articles_handler.COUNT_MODE_NONE
+            else articles_handler.count_articles(
+                db_conn,
+                mode=params.count_mode,
+                curr_user_id=user_id,
+                curr_user_feed=True,
+            )
         )
 
-    return MultipleArticlesResponse(
-        articles=articles,
-        articles_count=len(articles),
-    ).model_dump()
+    return _multiple_articles_response(
+        articles, articles_count, next_cursor, params.view
+    )
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["GET"])
-def get_article(slug: str) -> dict:
+@vary_by_viewer
+def get_article(slug: str) -> ResponseReturnValue:
+    """
+    Supports conditional GETs, a matching If-None-Match is answered with a 304 after a
+    single probe query.
+    """
     with get_db_connection() as db_conn:
-        article = articles_handler.get_article_by_slug(
+        version = articles_handler.get_article_version(
             db_conn, slug, curr_user_id=get_user_id_from_token()
         )
-        if not article:
-            return {"message": "Article not found"}, 404
+        if not version:
+            return _ARTICLE_NOT_FOUND
+
+        if response := not_modified(version.etag):
+            return response
+
+        article = articles_handler.get_article_by_version(db_conn, version)
 
-    return SingleArticleResponse(article=article).model_dump()
+    return _article_response(article, etag=version.etag)
 
 
 @articles_blueprint.route("/articles", methods=["POST"])
-def create_article() -> dict:
+def create_article() -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
 
     data = CreateArticleRequest.model_validate(request.json)
     with get_db_connection() as db_conn:
         article = articles_handler.create_article(db_conn, user_id, data.article)
 
-    return SingleArticleResponse(article=article).model_dump()
+    return _article_response(article)
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["PUT"])
-def update_article(slug) -> dict:
+def update_article(slug) -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
 
     data = UpdateArticleRequest.model_validate(request.json)
     with get_db_connection() as db_conn:
         article = articles_handler.update_article(db_conn, slug, user_id, data.article)
-        if not article:
-            return {"message": "Article not found"}, 404
 
-    return SingleArticleResponse(article=article).model_dump()
+    return _article_response(article)
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["DELETE"])
-def delete_article(slug: str) -> dict:
+def delete_article(slug: str) -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
 
     with get_db_connection() as db_conn:
         if not articles_handler.delete_article(db_conn, slug, user_id):
-            return {"message": "Article not found"}, 404
+            return _ARTICLE_NOT_FOUND
 
     return {"message": "Article deleted"}
 
@@ -120,38 +335,63 @@ def delete_article(slug: str) -> dict:
 # Comments
 #
 @articles_blueprint.route("/articles/<string:slug>/comments", methods=["POST"])
-def create_comment(slug: str) -> dict:
+def create_comment(slug: str) -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
 
     data = CreateCommentRequest.model_validate(request.json)
 
     with get_db_connection() as db_conn:
-        does_article_exist, comment = articles_handler.create_article_comment(
+        _, comment = articles_handler.create_article_comment(
             db_conn, slug, user_id, data.comment
         )
-        if not does_article_exist:
-            return {"message": "Article not found"}, 404
 
-    return CreateCommentResponse(comment=comment).model_dump()
+    return _comment_response(comment)
+
+
+def _streamed_comments_response(slug: str, curr_user_id: typ.Optional[str]) -> Response:
+    """Same body as a `MultipleCommentsResponse`, sent while the comments are read."""
+
+    def generate() -> typ.Iterator[str]:
+        # server-side cursors need a transaction
+        with get_db_connection(read_only=False) as db_conn:
+            yield '{"comments":'
+            yield from iter_json_array(
+                articles_handler.iter_article_comments(
+                    db_conn,
+                    slug,
+                    curr_user_id,
+                    yield_per=articles_handler.STREAM_BATCH_SIZE,
+                )
+            )
+            yield "}\n"
+
+    return streamed_json_response(generate())
 
 
 @articles_blueprint.route("/articles/<string:slug>/comments", methods=["GET"])
-def get_comments(slug: str) -> dict:
+@vary_by_viewer
+@etag_from_content
+def get_comments(slug: str) -> ResponseReturnValue:
+    """`stream=true` streams the comments as they're read (without an ETag)."""
+    curr_user_id = get_user_id_from_token()
+    if _get_stream_param():
+        return _streamed_comments_response(slug, curr_user_id)
+
     with get_db_connection() as db_conn:
         comments = articles_handler.get_article_comments(
-            db_conn, slug, curr_user_id=get_user_id_from_token()
+            db_conn, slug, curr_user_id=curr_user_id
         )
 
-    return MultipleCommentsResponse(comments=comments).model_dump()
+    return json_response(MultipleCommentsResponse(comments=comments))
 
 
 @articles_blueprint.route(
     "/articles/<string:slug>/comments/<string:comment_id>", methods=["DELETE"]
 )
-def delete_comment(slug: str, comment_id: str) -> dict:
+def delete_comment(slug: str, comment_id: str) -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
 
     with get_db_connection() as db_conn:
         articles_handler.delete_article_comment(db_conn, slug, comment_id, user_id)
@@ -163,37 +403,35 @@ def delete_comment(slug: str, comment_id: str) -> dict:
 # Favorites
 #
 @articles_blueprint.route("/articles/<string:slug>/favorite", methods=["POST"])
-def favorite_article(slug: str) -> dict:
+def favorite_article(slug: str) -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
 
     with get_db_connection() as db_conn:
         article = articles_handler.add_article_favorite(db_conn, slug, user_id)
-        if not article:
-            return {"message": "Article not found"}, 404
 
-    return SingleArticleResponse(article=article).model_dump()
+    return _article_response(article)
 
 
 @articles_blueprint.route("/articles/<string:slug>/favorite", methods=["DELETE"])
-def unfavorite_article(slug: str) -> dict:
+def unfavorite_article(slug: str) -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"message": "Invalid token"}, 401
+        return _INVALID_TOKEN
 
     with get_db_connection() as db_conn:
         article = articles_handler.delete_article_favorite(db_conn, slug, user_id)
-        if not article:
-            return {"message": "Article not found"}, 404
 
-    return SingleArticleResponse(article=article).model_dump()
+    return _article_response(article)
 
 
 #
 # Tags
 #
 @tags_blueprint.route("", methods=["GET"])
-def get_tags() -> dict:
+@etag_from_content
+@cache_anonymous_responses(articles_handler.ANONYMOUS_RESPONSE_CACHE)
+def get_tags() -> ResponseReturnValue:
     with get_db_connection() as db_conn:
         tags = articles_handler.get_all_tags(db_conn)
 
-    return GetTagsResponse(tags=tags).model_dump()
+    return json_response(GetTagsResponse(tags=tags))
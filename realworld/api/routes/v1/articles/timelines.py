@@ -0,0 +1,151 @@
+import heapq
+import itertools
+import threading
+import typing as typ
+from datetime import datetime
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import text as satext
+from realworld.api.core.cache import TTLCache
+
+# (created_date, article_id), compared the same way the feed is sorted
+TimelineEntry = typ.Tuple[datetime, str]
+
+
+class Timeline(typ.NamedTuple):
+    entries: typ.Tuple[TimelineEntry, ...]  # newest first
+    complete: bool  # False if the author has older articles than `entries`
+
+
+class AuthorTimelines:
+    """
+    Process-local cache of the most recent `length` article keys of up to `max_authors`
+    authors, filled lazily from the database and kept current by `add` / `remove`.
+    Entries expire after `ttl` seconds to pick up writes made by other processes.
+    """
+
+    def __init__(
+        self, max_authors: int, length: int, ttl: float, name: typ.Optional[str] = None
+    ):
+        self.length = length
+        self._cache = TTLCache(maxsize=max_authors, ttl=ttl, name=name)
+        self._write_lock = threading.Lock()
+
+    def stats(self) -> typ.Dict[str, int]:
+        return self._cache.stats()
+
+    def get_many(
+        self, db_conn: Connection, author_ids: typ.Iterable[str]
+    ) -> typ.List[Timeline]:
+        timelines, missing = [], []
+        # keyed by str ids, as `add` / `remove` are called with those of the JWT
+        for author_id in map(str, author_ids):
+            if (timeline := self._cache.get(author_id)) is None:
+                missing.append(author_id)
+            else:
+                timelines.append(timeline)
+
+        if missing:
+            loaded = self._load(db_conn, missing)
+            for author_id in missing:
+                timelines.append(loaded[author_id])
+                self._cache.set(author_id, loaded[author_id])
+
+        return timelines
+
+    def _load(
+        self, db_conn: Connection, author_ids: typ.List[str]
+    ) -> typ.Dict[str, Timeline]:
+        # one extra row per author tells us whether the timeline is complete
+        rows = db_conn.execute(
+            satext(
+                """
+                SELECT au.author_id, recent.created_date, recent.id
+                FROM unnest(CAST(:author_ids AS uuid[])) AS au(author_id)
+                CROSS JOIN LATERAL (
+                    SELECT a.created_date, a.id
+                    FROM articles a
+                    WHERE a.author_user_id = au.author_id
+                    ORDER BY a.created_date DESC, a.id DESC
+                    LIMIT :length
+                ) recent
+                """
+            ).bindparams(author_ids=author_ids, length=self.length + 1)
+        ).fetchall()
+
+        entries = {author_id: [] for author_id in author_ids}
+        for row in rows:
+            # str ids, like those of the page cursors they're compared with
+            entries[str(row.author_id)].append((row.created_date, str(row.id)))
+
+        return {
+            author_id: Timeline(
+                entries=tuple(author_entries[: self.length]),
+                complete=len(author_entries) <= self.length,
+            )
+            for author_id, author_entries in entries.items()
+        }
+
+    def add(self, author_id: str, article_id: str, created_date: datetime):
+        with self._write_lock:
+            if (timeline := self._cache.get(author_id)) is None:
+                return
+
+            entries = sorted(
+                (*timeline.entries, (created_date, article_id)), reverse=True
+            )
+            self._cache.set(
+                author_id,
+                Timeline(
+                    entries=tuple(entries[: self.length]),
+                    complete=timeline.complete and len(entries) <= self.length,
+                ),
+            )
+
+    def remove(self, author_id: str, article_id: str):
+        with self._write_lock:
+            if (timeline := self._cache.get(author_id)) is None:
+                return
+
+            if not timeline.complete:
+                # can't refill a truncated timeline from memory, reload it lazily
+                self._cache.delete(author_id)
+                return
+
+            entries = tuple(
+                entry for entry in timeline.entries if entry[1] != article_id
+            )
+            self._cache.set(author_id, Timeline(entries=entries, complete=True))
+
+
+def merge_timelines(
+    timelines: typ.List[Timeline],
+    *,
+    after: typ.Optional[TimelineEntry],
+    offset: int,
+    limit: int,
+) -> typ.Optional[typ.Tuple[typ.List[TimelineEntry], bool]]:
+    """
+    k-way merge of newest-first timelines into one page of `limit` entries, skipping
+    `offset` entries and everything up to and including `after`. Returns the page and
+    whether more entries follow, or None if the page reaches past the oldest entry of
+    a truncated timeline (that author may have articles missing from the page).
+    """
+    # every entry at or above the horizon is known to be in the merged stream
+    horizon = max(
+        (timeline.entries[-1] for timeline in timelines if not timeline.complete),
+        default=None,
+    )
+
+    merged = heapq.merge(*(timeline.entries for timeline in timelines), reverse=True)
+    if after:
+        merged = itertools.dropwhile(lambda entry: entry >= after, merged)
+
+    page = list(itertools.islice(merged, offset, offset + limit + 1))
+    if horizon is None:
+        return page[:limit], len(page) > limit
+
+    if len(page) < limit or page[limit - 1] < horizon:
+        return None
+
+    # truncated timelines always have more entries to come
+    return page[:limit], True
@@ -0,0 +1,52 @@
+from functools import partial
+from flask import Blueprint
+from flask.typing import ResponseReturnValue
+from realworld.api.core.async_db import run_handler
+from realworld.api.core.auth import get_user_id_from_token
+from realworld.api.core.etag import etag_from_content, vary_by_viewer
+from realworld.api.routes.v1.profiles.routes import _profile_response
+import realworld.api.routes.v1.profiles.handler as profiles_handler
+
+# `realworld.api.routes.v1.profiles.routes` for the ASGI app, on async connections
+profiles_blueprint = Blueprint("profiles_endpoints", __name__, url_prefix="/profiles")
+
+
+@profiles_blueprint.route("/<string:username>", methods=["GET"])
+@vary_by_viewer
+@etag_from_content
+async def get_profile(username) -> ResponseReturnValue:
+    profile = await run_handler(
+        partial(
+            profiles_handler.get_profile,
+            username=username,
+            curr_user_id=get_user_id_from_token(),
+        )
+    )
+
+    return _profile_response(profile)
+
+
+@profiles_blueprint.route("/<string:username>/follow", methods=["POST"])
+async def follow_profile(username):
+    profile = await run_handler(
+        partial(
+            profiles_handler.follow_profile,
+            username=username,
+            curr_user_id=get_user_id_from_token(),
+        )
+    )
+
+    return _profile_response(profile)
+
+
+@profiles_blueprint.route("/<string:username>/follow", methods=["DELETE"])
+async def unfollow_profile(username):
+    profile = await run_handler(
+        partial(
+            profiles_handler.unfollow_profile,
+            username=username,
+            curr_user_id=get_user_id_from_token(),
+        )
+    )
+
+    return _profile_response(profile)
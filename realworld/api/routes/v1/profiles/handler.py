@@ -1,8 +1,12 @@
+import os
 import typing as typ
 from sqlalchemy.engine import Connection
 from sqlalchemy.sql import text as satext
 from realworld.api.routes.v1.profiles.models import ProfileData
 
+# most recent articles of a newly followed author copied into the follower's feed
+FEED_BACKFILL_LIMIT = int(os.getenv("FEED_BACKFILL_LIMIT", "1000"))
+
 
 def get_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
@@ -32,7 +36,7 @@ def get_profile(
     if not result:
         return None
 
-    return ProfileData(
+    return ProfileData.from_trusted(
         username=result.username,
         bio=result.bio,
         image=result.image_url,
@@ -43,32 +47,91 @@ def get_profile(
 def follow_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
 ) -> typ.Optional[ProfileData]:
-    db_conn.execute(
+    result = db_conn.execute(
         satext(
             """
-            INSERT INTO user_follows (user_id, following_user_id)
-            SELECT :curr_user_id, u.id
-            FROM users u
-            WHERE u.username = :username
-            ON CONFLICT (user_id, following_user_id) DO NOTHING
-           """
-        ).bindparams(username=username, curr_user_id=curr_user_id)
-    )
+            WITH target AS (
+                SELECT id, username, bio, image_url
+                FROM users
+                WHERE username = :username
+            ),
+            followed AS (
+                INSERT INTO user_follows (user_id, following_user_id)
+                SELECT :curr_user_id, id
+                FROM target
+                ON CONFLICT (user_id, following_user_id) DO NOTHING
+                RETURNING following_user_id
+            ),
+            backfilled AS (
+                INSERT INTO feed_items (user_id, article_id, created_date)
+                SELECT :curr_user_id, recent.id, recent.created_date
+                FROM followed f
+                CROSS JOIN LATERAL (
+                    SELECT a.id, a.created_date
+                    FROM articles a
+                    WHERE a.author_user_id = f.following_user_id
+                    ORDER BY a.created_date DESC
+                    LIMIT :backfill_limit
+                ) recent
+                ON CONFLICT DO NOTHING
+            )
+            SELECT username, bio, image_url
+            FROM target
+            """
+        ).bindparams(
+            username=username,
+            curr_user_id=curr_user_id,
+            backfill_limit=FEED_BACKFILL_LIMIT,
+        )
+    ).fetchone()
 
-    return get_profile(db_conn, username, curr_user_id)
+    if not result:
+        return None
+
+    return ProfileData.from_trusted(
+        username=result.username,
+        bio=result.bio,
+        image=result.image_url,
+        following=True,
+    )
 
 
 def unfollow_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
 ) -> typ.Optional[ProfileData]:
-    db_conn.execute(
+    result = db_conn.execute(
         satext(
             """
-            DELETE FROM user_follows
-            WHERE user_id = :curr_user_id
-            AND following_user_id = (SELECT id FROM users WHERE username = :username)
+            WITH target AS (
+                SELECT id, username, bio, image_url
+                FROM users
+                WHERE username = :username
+            ),
+            unfollowed AS (
+                DELETE FROM user_follows
+                WHERE user_id = :curr_user_id
+                AND following_user_id = (SELECT id FROM target)
+                RETURNING following_user_id
+            ),
+            unfed AS (
+                DELETE FROM feed_items fi
+                USING articles a, unfollowed uf
+                WHERE fi.user_id = :curr_user_id
+                AND fi.article_id = a.id
+                AND a.author_user_id = uf.following_user_id
+            )
+            SELECT username, bio, image_url
+            FROM target
             """
         ).bindparams(username=username, curr_user_id=curr_user_id)
-    )
+    ).fetchone()
+
+    if not result:
+        return None
 
-    return get_profile(db_conn, username, curr_user_id)
+    return ProfileData.from_trusted(
+        username=result.username,
+        bio=result.bio,
+        image=result.image_url,
+        following=False,
+    )
@@ -1,31 +1,44 @@
+import typing as typ
 from flask import Blueprint
+from flask.typing import ResponseReturnValue
 from realworld.api.core.db import get_db_connection
+from realworld.api.core.encoding import json_response
 from realworld.api.core.auth import validate_token, get_user_id_from_token
+from realworld.api.core.etag import etag_from_content, vary_by_viewer
 from realworld.api.routes.v1.profiles.models import ProfileDataResponse, ProfileData
 import realworld.api.routes.v1.profiles.handler as profiles_handler
 
 profiles_blueprint = Blueprint("profiles_endpoints", __name__, url_prefix="/profiles")
 
 
+def _profile_response(profile: typ.Optional[ProfileData]) -> ResponseReturnValue:
+    """Shared with `async_routes`."""
+    if not profile:
+        return {"error": "Profile not found."}, 404
+
+    return json_response(
+        ProfileDataResponse(
+            profile=ProfileData(
+                username=profile.username,
+                bio=profile.bio,
+                image=profile.image,
+                following=profile.following,
+            )
+        )
+    )
+
+
 @profiles_blueprint.route("/<string:username>", methods=["GET"])
-def get_profile(username) -> dict:
+@vary_by_viewer
+@etag_from_content
+def get_profile(username) -> ResponseReturnValue:
 
     with get_db_connection() as db_conn:
-        if not (
-            profile := profiles_handler.get_profile(
-                db_conn, username, get_user_id_from_token()
-            )
-        ):
-            return {"error": "Profile not found."}, 404
-
-    return ProfileDataResponse(
-        profile=ProfileData(
-            username=profile.username,
-            bio=profile.bio,
-            image=profile.image,
-            following=profile.following,
+        profile = profiles_handler.get_profile(
+            db_conn, username, get_user_id_from_token()
         )
-    ).model_dump()
+
+    return _profile_response(profile)
 
 
 @validate_token
@@ -33,21 +46,11 @@ def get_profile(username) -> dict:
 def follow_profile(username):
 
     with get_db_connection() as db_conn:
-        if not (
-            profile := profiles_handler.follow_profile(
-                db_conn, username, get_user_id_from_token()
-            )
-        ):
-            return {"error": "Profile not found."}, 404
-
-    return ProfileDataResponse(
-        profile=ProfileData(
-            username=profile.username,
-            bio=profile.bio,
-            image=profile.image,
-            following=profile.following,
+        profile = profiles_handler.follow_profile(
+            db_conn, username, get_user_id_from_token()
         )
-    ).model_dump()
+
+    return _profile_response(profile)
 
 
 @validate_token
@@ -55,18 +58,8 @@ def follow_profile(username):
 def unfollow_profile(username):
 
     with get_db_connection() as db_conn:
-        if not (
-            profile := profiles_handler.unfollow_profile(
-                db_conn, username, get_user_id_from_token()
-            )
-        ):
-            return {"error": "Profile not found."}, 404
-
-    return ProfileDataResponse(
-        profile=ProfileData(
-            username=profile.username,
-            bio=profile.bio,
-            image=profile.image,
-            following=profile.following,
+        profile = profiles_handler.unfollow_profile(
+            db_conn, username, get_user_id_from_token()
         )
-    ).model_dump()
+
+    return _profile_response(profile)
@@ -0,0 +1,72 @@
+from functools import partial
+from flask import Blueprint, request
+from flask.typing import ResponseReturnValue
+from realworld.api.core.async_db import run_handler
+from realworld.api.core.auth import get_user_id_from_token
+from realworld.api.routes.v1.users import handler as users_handler
+from realworld.api.routes.v1.users.routes import (
+    _INVALID_TOKEN,
+    _USER_EXISTS,
+    _user_response,
+    _auth_user_response,
+)
+from realworld.api.routes.v1.users.models import (
+    RegisterUserRequest,
+    UpdateUserRequest,
+    LoginUserRequest,
+)
+
+# `realworld.api.routes.v1.users.routes` for the ASGI app, on async connections
+users_blueprint = Blueprint(
+    "users_endpoints",
+    __name__,
+)
+
+
+@users_blueprint.route("/users", methods=["POST"])
+async def create_user() -> ResponseReturnValue:
+    data = RegisterUserRequest.model_validate(request.json)
+    if not (
+        user := await run_handler(partial(users_handler.create_user, data=data.user))
+    ):
+        return _USER_EXISTS
+
+    return _auth_user_response(user)
+
+
+@users_blueprint.route("/users/login", methods=["POST"])
+async def authenticate_user() -> ResponseReturnValue:
+    data = LoginUserRequest.model_validate(request.json)
+    user = await run_handler(
+        partial(
+            users_handler.validate_user_creds,
+            email=data.user.email,
+            password=data.user.password,
+        )
+    )
+
+    return _auth_user_response(user)
+
+
+@users_blueprint.route("/user", methods=["GET"])
+async def get_current_user() -> ResponseReturnValue:
+    if not (user_id := get_user_id_from_token()):
+        return _INVALID_TOKEN
+
+    user = await run_handler(partial(users_handler.get_user, user_id=user_id))
+
+    return _user_response(user)
+
+
+@users_blueprint.route("/user", methods=["PUT"])
+async def update_user() -> ResponseReturnValue:
+    data = UpdateUserRequest.model_validate(request.json)
+    user = await run_handler(
+        partial(
+            users_handler.update_user,
+            user_id=get_user_id_from_token(),
+            data=data.user,
+        )
+    )
+
+    return _user_response(user)
@@ -6,6 +6,7 @@ from sqlalchemy.sql import text as satext
 from sqlalchemy.exc import IntegrityError
 
 from realworld.api.core.models import DBUser
+from realworld.api.routes.v1.articles.handler import invalidate_author_articles
 from .models import UpdateUserData, RegisterUserData, UserData
 
 
@@ -42,7 +43,7 @@ def create_user(db_conn: Connection, data: RegisterUserData) -> typ.Optional[DBU
         return None
 
     if result:
-        return DBUser(
+        return DBUser.from_trusted(
             user_id=str(result.id),
             username=result.username,
             email=result.email,
@@ -58,13 +59,26 @@ def update_user(
     result = db_conn.execute(
         satext(
             """
-            UPDATE users
+            WITH prev AS (
+                SELECT id, bio, image_url
+                FROM users
+                WHERE id = :user_id
+                FOR UPDATE
+            )
+            UPDATE users u
             SET email = :email,
                 bio = :bio,
                 image_url = :image,
                 updated_date = CURRENT_TIMESTAMP
-            WHERE id = :user_id
-            RETURNING username, email, bio, image_url
+            FROM prev
+            WHERE u.id = prev.id
+            RETURNING
+                u.username,
+                u.email,
+                u.bio,
+                u.image_url,
+                prev.bio AS prev_bio,
+                prev.image_url AS prev_image_url
             """
         ).bindparams(
             user_id=user_id,
@@ -75,7 +89,11 @@ def update_user(
     ).fetchone()
 
     if result:
-        return UserData(
+        # cached articles embed the author profile
+        if (result.bio, result.image_url) != (result.prev_bio, result.prev_image_url):
+            invalidate_author_articles(db_conn, user_id)
+
+        return UserData.from_trusted(
             username=result.username,
             email=result.email,
             bio=result.bio,
@@ -101,7 +119,7 @@ def validate_user_creds(
         return None
 
     if is_valid_password(password, result.password_hash):
-        return DBUser(
+        return DBUser.from_trusted(
             user_id=str(result.id),
             username=result.username,
             email=result.email,
@@ -124,7 +142,7 @@ def get_user(db_conn: Connection, user_id: str) -> typ.Optional[UserData]:
     ).fetchone()
 
     if result:
-        return UserData(
+        return UserData.from_trusted(
             username=result.username,
             email=result.email,
             bio=result.bio,
@@ -1,11 +1,16 @@
+import typing as typ
 from flask import Blueprint, request
+from flask.typing import ResponseReturnValue
 from realworld.api.core.db import get_db_connection
+from realworld.api.core.models import DBUser
+from realworld.api.core.encoding import json_response
 from realworld.api.core.auth import generate_jwt, validate_token, get_user_id_from_token
 from realworld.api.routes.v1.users import handler as users_handler
 from realworld.api.routes.v1.users.models import (
     RegisterUserRequest,
     UpdateUserRequest,
     LoginUserRequest,
+    UserData,
     UserDataResponse,
     AuthUser,
     AuthUserResponse,
@@ -17,70 +22,73 @@ users_blueprint = Blueprint(
     __name__,
 )
 
+# the response shaping below is shared with `async_routes`
+_INVALID_TOKEN = {"error": "Invalid token."}, 401
+_USER_NOT_FOUND = {"error": "User does not exist."}, 404
+_USER_EXISTS = {"error": "A user with this username already exists."}, 409
+
+
+def _auth_user_response(user: typ.Optional[DBUser]) -> ResponseReturnValue:
+    if not user:
+        return _USER_NOT_FOUND
+
+    return json_response(
+        AuthUserResponse(
+            user=AuthUser(
+                email=user.email,
+                token=generate_jwt(user.user_id),
+                username=user.username,
+                bio=user.bio,
+                image=user.image,
+            )
+        )
+    )
+
+
+def _user_response(user: typ.Optional[UserData]) -> ResponseReturnValue:
+    if not user:
+        return _USER_NOT_FOUND
+    return json_response(UserDataResponse(user=user))
+
 
 @users_blueprint.route("/users", methods=["POST"])
-def create_user() -> dict:
+def create_user() -> ResponseReturnValue:
     data = RegisterUserRequest.model_validate(request.json)
     with get_db_connection() as db_conn:
         if not (user := users_handler.create_user(db_conn, data.user)):
-            return {"error": "A user with this username already exists."}, 409
-
-    return AuthUserResponse(
-        user=AuthUser(
-            email=user.email,
-            token=generate_jwt(user.user_id),
-            username=user.username,
-            bio=user.bio,
-            image=user.image,
-        )
-    ).model_dump()
+            return _USER_EXISTS
+
+    return _auth_user_response(user)
 
 
 @users_blueprint.route("/users/login", methods=["POST"])
-def authenticate_user() -> dict:
+def authenticate_user() -> ResponseReturnValue:
     data = LoginUserRequest.model_validate(request.json)
     with get_db_connection() as db_conn:
-        if not (
-            user := users_handler.validate_user_creds(
-                db_conn, email=data.user.email, password=data.user.password
-            )
-        ):
-            return {"error": "User does not exist."}, 404
-
-    return AuthUserResponse(
-        user=AuthUser(
-            email=user.email,
-            token=generate_jwt(user.user_id),
-            username=user.username,
-            bio=user.bio,
-            image=user.image,
+        user = users_handler.validate_user_creds(
+            db_conn, email=data.user.email, password=data.user.password
         )
-    ).model_dump()
+
+    return _auth_user_response(user)
 
 
 @validate_token
 @users_blueprint.route("/user", methods=["GET"])
-def get_current_user() -> dict:
+def get_current_user() -> ResponseReturnValue:
     if not (user_id := get_user_id_from_token()):
-        return {"error": "Invalid token."}, 401
+        return _INVALID_TOKEN
 
     with get_db_connection() as db_conn:
-        if user := users_handler.get_user(db_conn, user_id):
-            return UserDataResponse(user=user).model_dump()
+        user = users_handler.get_user(db_conn, user_id)
 
-    return {"error": "User does not exist."}, 404
+    return _user_response(user)
 
 
 @validate_token
 @users_blueprint.route("/user", methods=["PUT"])
-def update_user() -> dict:
+def update_user() -> ResponseReturnValue:
     data = UpdateUserRequest.model_validate(request.json)
     with get_db_connection() as db_conn:
-        if not (
-            user := users_handler.update_user(
-                db_conn, get_user_id_from_token(), data.user
-            )
-        ):
-            return {"error": "User does not exist."}, 404
+        user = users_handler.update_user(db_conn, get_user_id_from_token(), data.user)
 
-    return UserDataResponse(user=user).model_dump()
+    return _user_response(user)
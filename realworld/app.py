@@ -1,6 +1,11 @@
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
 from pydantic import ValidationError
+from realworld.api.core.db import get_db_connection, pool_stats
+from realworld.api.core.cache import cache_stats
+from realworld.api.core.compression import init_compression
+import realworld.api.routes.v1.articles.handler as articles_handler
 from realworld.api.routes.v1.users.routes import users_blueprint
 from realworld.api.routes.v1.profiles.routes import profiles_blueprint
 from realworld.api.routes.v1.articles.routes import articles_blueprint, tags_blueprint
@@ -9,8 +14,10 @@ from realworld.api.routes.v1.articles.routes import articles_blueprint, tags_blu
 def create_app() -> Flask:
     app = Flask(__name__)
     CORS(app)
+    init_compression(app)
     _register_blueprints(app)
     _register_error_handlers(app)
+    _register_commands(app)
     return app
 
 
@@ -28,6 +35,10 @@ def _register_blueprints(app: Flask):
     def ping():
         return "pong"
 
+    @app.route("/api/metrics")
+    def metrics():
+        return {"caches": cache_stats(), "db_pool": pool_stats()}
+
 
 def _register_error_handlers(app: Flask):
     @app.errorhandler(ValidationError)
@@ -37,4 +48,23 @@ def _register_error_handlers(app: Flask):
         return response
 
 
+def _register_commands(app: Flask):
+    @app.cli.command("repair-favorites-count")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def repair_favorites_count(batch_size: int):
+        """Recount articles.favorites_count in batches, fixing drifted values."""
+        after_id, total_repaired = None, 0
+        while True:
+            # one transaction per batch to keep row locks short
+            with get_db_connection() as db_conn:
+                after_id, repaired = articles_handler.repair_favorites_counts(
+                    db_conn, after_id=after_id, batch_size=batch_size
+                )
+            total_repaired += repaired
+            if after_id is None:
+                break
+
+        click.echo(f"Repaired favorites_count on {total_repaired} article(s).")
+
+
 app = create_app()
@@ -0,0 +1,56 @@
+"""
+The app of `realworld.app` served over ASGI, e.g. `uvicorn realworld.asgi:asgi_app`:
+the same endpoints, with async views on asyncpg connections, so a worker keeps
+serving other requests while one waits for Postgres.
+"""
+
+from flask_cors import CORS
+import realworld.api.core.async_db as async_db
+from realworld.api.core.asgi import AsyncFlask
+from realworld.api.core.cache import cache_stats
+from realworld.api.core.compression import init_compression
+from realworld.app import _register_error_handlers, _register_commands
+from realworld.api.routes.v1.users.async_routes import users_blueprint
+from realworld.api.routes.v1.profiles.async_routes import profiles_blueprint
+from realworld.api.routes.v1.articles.async_routes import (
+    articles_blueprint,
+    tags_blueprint,
+)
+
+
+def create_app() -> AsyncFlask:
+    app = AsyncFlask(__name__)
+    CORS(app)
+    init_compression(app)
+    _register_blueprints(app)
+    _register_error_handlers(app)
+    _register_commands(app)
+    app.on_shutdown(async_db.dispose_engines)
+    return app
+
+
+def _register_blueprints(app: AsyncFlask):
+    app.register_blueprint(articles_blueprint, url_prefix="/api")
+    app.register_blueprint(users_blueprint, url_prefix="/api")
+    app.register_blueprint(
+        profiles_blueprint, url_prefix=f"/api{profiles_blueprint.url_prefix}"
+    )
+    app.register_blueprint(
+        tags_blueprint, url_prefix=f"/api{tags_blueprint.url_prefix}"
+    )
+
+    @app.route("/api/ping")
+    async def ping():
+        return "pong"
+
+    @app.route("/api/metrics")
+    async def metrics():
+        return {"caches": cache_stats(), "db_pool": async_db.pool_stats()}
+
+
+app = create_app()
+
+
+async def asgi_app(scope, receive, send):
+    # a plain coroutine function, which ASGI servers recognize as an ASGI 3 app
+    await app.asgi_app(scope, receive, send)
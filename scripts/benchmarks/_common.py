@@ -0,0 +1,211 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Benchmarks run against the database configured by the usual POSTGRES_* env vars,
+seed their data inside a transaction and roll it back when done, e.g.
+
+    ./run bench article_hydration
+"""
+
+import time
+import statistics
+import typing as typ
+from contextlib import contextmanager
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import text as satext
+from realworld.api.core.db import _ENGINE
+
+
+@contextmanager
+def rollback_connection() -> typ.Iterator[Connection]:
+    """A connection whose writes are rolled back on exit."""
+    with _ENGINE.connect() as conn:
+        transaction = conn.begin()
+        try:
+            yield conn
+        finally:
+            transaction.rollback()
+
+
+@contextmanager
+def committed_dataset(**seed_kwargs) -> typ.Iterator[str]:
+    """
+    Seed and commit a dataset (see `seed_dataset`), for benchmarks that go through
+    the app's own connections, and delete it again on exit. Yields the viewer id.
+    """
+    with _ENGINE.begin() as conn:
+        viewer_id = seed_dataset(conn, **seed_kwargs)
+    try:
+        yield viewer_id
+    finally:
+        with _ENGINE.begin() as conn:
+            # favorites, tags, comments and feed items go with their articles
+            conn.execute(
+                satext("DELETE FROM articles WHERE slug LIKE 'bench-article-%'")
+            )
+            conn.execute(
+                satext(
+                    """
+                    DELETE FROM user_follows uf
+                    USING users u
+                    WHERE u.id IN (uf.user_id, uf.following_user_id)
+                    AND u.username LIKE 'bench-user-%'
+                    """
+                )
+            )
+            conn.execute(satext("DELETE FROM users WHERE username LIKE 'bench-user-%'"))
+            conn.execute(satext("DELETE FROM tags WHERE name LIKE 'bench-tag-%'"))
+
+
+def seed_dataset(
+    conn: Connection,
+    *,
+    n_users: int = 300,
+    n_authors: int = 100,
+    n_articles: int = 1000,
+    n_tags: int = 50,
+    tag_ratio: float = 0.08,
+    favorite_ratio: float = 0.05,
+    follow_ratio: float = 0.3,
+    body_size: int = 2000,
+    comments_per_article: int = 0,
+) -> str:
+    """Seed a synthetic dataset and return the id of a viewer who follows some authors."""
+    conn.execute(
+        satext(
+            """
+            INSERT INTO users (username, email, password_hash, bio)
+            SELECT 'bench-user-' || g, 'bench-user-' || g || '@realworld.io', 'x', 'bio ' || g
+            FROM generate_series(1, :n_users) g
+            """
+        ).bindparams(n_users=n_users)
+    )
+    conn.execute(
+        satext(
+            """
+            INSERT INTO articles (author_user_id, slug, title, description, body, created_date, updated_date)
+            SELECT
+                u.id,
+                'bench-article-' || g,
+                'Bench Article ' || g,
+                'Description of bench article ' || g,
+                repeat('lorem ipsum ', :body_size / 12),
+                now() - g * interval '1 minute',
+                now() - g * interval '1 minute'
+            FROM generate_series(1, :n_articles) g
+            JOIN users u ON u.username = 'bench-user-' || (1 + g % :n_authors)
+            """
+        ).bindparams(n_articles=n_articles, n_authors=n_authors, body_size=body_size)
+    )
+    conn.execute(
+        satext(
+            """
+            INSERT INTO tags (name)
+            SELECT 'bench-tag-' || g FROM generate_series(1, :n_tags) g
+            ON CONFLICT (name) DO NOTHING
+            """
+        ).bindparams(n_tags=n_tags)
+    )
+    conn.execute(
+        satext(
+            """
+            INSERT INTO article_tags (article_id, tag_id)
+            SELECT a.id, t.id
+            FROM articles a CROSS JOIN tags t
+            WHERE a.slug LIKE 'bench-article-%'
+            AND t.name LIKE 'bench-tag-%'
+            AND random() < :tag_ratio
+            """
+        ).bindparams(tag_ratio=tag_ratio)
+    )
+    conn.execute(
+        satext(
+            """
+            INSERT INTO article_favorites (article_id, user_id)
+            SELECT a.id, u.id
+            FROM articles a CROSS JOIN users u
+            WHERE a.slug LIKE 'bench-article-%'
+            AND u.username LIKE 'bench-user-%'
+            AND random() < :favorite_ratio
+            """
+        ).bindparams(favorite_ratio=favorite_ratio)
+    )
+    conn.execute(
+        satext(
+            """
+            INSERT INTO article_comments (article_id, commenter_user_id, body)
+            SELECT a.id, a.author_user_id, 'Comment ' || g || ' on ' || a.slug
+            FROM articles a CROSS JOIN generate_series(1, :comments_per_article) g
+            WHERE a.slug LIKE 'bench-article-%'
+            """
+        ).bindparams(comments_per_article=comments_per_article)
+    )
+    conn.execute(
+        satext(
+            """
+            UPDATE articles a
+            SET favorites_count = f.favorites_count
+            FROM (
+                SELECT article_id, COUNT(*) AS favorites_count
+                FROM article_favorites
+                GROUP BY article_id
+            ) f
+            WHERE a.id = f.article_id
+            """
+        )
+    )
+
+    viewer_id = conn.execute(
+        satext("SELECT id FROM users WHERE username = 'bench-user-1'")
+    ).scalar_one()
+    conn.execute(
+        satext(
+            """
+            INSERT INTO user_follows (user_id, following_user_id)
+            SELECT :viewer_id, u.id
+            FROM users u
+            WHERE u.username LIKE 'bench-user-%'
+            AND u.id != :viewer_id
+            AND random() < :follow_ratio
+            """
+        ).bindparams(viewer_id=viewer_id, follow_ratio=follow_ratio)
+    )
+    conn.execute(
+        satext(
+            """
+            INSERT INTO feed_items (user_id, article_id, created_date)
+            SELECT uf.user_id, a.id, a.created_date
+            FROM user_follows uf
+            JOIN articles a ON a.author_user_id = uf.following_user_id
+            WHERE uf.user_id = :viewer_id
+            """
+        ).bindparams(viewer_id=viewer_id)
+    )
+    conn.execute(satext("ANALYZE"))
+    return str(viewer_id)
+
+
+def measure(func: typ.Callable[[], typ.Any], repeat: int = 30) -> typ.Dict[str, float]:
+    """Run `func` `repeat` times (after one warm-up call) and return timings in ms."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "median": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def print_table(headers: typ.List[str], rows: typ.List[typ.List[typ.Any]]) -> None:
+    widths = [
+        max(len(str(value)) for value in [header, *(row[idx] for row in rows)])
+        for idx, header in enumerate(headers)
+    ]
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
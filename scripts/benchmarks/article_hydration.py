@@ -0,0 +1,128 @@
+"""
+Compare per-row correlated subqueries against set-based hydration for article pages.
+
+    ./run bench article_hydration
+"""
+
+from sqlalchemy.sql import text as satext
+from realworld.api.core.models import Article, Profile
+import realworld.api.routes.v1.articles.handler as articles_handler
+from scripts.benchmarks._common import (
+    rollback_connection,
+    seed_dataset,
+    measure,
+    print_table,
+)
+
+PAGE_SIZES = (20, 100, 500)
+
+# The article list query before set-based hydration, four subqueries per row.
+CORRELATED_QUERY = """
+    SELECT
+        a.id,
+        a.slug,
+        a.title,
+        a.description,
+        a.body,
+        a.created_date,
+        a.updated_date,
+        u.username AS author_username,
+        u.bio AS author_bio,
+        u.image_url AS author_image,
+        (
+            SELECT COUNT(*)
+            FROM article_favorites f
+            WHERE f.article_id = a.id
+        ) AS favorites_count,
+        (
+            SELECT COUNT(*)
+            FROM article_favorites f
+            WHERE f.article_id = a.id AND f.user_id = :curr_user_id
+        ) AS favorited_by_curr_user,
+        (
+            SELECT COUNT(*)
+            FROM user_follows uf
+            WHERE uf.user_id = :curr_user_id
+            AND uf.following_user_id = u.id
+        ) > 0 AS is_curr_user_following,
+        (
+            SELECT ARRAY_AGG(t.name)
+            FROM tags t
+            JOIN article_tags at ON t.id = at.tag_id
+            WHERE at.article_id = a.id
+        ) AS tag_list
+    FROM articles a
+    JOIN users u ON a.author_user_id = u.id
+    ORDER BY a.created_date DESC, a.id DESC
+    LIMIT :limit
+"""
+
+
+def correlated(conn, viewer_id, limit):
+    rows = conn.execute(
+        satext(CORRELATED_QUERY).bindparams(curr_user_id=viewer_id, limit=limit)
+    ).fetchall()
+    return [
+        Article(
+            slug=row.slug,
+            title=row.title,
+            description=row.description,
+            body=row.body,
+            tag_list=row.tag_list or [],
+            created_at=row.created_date,
+            updated_at=row.updated_date,
+            favorited=bool(row.favorited_by_curr_user),
+            favorites_count=row.favorites_count,
+            author=Profile(
+                bio=row.author_bio,
+                username=row.author_username,
+                following=bool(row.is_curr_user_following),
+                image=row.author_image,
+            ),
+        )
+        for row in rows
+    ]
+
+
+def set_based(conn, viewer_id, limit):
+    # bypass the card cache, this measures the cold (all cards missing) path
+    article_ids, _ = articles_handler._fetch_article_page(conn, limit=limit)
+    return articles_handler._render_articles(
+        conn, article_ids, viewer_id, use_cache=False
+    )
+
+
+def main():
+    with rollback_connection() as conn:
+        viewer_id = seed_dataset(conn, n_articles=max(PAGE_SIZES) * 2)
+
+        results = []
+        for limit in PAGE_SIZES:
+            before = measure(lambda: correlated(conn, viewer_id, limit))
+            after = measure(lambda: set_based(conn, viewer_id, limit))
+            results.append(
+                [
+                    limit,
+                    f"{before['median']:.2f}",
+                    f"{after['median']:.2f}",
+                    f"{before['p95']:.2f}",
+                    f"{after['p95']:.2f}",
+                    f"{before['median'] / after['median']:.2f}x",
+                ]
+            )
+
+    print_table(
+        [
+            "rows/page",
+            "correlated median ms",
+            "set-based median ms",
+            "correlated p95 ms",
+            "set-based p95 ms",
+            "speedup",
+        ],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare the `sql` (feed_items) and `timeline` (in-memory k-way merge) feed engines.
+
+    ./run bench feed_engines
+"""
+
+import realworld.api.routes.v1.articles.handler as articles_handler
+from scripts.benchmarks._common import (
+    rollback_connection,
+    seed_dataset,
+    measure,
+    print_table,
+)
+
+PAGE_SIZE = 20
+PAGES = (1, 5, 25)
+
+# (authors, share of authors the viewer follows)
+FOLLOW_GRAPHS = ((100, 0.1), (100, 0.5), (1000, 0.5))
+
+
+def feed_page(conn, viewer_id, engine, page):
+    articles_handler.FEED_ENGINE = engine
+    return articles_handler.get_feed_articles(
+        conn, viewer_id, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE
+    )
+
+
+def main():
+    results = []
+    for n_authors, follow_ratio in FOLLOW_GRAPHS:
+        with rollback_connection() as conn:
+            viewer_id = seed_dataset(
+                conn,
+                n_users=n_authors + 1,
+                n_authors=n_authors,
+                n_articles=n_authors * 20,
+                follow_ratio=follow_ratio,
+            )
+            for page in PAGES:
+                timings = {
+                    engine: measure(lambda: feed_page(conn, viewer_id, engine, page))
+                    for engine in (
+                        articles_handler.FEED_ENGINE_SQL,
+                        articles_handler.FEED_ENGINE_TIMELINE,
+                    )
+                }
+                results.append(
+                    [
+                        n_authors,
+                        f"{follow_ratio:.0%}",
+                        page,
+                        f"{timings['sql']['median']:.2f}",
+                        f"{timings['timeline']['median']:.2f}",
+                        f"{timings['sql']['p95']:.2f}",
+                        f"{timings['timeline']['p95']:.2f}",
+                    ]
+                )
+
+    print_table(
+        [
+            "authors",
+            "followed",
+            "page",
+            "sql median ms",
+            "timeline median ms",
+            "sql p95 ms",
+            "timeline p95 ms",
+        ],
+        results,
+    )
+    print(f"timeline cache: {articles_handler._AUTHOR_TIMELINES.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare response bytes and latency of the full and summary (body-less) views of
+the article list.
+
+    ./run bench list_views
+"""
+
+from realworld.app import app
+from realworld.api.core.encoding import encode_model
+import realworld.api.routes.v1.articles.handler as articles_handler
+from realworld.api.routes.v1.articles.models import (
+    MultipleArticlesResponse,
+    MultipleArticleSummariesResponse,
+)
+from scripts.benchmarks._common import (
+    rollback_connection,
+    seed_dataset,
+    measure,
+    print_table,
+)
+
+PAGE_SIZE = 100
+BODY_SIZES = (500, 5000, 20000)
+
+RESPONSE_MODELS = {
+    articles_handler.VIEW_FULL: MultipleArticlesResponse,
+    articles_handler.VIEW_SUMMARY: MultipleArticleSummariesResponse,
+}
+
+
+def list_page(conn, viewer_id, view) -> bytes:
+    article_ids, next_cursor = articles_handler._fetch_article_page(
+        conn, curr_user_id=viewer_id, limit=PAGE_SIZE
+    )
+    # bypass the card cache so every run reads (or skips) the bodies
+    articles = articles_handler._render_articles(
+        conn, article_ids, viewer_id, use_cache=False, view=view
+    )
+    return encode_model(
+        RESPONSE_MODELS[view](
+            articles=articles, articles_count=len(articles), next_cursor=next_cursor
+        )
+    )
+
+
+def main():
+    results = []
+    with app.app_context():
+        for body_size in BODY_SIZES:
+            with rollback_connection() as conn:
+                viewer_id = seed_dataset(
+                    conn, n_articles=PAGE_SIZE * 2, body_size=body_size
+                )
+
+                full = len(list_page(conn, viewer_id, articles_handler.VIEW_FULL))
+                summary = len(list_page(conn, viewer_id, articles_handler.VIEW_SUMMARY))
+                before = measure(
+                    lambda: list_page(conn, viewer_id, articles_handler.VIEW_FULL)
+                )
+                after = measure(
+                    lambda: list_page(conn, viewer_id, articles_handler.VIEW_SUMMARY)
+                )
+                results.append(
+                    [
+                        body_size,
+                        full,
+                        summary,
+                        f"{full / summary:.1f}x",
+                        f"{before['median']:.2f}",
+                        f"{after['median']:.2f}",
+                    ]
+                )
+
+    print_table(
+        [
+            "body bytes",
+            "full page bytes",
+            "summary page bytes",
+            "reduction",
+            "full median ms",
+            "summary median ms",
+        ],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
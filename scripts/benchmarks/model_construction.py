@@ -0,0 +1,97 @@
+"""
+Compare per-row cost of building response models with the validating constructors
+against `from_trusted`. Needs no database.
+
+    ./run bench model_construction
+"""
+
+from datetime import datetime, timezone
+import realworld.api.core.models as core_models
+from realworld.api.core.models import Article, Comment, Profile
+from scripts.benchmarks._common import measure, print_table
+
+ROWS = 1000
+
+
+def article_row(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return dict(
+        slug=f"bench-article-{i}",
+        title=f"Bench article {i}",
+        description="An article to benchmark model construction.",
+        body="lorem ipsum " * 100,
+        tag_list=[f"tag-{i % 10}", f"tag-{i % 7}"],
+        created_at=now,
+        updated_at=now,
+        favorited=False,
+        favorites_count=i,
+    )
+
+
+def profile_row(i: int) -> dict:
+    return dict(
+        username=f"bench-author-{i % 10}",
+        bio=None,
+        image="https://example.com/avatar.png",
+        following=False,
+    )
+
+
+def comment_row(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return dict(id=str(i), created_at=now, updated_at=now, body="A comment.")
+
+
+def build_articles(rows, construct):
+    return [
+        construct(Article, author=construct(Profile, **profile), **article)
+        for article, profile in rows
+    ]
+
+
+def build_comments(rows, construct):
+    return [
+        construct(Comment, author=construct(Profile, **profile), **comment)
+        for comment, profile in rows
+    ]
+
+
+def validated(model_cls, **values):
+    return model_cls(**values)
+
+
+def trusted(model_cls, **values):
+    return model_cls.from_trusted(**values)
+
+
+def main():
+    core_models.VALIDATE_TRUSTED_MODELS = "FALSE"
+    article_rows = [(article_row(i), profile_row(i)) for i in range(ROWS)]
+    comment_rows = [(comment_row(i), profile_row(i)) for i in range(ROWS)]
+
+    results = []
+    for name, build, rows in (
+        ("Article", build_articles, article_rows),
+        ("Comment", build_comments, comment_rows),
+    ):
+        assert build(rows, validated) == build(rows, trusted)
+
+        before = measure(lambda: build(rows, validated))
+        after = measure(lambda: build(rows, trusted))
+        results.append(
+            [
+                name,
+                f"{before['median'] * 1000 / ROWS:.2f}",
+                f"{after['median'] * 1000 / ROWS:.2f}",
+                f"{before['median'] / after['median']:.2f}x",
+            ]
+        )
+
+    print_table(
+        ["model", "validated us/row", "trusted us/row", "speedup"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare the latency of the read endpoints with their connection in a read-write
+transaction (BEGIN ... COMMIT) against autocommit read-only connections.
+
+Seeds and commits a dataset for the duration of the run, since the endpoints read
+through their own pooled connections, and deletes it afterwards.
+
+    ./run bench read_transactions
+"""
+
+from realworld.app import app
+from realworld.api.core.auth import generate_jwt
+from realworld.api.core.cache import clear_all_caches
+import realworld.api.core.db as db
+from scripts.benchmarks._common import committed_dataset, measure, print_table
+
+ENDPOINTS = (
+    "/api/articles?limit=20",
+    "/api/articles/feed?limit=20",
+    "/api/articles/bench-article-1",
+    "/api/articles/bench-article-1/comments",
+    "/api/profiles/bench-user-2",
+    "/api/tags",
+)
+
+
+def main():
+    client = app.test_client()
+    results = []
+    with committed_dataset(comments_per_article=5) as viewer_id:
+        # authenticated, so the anonymous response cache doesn't answer
+        headers = {"Authorization": f"Token {generate_jwt(viewer_id)}"}
+
+        def get(url):
+            clear_all_caches()
+            assert client.get(url, headers=headers).status_code == 200
+
+        for url in ENDPOINTS:
+            timings = {}
+            for read_only in ("FALSE", "TRUE"):
+                db.DB_READ_ONLY_GETS = read_only
+                timings[read_only] = measure(lambda: get(url), 200)
+
+            before, after = timings["FALSE"], timings["TRUE"]
+            results.append(
+                [
+                    url,
+                    f"{before['median']:.2f}",
+                    f"{after['median']:.2f}",
+                    f"{before['p95']:.2f}",
+                    f"{after['p95']:.2f}",
+                    f"{before['median'] - after['median']:.2f}",
+                ]
+            )
+
+    print_table(
+        [
+            "endpoint",
+            "transaction median ms",
+            "read-only median ms",
+            "transaction p95 ms",
+            "read-only p95 ms",
+            "saved ms",
+        ],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare Flask's JSON provider over `model_dump()` against the generated model
+encoders for article list responses. Needs no database.
+
+    ./run bench response_encoding
+"""
+
+from datetime import datetime, timezone
+from realworld.app import app
+from realworld.api.core.models import Article, Profile
+from realworld.api.core.encoding import encode_model, _encode_model_with_flask
+from realworld.api.routes.v1.articles.models import MultipleArticlesResponse
+from scripts.benchmarks._common import measure, print_table
+
+PAGE_SIZES = (20, 100, 500)
+BODY_SIZES = (200, 5000)
+
+
+def articles_response(n_articles: int, body_size: int) -> MultipleArticlesResponse:
+    now = datetime.now(timezone.utc)
+    articles = [
+        Article(
+            slug=f"bench-article-{i}",
+            title=f"Bench article {i}",
+            description="An article to benchmark response encoding.",
+            body="lorem ipsum " * (body_size // 12),
+            tag_list=[f"tag-{i % 10}", f"tag-{i % 7}"],
+            created_at=now,
+            updated_at=now,
+            favorited=i % 3 == 0,
+            favorites_count=i,
+            author=Profile(
+                username=f"bench-author-{i % 10}",
+                bio=None,
+                image="https://example.com/avatar.png",
+                following=i % 2 == 0,
+            ),
+        )
+        for i in range(n_articles)
+    ]
+    return MultipleArticlesResponse(articles=articles, articles_count=n_articles)
+
+
+def main():
+    results = []
+    with app.app_context():
+        for body_size in BODY_SIZES:
+            for n_articles in PAGE_SIZES:
+                response = articles_response(n_articles, body_size)
+                assert encode_model(response) == _encode_model_with_flask(response)
+
+                before = measure(lambda: _encode_model_with_flask(response), 100)
+                after = measure(lambda: encode_model(response), 100)
+                results.append(
+                    [
+                        n_articles,
+                        body_size,
+                        f"{before['median']:.3f}",
+                        f"{after['median']:.3f}",
+                        f"{before['p95']:.3f}",
+                        f"{after['p95']:.3f}",
+                        f"{before['median'] / after['median']:.2f}x",
+                    ]
+                )
+
+    print_table(
+        [
+            "articles",
+            "body bytes",
+            "flask median ms",
+            "fast median ms",
+            "flask p95 ms",
+            "fast p95 ms",
+            "speedup",
+        ],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
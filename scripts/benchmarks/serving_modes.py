@@ -0,0 +1,124 @@
+"""
+Compare latency under concurrent load of the WSGI app (`flask run`, a thread per
+request) against the ASGI app (`uvicorn realworld.asgi:asgi_app`, one event loop
+on asyncpg). Starts each server on a committed dataset, then keeps CONCURRENCY
+clients sending authenticated requests (one connection each) for a few seconds.
+
+    ./run bench serving_modes
+"""
+
+import sys
+import time
+import asyncio
+import itertools
+import subprocess
+import typing as typ
+from realworld.api.core.auth import generate_jwt
+from scripts.benchmarks._common import committed_dataset, print_table
+
+PORT = 8765
+CONCURRENCY = (1, 8, 32, 128)
+SECONDS_PER_LEVEL = 5.0
+ENDPOINTS = (
+    "/api/articles?limit=20",
+    "/api/articles/feed?limit=20",
+    "/api/articles/bench-article-1",
+    "/api/profiles/bench-user-2",
+)
+
+SERVERS = {
+    "wsgi": ["flask", "--app", "realworld.app", "run", "--port", str(PORT)],
+    "asgi": [
+        "uvicorn",
+        "realworld.asgi:asgi_app",
+        "--port",
+        str(PORT),
+        "--log-level",
+        "warning",
+    ],
+}
+
+
+async def request(path: str, token: str) -> int:
+    reader, writer = await asyncio.open_connection("localhost", PORT)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Authorization: Token {token}\r\nConnection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def wait_for_server(token: str):
+    for _ in range(100):
+        try:
+            await request("/api/ping", token)
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server didn't start")
+
+
+async def run_load(token: str, concurrency: int) -> typ.Tuple[typ.List[float], int]:
+    """Latencies in ms of the requests sent by `concurrency` clients, and errors."""
+    timings, errors = [], 0
+    paths = itertools.cycle(ENDPOINTS)
+    deadline = time.perf_counter() + SECONDS_PER_LEVEL
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await request(next(paths), token)
+            except OSError:
+                status = None
+            if status == 200:
+                timings.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return sorted(timings), errors
+
+
+def main():
+    results = []
+    with committed_dataset(comments_per_article=5) as viewer_id:
+        token = generate_jwt(viewer_id)
+        for mode, command in SERVERS.items():
+            server = subprocess.Popen(
+                [sys.executable, "-m", *command],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                asyncio.run(wait_for_server(token))
+                # warm up the pool and the caches
+                asyncio.run(run_load(token, 8))
+                for concurrency in CONCURRENCY:
+                    timings, errors = asyncio.run(run_load(token, concurrency))
+                    results.append(
+                        [
+                            mode,
+                            concurrency,
+                            f"{len(timings) / SECONDS_PER_LEVEL:.0f}",
+                            f"{timings[len(timings) // 2]:.2f}",
+                            f"{timings[int(len(timings) * 0.99) - 1]:.2f}",
+                            errors,
+                        ]
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+
+    print_table(
+        ["mode", "concurrency", "req/s", "p50 ms", "p99 ms", "errors"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare insert throughput, primary key index size and WAL volume of random
+UUIDv4 keys against time-ordered UUIDv7 keys, in a comments-like table. The
+v4 -> v7 case inserts v7 keys into a table already holding v4 keys, like the
+existing tables after the switch (its index holds both sets of rows, its
+throughput and WAL count the v7 inserts only).
+
+    ./run bench uuid_keys
+"""
+
+import time
+from uuid import uuid4
+from sqlalchemy.sql import text as satext
+from realworld.api.core.ids import uuid7
+from scripts.benchmarks._common import rollback_connection, print_table
+
+ROWS = 200_000
+BATCH_SIZE = 100
+BODY = "lorem ipsum " * 20
+
+CASES = {
+    "v4": (None, uuid4),
+    "v7": (None, uuid7),
+    "v4 -> v7": (uuid4, uuid7),
+}
+
+
+def insert_rows(conn, new_id, n_rows: int) -> float:
+    """Insert `n_rows` in batches like concurrent comment writes, return seconds."""
+    start = time.perf_counter()
+    for _ in range(n_rows // BATCH_SIZE):
+        conn.execute(
+            satext(
+                """
+                INSERT INTO bench_uuid_keys (id, body)
+                SELECT unnest(CAST(:ids AS uuid[])), :body
+                """
+            ).bindparams(ids=[str(new_id()) for _ in range(BATCH_SIZE)], body=BODY)
+        )
+    return time.perf_counter() - start
+
+
+def main():
+    results = []
+    for name, (prefill_id, new_id) in CASES.items():
+        with rollback_connection() as conn:
+            conn.execute(
+                satext(
+                    """
+                    CREATE TABLE bench_uuid_keys (
+                        id uuid PRIMARY KEY,
+                        body text,
+                        created_date timestamptz DEFAULT now()
+                    )
+                    """
+                )
+            )
+            if prefill_id:
+                insert_rows(conn, prefill_id, ROWS)
+
+            wal_start = conn.execute(
+                satext("SELECT pg_current_wal_insert_lsn()")
+            ).scalar()
+            seconds = insert_rows(conn, new_id, ROWS)
+            wal_bytes, index_bytes = conn.execute(
+                satext(
+                    """
+                    SELECT
+                        pg_wal_lsn_diff(pg_current_wal_insert_lsn(), :wal_start),
+                        pg_relation_size('bench_uuid_keys_pkey')
+                    """
+                ).bindparams(wal_start=wal_start)
+            ).one()
+
+            results.append(
+                [
+                    name,
+                    f"{ROWS / seconds:,.0f}",
+                    f"{index_bytes / 2**20:.1f}",
+                    f"{int(wal_bytes) / 2**20:.1f}",
+                ]
+            )
+
+    print_table(
+        ["keys", "inserts/s", "pkey index MiB", "WAL MiB"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
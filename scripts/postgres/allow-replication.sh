@@ -0,0 +1,3 @@
+#!/bin/bash
+# let the postgres-replica service stream the WAL, runs when the data volume is created
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
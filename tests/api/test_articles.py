@@ -1,4 +1,16 @@
+import gzip
+import json
+import zlib
+import threading
+from uuid import UUID, uuid4
+from pytest import importorskip, mark, raises
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import text as satext
 from realworld.api.core.auth import generate_jwt
+import realworld.api.core.db as db
+import realworld.api.core.encoding as encoding
+import realworld.api.routes.v1.articles.handler as articles_handler
+from realworld.api.routes.v1.articles.models import CreateCommentData
 
 
 #
@@ -34,7 +46,31 @@ def test_get_articles(client, add_user, add_article):
         }
 
 
-def test_get_feed(client, add_user, add_article, add_user_follow):
+@mark.parametrize(
+    "count_mode, expected_count", [("auto", 3), ("exact", 3), ("none", 2)]
+)
+def test_get_articles_count(count_mode, expected_count, client, add_article):
+    for _ in range(3):
+        add_article(tags=["counted"])
+    add_article(tags=["other"])
+
+    resp = client.get(f"/api/articles?tag=counted&limit=2&count={count_mode}")
+    assert resp.status_code == 200
+    assert len(resp.json["articles"]) == 2
+    assert resp.json["articlesCount"] == expected_count
+
+
+def test_get_articles_invalid_count_mode(client):
+    resp = client.get("/api/articles?count=bogus")
+    assert resp.status_code == 400
+
+
+@mark.parametrize("feed_engine", ["sql", "timeline"])
+def test_get_feed(
+    feed_engine, monkeypatch, client, add_user, add_article, add_user_follow
+):
+    monkeypatch.setattr(articles_handler, "FEED_ENGINE", feed_engine)
+
     # setup
     user = add_user()
     folliwng_user, other_user = add_user(), add_user()
@@ -76,6 +112,220 @@ def test_get_feed(client, add_user, add_article, add_user_follow):
         }
 
 
+def test_feed_follow_unfollow(client, add_user, add_article):
+    user, author = add_user(), add_user()
+    existing = add_article(author_user_id=author["id"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+
+    def feed_slugs():
+        resp = client.get("/api/articles/feed", headers=headers)
+        assert resp.status_code == 200
+        return [article["slug"] for article in resp.json["articles"]]
+
+    # following backfills the feed with the author's articles
+    client.post(f"/api/profiles/{author['username']}/follow", headers=headers)
+    assert feed_slugs() == [existing["slug"]]
+
+    # new articles are fanned out to followers
+    resp = client.post(
+        "/api/articles",
+        json={"article": {"title": "Fan out", "description": "d", "body": "b"}},
+        headers={"Authorization": f"Token {generate_jwt(author['id'])}"},
+    )
+    assert set(feed_slugs()) == {resp.json["article"]["slug"], existing["slug"]}
+
+    # unfollowing removes the author's articles from the feed
+    client.delete(f"/api/profiles/{author['username']}/follow", headers=headers)
+    assert feed_slugs() == []
+
+
+@mark.parametrize("feed_engine", ["sql", "timeline"])
+def test_get_feed_cursor_pagination(
+    feed_engine, monkeypatch, client, add_user, add_article, add_user_follow
+):
+    monkeypatch.setattr(articles_handler, "FEED_ENGINE", feed_engine)
+    user, author = add_user(), add_user()
+    add_user_follow(user_id=user["id"], following_user_id=author["id"])
+    articles = [add_article(author_user_id=author["id"]) for _ in range(5)]
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+
+    slugs, cursor = [], None
+    for _ in range(3):
+        query = f"limit=2&cursor={cursor}" if cursor else "limit=2"
+        resp = client.get(f"/api/articles/feed?{query}", headers=headers)
+        assert resp.status_code == 200
+        slugs += [article["slug"] for article in resp.json["articles"]]
+        if not (cursor := resp.json["nextCursor"]):
+            break
+
+    assert slugs == [article["slug"] for article in reversed(articles)]
+    assert cursor is None
+
+
+def test_timeline_feed_new_article(monkeypatch, client, add_user, add_user_follow):
+    monkeypatch.setattr(articles_handler, "FEED_ENGINE", "timeline")
+    user, author = add_user(), add_user()
+    add_user_follow(user_id=user["id"], following_user_id=author["id"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+
+    def feed_slugs():
+        resp = client.get("/api/articles/feed", headers=headers)
+        assert resp.status_code == 200
+        return [article["slug"] for article in resp.json["articles"]]
+
+    # warm the author's timeline, then write through it
+    assert feed_slugs() == []
+    resp = client.post(
+        "/api/articles",
+        json={"article": {"title": "Timeline", "description": "d", "body": "b"}},
+        headers={"Authorization": f"Token {generate_jwt(author['id'])}"},
+    )
+    slug = resp.json["article"]["slug"]
+    assert feed_slugs() == [slug]
+
+    client.delete(
+        f"/api/articles/{slug}",
+        headers={"Authorization": f"Token {generate_jwt(author['id'])}"},
+    )
+    assert feed_slugs() == []
+
+
+@mark.parametrize("quote", [encoding._quote, json.encoder.py_encode_basestring_ascii])
+def test_get_articles_response_encoders(
+    client, add_user, add_article, monkeypatch, quote
+):
+    # without the json module's C accelerator too
+    monkeypatch.setattr(encoding, "_quote", quote)
+    monkeypatch.setattr(encoding, "_MODEL_ENCODERS", {})
+    user = add_user(bio='Ünïcode "bio"')
+    for _ in range(3):
+        add_article(author_user_id=user["id"], tags=["mock", "ünïcode"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+
+    responses = {}
+    for encoder in (encoding.ENCODER_FLASK, encoding.ENCODER_FAST):
+        monkeypatch.setattr(encoding, "RESPONSE_ENCODER", encoder)
+        responses[encoder] = client.get("/api/articles", headers=headers)
+
+    assert responses[encoding.ENCODER_FAST].status_code == 200
+    assert (
+        responses[encoding.ENCODER_FAST].data == responses[encoding.ENCODER_FLASK].data
+    )
+
+
+@mark.parametrize(
+    "url, query",
+    [
+        ("/api/articles", "limit=2"),
+        ("/api/articles/feed", "limit=2"),
+        ("/api/articles", "limit=2&view=summary"),
+    ],
+)
+def test_get_articles_renderers(
+    url,
+    query,
+    client,
+    add_user,
+    add_user_follow,
+    add_article,
+    add_article_favorite,
+    monkeypatch,
+):
+    viewer, author = add_user(), add_user(bio="Ünïcode bio")
+    add_user_follow(user_id=viewer["id"], following_user_id=author["id"])
+    articles = [
+        add_article(author_user_id=author["id"], tags=["mock", "ünïcode"])
+        for _ in range(3)
+    ]
+    add_article_favorite(article_id=articles[0]["id"], user_id=viewer["id"])
+    headers = {"Authorization": f"Token {generate_jwt(viewer['id'])}"}
+
+    responses = {}
+    for renderer in (
+        articles_handler.ARTICLES_RENDERER_PYTHON,
+        articles_handler.ARTICLES_RENDERER_POSTGRES,
+    ):
+        monkeypatch.setattr(articles_handler, "ARTICLES_RENDERER", renderer)
+        responses[renderer] = client.get(f"{url}?{query}", headers=headers)
+
+    postgres = responses[articles_handler.ARTICLES_RENDERER_POSTGRES]
+    assert postgres.status_code == 200
+    assert postgres.content_type == "application/json"
+    assert postgres.json == responses[articles_handler.ARTICLES_RENDERER_PYTHON].json
+
+
+@mark.parametrize("query", ["limit=2&count=exact", "limit=5&count=none", "limit=0"])
+def test_get_articles_streamed(query, client, add_article, monkeypatch):
+    for _ in range(3):
+        add_article()
+    monkeypatch.setattr(articles_handler, "STREAM_BATCH_SIZE", 1)
+
+    buffered = client.get(f"/api/articles?{query}")
+    streamed = client.get(f"/api/articles?{query}&stream=true")
+    assert streamed.is_streamed
+    assert streamed.status_code == 200
+    assert streamed.data == buffered.data
+
+
+def test_get_articles_compressed(client, add_article):
+    for _ in range(3):
+        add_article(body="lorem ipsum " * 200)
+    gzip_headers = {"Accept-Encoding": "gzip"}
+
+    plain = client.get("/api/articles?limit=5")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Vary"] == "Accept-Encoding"
+
+    # the anonymous response cache fills and serves the compressed body
+    for _ in range(2):
+        compressed = client.get("/api/articles?limit=5", headers=gzip_headers)
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert len(compressed.data) < len(plain.data)
+        assert gzip.decompress(compressed.data) == plain.data
+
+    streamed = client.get("/api/articles?limit=5&stream=true", headers=gzip_headers)
+    assert streamed.is_streamed
+    assert streamed.headers["Content-Encoding"] == "gzip"
+    assert zlib.decompress(streamed.data, 16 + zlib.MAX_WBITS) == plain.data
+
+
+def test_get_article_compressed_etag(client, add_article):
+    article = add_article(body="lorem ipsum " * 200)
+    url = f"/api/articles/{article['slug']}"
+    gzip_headers = {"Accept-Encoding": "gzip"}
+
+    plain_etag = client.get(url).headers["ETag"]
+    compressed_etag = client.get(url, headers=gzip_headers).headers["ETag"]
+    assert compressed_etag != plain_etag
+
+    resp = client.get(url, headers={**gzip_headers, "If-None-Match": compressed_etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == compressed_etag
+
+
+@mark.parametrize("url", ["/api/articles", "/api/articles/feed"])
+def test_get_articles_summary_view(url, client, add_user, add_user_follow, add_article):
+    viewer, author = add_user(), add_user()
+    add_user_follow(user_id=viewer["id"], following_user_id=author["id"])
+    add_article(author_user_id=author["id"])
+    headers = {"Authorization": f"Token {generate_jwt(viewer['id'])}"}
+
+    full = client.get(url, headers=headers).json["articles"][0]
+    summary = client.get(url, query_string={"view": "summary"}, headers=headers)
+    assert summary.status_code == 200
+    assert "body" not in summary.json["articles"][0]
+    assert summary.json["articles"][0] == {k: v for k, v in full.items() if k != "body"}
+
+    # cached full cards don't leak bodies into summaries, nor the other way around
+    assert "body" in client.get(url, headers=headers).json["articles"][0]
+
+
+def test_get_articles_invalid_view(client):
+    resp = client.get("/api/articles?view=everything")
+    assert resp.status_code == 400
+    assert resp.json == {"message": "Unknown view: everything"}
+
+
 def test_get_article(client, add_article):
     article = add_article()
     resp = client.get(f"/api/articles/{article['slug']}")
@@ -83,6 +333,105 @@ def test_get_article(client, add_article):
     assert resp.json["article"]["slug"] == article["slug"]
 
 
+def test_get_article_cache(client, add_user, add_article):
+    author, viewer = add_user(), add_user()
+    article = add_article(author_user_id=author["id"])
+    url = f"/api/articles/{article['slug']}"
+    viewer_headers = {"Authorization": f"Token {generate_jwt(viewer['id'])}"}
+
+    assert client.get(url).json["article"]["favoritesCount"] == 0
+
+    # favoriting invalidates the shared entry, the viewer's flag is applied on top
+    client.post(f"{url}/favorite", headers=viewer_headers)
+    assert client.get(url, headers=viewer_headers).json["article"]["favorited"] is True
+    anonymous = client.get(url).json["article"]
+    assert anonymous["favorited"] is False
+    assert anonymous["favoritesCount"] == 1
+
+    # author profile changes invalidate the author's articles, on lists too (which,
+    # unlike the article, aren't checked against the article's version)
+    list_url = f"/api/articles?author={author['username']}"
+    assert client.get(list_url, headers=viewer_headers).json["articles"]
+    client.put(
+        "/api/user",
+        json={"user": {"email": author["email"], "bio": "new bio"}},
+        headers={"Authorization": f"Token {generate_jwt(author['id'])}"},
+    )
+    listed = client.get(list_url, headers=viewer_headers).json["articles"]
+    assert [article["author"]["bio"] for article in listed] == ["new bio"]
+    assert client.get(url).json["article"]["author"]["bio"] == "new bio"
+
+
+def test_get_article_etag(client, add_user, add_user_follow, add_article):
+    author, viewer = add_user(), add_user()
+    add_user_follow(user_id=viewer["id"], following_user_id=author["id"])
+    article = add_article(author_user_id=author["id"])
+    url = f"/api/articles/{article['slug']}"
+    viewer_headers = {"Authorization": f"Token {generate_jwt(viewer['id'])}"}
+
+    resp = client.get(url, headers=viewer_headers)
+    etag = resp.headers["ETag"]
+    not_modified = client.get(url, headers={**viewer_headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    # shared caches must tell the viewers' representations apart
+    assert "Authorization" in resp.vary
+    assert "Authorization" in not_modified.vary
+
+    # the ETag is per viewer, anonymous visitors don't follow the author
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    client.post(f"{url}/favorite", headers=viewer_headers)
+    modified = client.get(url, headers={**viewer_headers, "If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != etag
+    assert modified.json["article"]["favorited"] is True
+
+
+def test_get_article_comments_streamed(client, add_article, add_article_comment):
+    article = add_article()
+    for _ in range(3):
+        add_article_comment(article_id=article["id"])
+    url = f"/api/articles/{article['slug']}/comments"
+
+    streamed = client.get(f"{url}?stream=true")
+    assert streamed.is_streamed
+    assert streamed.data == client.get(url).data
+
+
+def test_get_article_comments_etag(client, add_article, add_article_comment):
+    article = add_article()
+    add_article_comment(article_id=article["id"])
+    url = f"/api/articles/{article['slug']}/comments"
+
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    add_article_comment(article_id=article["id"])
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_get_articles_shared_cards(client, add_user, add_article):
+    author, viewer = add_user(), add_user()
+    article = add_article(author_user_id=author["id"])
+    viewer_headers = {"Authorization": f"Token {generate_jwt(viewer['id'])}"}
+
+    # the detail view caches the card, the list view reuses it
+    client.get(f"/api/articles/{article['slug']}")
+    client.post(f"/api/articles/{article['slug']}/favorite", headers=viewer_headers)
+    client.post(f"/api/profiles/{author['username']}/follow", headers=viewer_headers)
+
+    viewed = client.get("/api/articles", headers=viewer_headers).json["articles"][0]
+    assert viewed["favorited"] is True
+    assert viewed["favoritesCount"] == 1
+    assert viewed["author"]["following"] is True
+
+    anonymous = client.get("/api/articles").json["articles"][0]
+    assert anonymous["favorited"] is False
+    assert anonymous["favoritesCount"] == 1
+    assert anonymous["author"]["following"] is False
+
+
 def test_create_article_unauthenticated(client):
     payload = {
         "article": {
@@ -115,6 +464,30 @@ def test_create_article(client, add_user):
     assert resp.json["article"]["title"] == payload["article"]["title"]
 
 
+def test_create_article_response_matches_get(client, add_user, add_article):
+    user = add_user()
+    add_article(tags=["existing"])
+    resp = client.post(
+        "/api/articles",
+        json={
+            "article": {
+                "title": "How to Article",
+                "description": "A test article.",
+                "body": "This is just a test!",
+                "tagList": ["new", "existing", "new"],
+            }
+        },
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert resp.status_code == 200
+    created = resp.json["article"]
+    assert created["tagList"] == ["new", "existing"]
+
+    fetched = client.get(f"/api/articles/{created['slug']}").json["article"]
+    assert sorted(fetched["tagList"]) == sorted(created["tagList"])
+    assert {**fetched, "tagList": None} == {**created, "tagList": None}
+
+
 def test_update_article_unauthenticated(client, add_article):
     article = add_article()
     payload = {"article": {"title": "Updated Article"}}
@@ -178,6 +551,108 @@ def test_unfavorite_article(client, add_user, add_article, add_article_favorite)
     assert resp.json["article"]["favorited"] is False
 
 
+def test_favorite_article_favorites_count(client, add_user, add_article):
+    user = add_user()
+    article = add_article()
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    url = f"/api/articles/{article['slug']}/favorite"
+
+    # repeated favorites / unfavorites only count once
+    for method, expected in ((client.post, 1), (client.post, 1), (client.delete, 0)):
+        resp = method(url, headers=headers)
+        assert resp.status_code == 200
+        assert resp.json["article"]["favoritesCount"] == expected
+
+    assert client.delete(url, headers=headers).json["article"]["favoritesCount"] == 0
+
+
+def test_favorite_article_response_matches_get(
+    client, add_user, add_user_follow, add_article
+):
+    user, author = add_user(), add_user()
+    add_user_follow(user_id=user["id"], following_user_id=author["id"])
+    article = add_article(author_user_id=author["id"], tags=["mock"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    url = f"/api/articles/{article['slug']}"
+
+    for method in (client.post, client.delete):
+        written = method(f"{url}/favorite", headers=headers).json["article"]
+        assert written == client.get(url, headers=headers).json["article"]
+
+
+def test_repair_favorites_counts_concurrent_favorite():
+    user_id, article_id = str(uuid4()), str(uuid4())
+    # the fixtures' rows are uncommitted, the two transactions need committed ones
+    with db._ENGINE.begin() as conn:
+        conn.execute(
+            satext(
+                """
+                INSERT INTO users (id, username, email, password_hash)
+                VALUES (:user_id, 'repaired', 'repaired@realworld.io', 'x')
+                """
+            ).bindparams(user_id=user_id)
+        )
+        conn.execute(
+            satext(
+                """
+                INSERT INTO articles (
+                    id, author_user_id, slug, title, description, body, favorites_count
+                )
+                -- a drifted count, for the repair to fix
+                VALUES (:article_id, :user_id, 'repaired', 't', 'd', 'b', 5)
+                """
+            ).bindparams(user_id=user_id, article_id=article_id)
+        )
+
+    try:
+        with db._ENGINE.connect() as favoriting, db._ENGINE.connect() as repairing:
+            favoriting.begin()
+            articles_handler.add_article_favorite(favoriting, "repaired", user_id)
+            repairing_pid = repairing.exec_driver_sql(
+                "SELECT pg_backend_pid()"
+            ).scalar()
+
+            def repair():
+                # a batch of just the test's article, in the transaction the pid began
+                articles_handler.repair_favorites_counts(
+                    repairing,
+                    after_id=str(UUID(int=UUID(article_id).int - 1)),
+                    batch_size=1,
+                )
+                repairing.commit()
+
+            # commit the favorite while the repair waits for the article's row lock
+            repair_thread = threading.Thread(target=repair)
+            repair_thread.start()
+            while (
+                repair_thread.is_alive()
+                and not favoriting.exec_driver_sql(
+                    "SELECT wait_event_type = 'Lock' FROM pg_stat_activity WHERE pid = %s",
+                    (repairing_pid,),
+                ).scalar()
+            ):
+                pass
+            favoriting.commit()
+            repair_thread.join()
+
+            assert (
+                favoriting.execute(
+                    satext("SELECT favorites_count FROM articles WHERE id = :id"),
+                    {"id": article_id},
+                ).scalar()
+                == 1
+            )
+    finally:
+        with db._ENGINE.begin() as conn:
+            conn.execute(
+                satext("DELETE FROM articles WHERE id = :article_id"),
+                {"article_id": article_id},
+            )
+            conn.execute(
+                satext("DELETE FROM users WHERE id = :user_id"), {"user_id": user_id}
+            )
+
+
 #
 # Article Comments Tests
 #
@@ -221,6 +696,68 @@ def test_create_comment(client, add_user, add_article):
     assert resp.json["comment"]["body"] == payload["comment"]["body"]
 
 
+def test_create_comment_time_ordered_ids(client, add_user, add_article):
+    user = add_user()
+    article = add_article()
+    ids = [
+        UUID(
+            client.post(
+                f"/api/articles/{article['slug']}/comments",
+                json={"comment": {"body": f"Comment {i}"}},
+                headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+            ).json["comment"]["id"]
+        )
+        for i in range(3)
+    ]
+    assert all(comment_id.version == 7 for comment_id in ids)
+    assert ids == sorted(ids)
+
+
+def test_create_comment_pipelined():
+    importorskip("psycopg")
+    engine = db._create_engine(db._ENGINE.url.set(drivername="postgresql+psycopg"))
+    user_id, article_id = str(uuid4()), str(uuid4())
+    try:
+        # the fixtures' rows are uncommitted on another connection, seed this one
+        with engine.connect() as conn, conn.begin() as transaction:
+            conn.execute(
+                satext(
+                    """
+                    INSERT INTO users (id, username, email, password_hash)
+                    VALUES (:user_id, 'pipelined', 'pipelined@realworld.io', 'x')
+                    """
+                ).bindparams(user_id=user_id)
+            )
+            conn.execute(
+                satext(
+                    """
+                    INSERT INTO articles (id, author_user_id, slug, title, description, body)
+                    VALUES (:article_id, :user_id, 'pipelined', 't', 'd', 'b')
+                    """
+                ).bindparams(user_id=user_id, article_id=article_id)
+            )
+
+            does_article_exist, comment = articles_handler.create_article_comment(
+                conn, "pipelined", user_id, CreateCommentData(body="A test comment.")
+            )
+            assert does_article_exist
+            assert comment.author.username == "pipelined"
+            assert UUID(comment.id).version == 7
+
+            # a failing statement aborts those queued after it, raised as usual
+            with raises(IntegrityError), db.pipeline(conn) as p:
+                p.execute(
+                    satext(
+                        "INSERT INTO users (id, username, email, password_hash) "
+                        "VALUES (:user_id, 'other', 'other@realworld.io', 'x')"
+                    ).bindparams(user_id=user_id)
+                )
+                p.execute(satext("SELECT 1")).fetchone()
+            transaction.rollback()
+    finally:
+        engine.dispose()
+
+
 def test_delete_comment(client, add_user, add_article, add_article_comment):
     user = add_user()
     article = add_article()
@@ -249,3 +786,58 @@ def test_get_tags(client, add_article):
         "test",
         "article",
     ]
+
+
+def test_get_articles_cursor_pagination(client, add_user, add_article):
+    user = add_user()
+    articles = [add_article(author_user_id=user["id"]) for _ in range(5)]
+    expected_slugs = [article["slug"] for article in reversed(articles)]
+
+    slugs, cursor = [], None
+    for _ in range(3):
+        query = f"limit=2&cursor={cursor}" if cursor else "limit=2"
+        resp = client.get(f"/api/articles?{query}")
+        assert resp.status_code == 200
+        slugs += [article["slug"] for article in resp.json["articles"]]
+        if not (cursor := resp.json["nextCursor"]):
+            break
+
+    assert slugs == expected_slugs
+    assert cursor is None
+
+
+def test_get_articles_invalid_cursor(client):
+    resp = client.get("/api/articles?cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+
+def test_anonymous_response_cache(client, add_user, add_article):
+    user = add_user()
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    add_article(tags=["mock"])
+
+    assert len(client.get("/api/articles?limit=5&tag=mock").json["articles"]) == 1
+
+    # rows written behind the app's back are served stale to anonymous visitors only
+    add_article(tags=["mock"])
+    cached = client.get("/api/articles?tag=mock&limit=5")
+    assert len(cached.json["articles"]) == 1
+    assert cached.content_type == "application/json"
+    authenticated = client.get("/api/articles?limit=5&tag=mock", headers=headers)
+    assert len(authenticated.json["articles"]) == 2
+
+    # writes through the app invalidate the cached responses
+    client.post(
+        "/api/articles",
+        json={
+            "article": {
+                "title": "How to Article",
+                "description": "A test article.",
+                "body": "This is just a test!",
+                "tagList": ["mock", "new"],
+            }
+        },
+        headers=headers,
+    )
+    assert len(client.get("/api/articles?limit=5&tag=mock").json["articles"]) == 3
+    assert "new" in client.get("/api/tags").json["tags"]
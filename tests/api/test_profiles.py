@@ -35,6 +35,25 @@ def test_get_profile(is_following, is_authenticated, client, add_user, add_user_
     }
 
 
+def test_get_profile_etag(client, add_user, add_user_follow):
+    user1 = add_user(username="mock-user")
+    user2 = add_user(username="mock-profile-user")
+    headers = {"Authorization": f"Token {generate_jwt(user1['id'])}"}
+    url = f"/api/profiles/{user2['username']}"
+
+    resp = client.get(url, headers=headers)
+    etag = resp.headers["ETag"]
+    assert "Authorization" in resp.vary
+    resp = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert "Authorization" in resp.vary
+
+    add_user_follow(user_id=user1["id"], following_user_id=user2["id"])
+    resp = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json["profile"]["following"] is True
+
+
 def test_follow_profile(client, add_user):
     user1 = add_user(username="mock-user")
     user2 = add_user(username="mock-profile-user")
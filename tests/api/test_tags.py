@@ -1,3 +1,24 @@
 def test_get_tags(client):
     resp = client.get("/api/tags")
     assert resp.status_code == 200
+
+
+def test_get_tags_read_only(client, add_user, mock_get_db_connection):
+    client.get("/api/tags")
+    mock_get_db_connection.assert_called_once_with(True)
+
+    user = add_user()
+    client.post(
+        "/api/users/login",
+        json={"user": {"email": user["email"], "password": "invalid"}},
+    )
+    mock_get_db_connection.assert_called_with(False)
+
+
+def test_get_tags_etag(client, add_article):
+    add_article(tags=["mock"])
+
+    etag = client.get("/api/tags").headers["ETag"]
+    resp = client.get("/api/tags", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
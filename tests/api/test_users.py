@@ -1,3 +1,18 @@
+import os
+import sys
+import json
+import threading
+import subprocess
+from pathlib import Path
+from pytest import mark
+from unittest.mock import call
+import realworld.api.core.db as db
+from sqlalchemy import create_engine, text as satext
+from sqlalchemy.pool import NullPool
+from sqlalchemy.exc import OperationalError
+from realworld.api.core.auth import generate_jwt
+
+
 #
 # User Tests
 #
@@ -13,6 +28,48 @@ def test_create_user(client):
     assert resp.status_code == 200
 
 
+@mark.parametrize("test_app", ["asgi"], indirect=True)
+def test_create_user_chunked_asgi(test_app):
+    body = json.dumps(
+        {
+            "user": {
+                "username": "mock-user",
+                "email": "mock-user@realworld.io",
+                "password": "password",
+            }
+        }
+    ).encode()
+    # a chunked request, in two messages and without a Content-Length
+    received = [
+        {"type": "http.request", "body": body[:10], "more_body": True},
+        {"type": "http.request", "body": body[10:]},
+    ]
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "path": "/api/users",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"transfer-encoding", b"chunked"),
+        ],
+    }
+    test_app._run(test_app.asgi_app(scope, receive, send))
+
+    assert sent[0]["status"] == 200
+    response = json.loads(b"".join(message.get("body", b"") for message in sent[1:]))
+    assert response["user"]["username"] == "mock-user"
+
+
 def test_create_duplicate_user_returns_400(client, add_user):
     payload = {
         "user": {
@@ -96,3 +153,138 @@ def test_update_user(client, add_user):
             "image": "updated image",
         }
     }
+
+
+def test_replica_reads_after_write(
+    client, add_user, mock_get_db_connection, monkeypatch
+):
+    replica = object()
+    monkeypatch.setattr(db, "_REPLICA_ENGINES", [replica])
+    writer, reader = add_user(username="writer"), add_user(username="reader")
+    writer_headers = {"Authorization": f"Token {generate_jwt(writer['id'])}"}
+    reader_headers = {"Authorization": f"Token {generate_jwt(reader['id'])}"}
+
+    client.get("/api/user", headers=writer_headers)
+    assert mock_get_db_connection.call_args_list == [call(True, replica)]
+
+    mock_get_db_connection.reset_mock()
+    resp = client.put(
+        "/api/user",
+        headers=writer_headers,
+        json={
+            "user": {
+                "email": writer["email"],
+                "bio": "updated bio",
+                "image": writer["image"],
+            }
+        },
+    )
+    assert resp.status_code == 200
+    # the write, then reading the primary's WAL position
+    assert mock_get_db_connection.call_args_list == [call(False), call(True)]
+
+    # the "replica" (the primary here) hasn't replayed anything, the writer falls
+    # back to the primary
+    mock_get_db_connection.reset_mock()
+    resp = client.get("/api/user", headers=writer_headers)
+    assert resp.json["user"]["bio"] == "updated bio"
+    assert mock_get_db_connection.call_args_list == [call(True, replica), call(True)]
+
+    mock_get_db_connection.reset_mock()
+    client.get("/api/user", headers=reader_headers)
+    assert mock_get_db_connection.call_args_list == [call(True, replica)]
+
+
+def test_unreachable_replica_reads_primary(
+    client, add_user, mock_get_db_connection, monkeypatch
+):
+    replica = create_engine(db._ENGINE.url.set(port=1))
+    monkeypatch.setattr(db, "_REPLICA_ENGINES", [replica])
+    connect = mock_get_db_connection.side_effect
+
+    def refuse_replica(read_only=False, engine=None):
+        if engine is replica:
+            raise OperationalError("connect", {}, OSError("connection refused"))
+        return connect(read_only, engine)
+
+    mock_get_db_connection.side_effect = refuse_replica
+    user = add_user()
+
+    resp = client.get(
+        "/api/user", headers={"Authorization": f"Token {generate_jwt(user['id'])}"}
+    )
+    assert resp.status_code == 200
+    assert mock_get_db_connection.call_args_list == [call(True, replica), call(True)]
+
+
+def test_replica_invalidations_share_a_thread(mock_conn, monkeypatch):
+    monkeypatch.setattr(db, "_REPLICA_ENGINES", [object()])
+    monkeypatch.setattr(db, "DB_READ_YOUR_WRITES_WINDOW", 0.05)
+    calls, done = [], threading.Semaphore(0)
+
+    # the invalidations of many writes, each run on commit and once more later
+    for i in range(100):
+        db.call_after_replication(mock_conn, lambda i=i: calls.append(i))
+    db.call_after_replication(mock_conn, done.release)
+    threads = threading.active_count()
+    db._run_after_commit(mock_conn.info.pop(db._AFTER_COMMIT_KEY))
+
+    assert threading.active_count() <= threads + 1
+    assert done.acquire(timeout=5) and done.acquire(timeout=5)
+    assert calls == [*range(100), *range(100)]
+
+
+def test_pool_options_from_env():
+    # read as the module is imported, so in a fresh interpreter
+    env = {
+        **os.environ,
+        "DB_POOL_SIZE": "3",
+        "DB_MAX_OVERFLOW": "2",
+        "DB_POOL_TIMEOUT": "1.5",
+        "DB_POOL_RECYCLE": "60",
+        "DB_POOL_PRE_PING": "false",
+    }
+    pool = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import realworld.api.core.db as db; p = db._ENGINE.pool; "
+            "print(p.size(), p._max_overflow, p.timeout(), p._recycle, p._pre_ping)",
+        ],
+        cwd=Path(__file__).parents[2],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    assert pool == ["3", "2", "1.5", "60", "False"]
+
+
+def test_pool_stats(monkeypatch):
+    before = db.pool_stats()
+    with db._ENGINE.connect():
+        during = db.pool_stats()
+    assert during["checked_out"] == before["checked_out"] + 1
+    assert during["saturation"] == round(
+        during["checked_out"] / (db.DB_POOL_SIZE + db.DB_MAX_OVERFLOW), 3
+    )
+    assert db.pool_stats()["checked_out"] == before["checked_out"]
+
+    # pools that don't count their connections report none
+    replica = create_engine(db._ENGINE.url, poolclass=NullPool)
+    monkeypatch.setattr(db, "_REPLICA_ENGINES", [replica])
+    monkeypatch.setattr(db, "DB_REPLICA_ROUTING", db.REPLICA_ROUTING_LEAST_CONNECTIONS)
+    assert db.pool_stats()["replicas"] == [
+        {"size": 0, "checked_out": 0, "overflow": 0, "saturation": 0.0}
+    ]
+    assert db._pick_replica() is replica
+
+
+def test_ids_read_as_str(client, add_user, mock_db_execute):
+    # on psycopg2 for the WSGI app and asyncpg for the ASGI one alike
+    user = add_user()
+    row = mock_db_execute(
+        satext("SELECT id, ARRAY[id] AS ids FROM users WHERE id = :id"),
+        {"id": user["id"]},
+    ).one()
+    assert (row.id, row.ids) == (user["id"], [user["id"]])
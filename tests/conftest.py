@@ -1,10 +1,18 @@
+import asyncio
 from uuid import uuid4
 from pytest import fixture
 from unittest.mock import patch
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy.orm import Session
 from realworld.app import create_app
+from realworld.asgi import create_app as create_asgi_app
 from sqlalchemy import text as satext
 from datetime import datetime, timezone as tz
-from realworld.api.core.db import _ENGINE, _Session
+from realworld.api.core.db import _ENGINE
+from realworld.api.core.asgi import AsyncFlask
+import realworld.api.core.async_db as async_db
+from realworld.api.core.cache import clear_all_caches
+import realworld.api.core.models as core_models
 from realworld.api.routes.v1.users.handler import hash_password
 
 # from realworld.api.core.auth import generate_jwt
@@ -16,9 +24,10 @@ from realworld.api.routes.v1.users.handler import hash_password
 ####################
 
 
-@fixture(scope="session")
-def test_app():
-    app = create_app()
+@fixture(scope="session", params=["wsgi", "asgi"])
+def test_app(request):
+    # the API tests run against both serving modes
+    app = create_app() if request.param == "wsgi" else create_asgi_app()
     app.config["TESTING"] = True
     return app
 
@@ -28,6 +37,18 @@ def client(test_app):
     return test_app.test_client()
 
 
+@fixture(autouse=True)
+def clear_caches():
+    clear_all_caches()
+    yield
+
+
+@fixture(autouse=True)
+def validate_trusted_models(monkeypatch):
+    # catch drift between database rows and the models built from them without validation
+    monkeypatch.setattr(core_models, "VALIDATE_TRUSTED_MODELS", "TRUE")
+
+
 ###########################################################
 # DB Fixtures (rollback transaction after each unit test) #
 ###########################################################
@@ -40,20 +61,78 @@ def mock_conn():
     connection.close()
 
 
+@fixture(scope="session")
+def mock_async_conn_of_app(test_app):
+    # asyncpg connections belong to the event loop they were opened on, the app's
+    conn = test_app._run(async_db._get_async_engine(_ENGINE).connect().start())
+    yield conn
+    test_app._run(conn.close())
+    test_app._run(async_db.dispose_engines())
+
+
+@fixture(scope="function")
+def mock_async_conn(request):
+    """
+    For tests of the ASGI app, its asyncpg connection in a transaction rolled back
+    after the test, else None.
+    """
+    if "test_app" not in request.fixturenames or not isinstance(
+        app := request.getfixturevalue("test_app"), AsyncFlask
+    ):
+        yield None
+        return
+
+    conn = request.getfixturevalue("mock_async_conn_of_app")
+    transaction = app._run(conn.begin().start())
+    yield conn
+    app._run(transaction.rollback())
+
+
 @fixture(scope="function")
 def mock_db_session(mock_conn):
     transaction = mock_conn.begin()
-    session = _Session(bind=mock_conn)
+    session = Session(bind=mock_conn)
     yield session
     session.close()
     transaction.rollback()
 
 
+@fixture(scope="function")
+def mock_db_execute(request, mock_db_session, mock_async_conn):
+    """Execute a statement on the connection (and in the transaction) the app reads."""
+    if mock_async_conn is None:
+        return mock_db_session.execute
+
+    app = request.getfixturevalue("test_app")
+    return lambda statement, parameters=None: app._run(
+        mock_async_conn.execute(statement, parameters)
+    )
+
+
 @fixture(autouse=True)
-def mock_get_db_connection(mock_db_session):
-    with patch("realworld.api.core.db._create_db_connection") as mock_db_conn:
-        mock_db_conn.return_value = mock_db_session, mock_db_session.connection()
-        yield mock_db_conn
+def mock_get_db_connection(mock_db_session, mock_conn, mock_async_conn):
+    @contextmanager
+    def connect(read_only=False, engine=None):
+        # a savepoint of the test's transaction, so it's rolled back with the test,
+        # replicas included
+        with mock_conn.begin_nested():
+            yield mock_conn
+
+    # the test's one connection serves the queries of a request one at a time, even
+    # those an async view runs concurrently
+    async_conn_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def async_connect(*args):
+        # recorded as calls of `mock_connect`, like those of the sync views
+        mock_connect(*args)
+        async with async_conn_lock, mock_async_conn.begin_nested():
+            yield mock_async_conn
+
+    with patch(
+        "realworld.api.core.db._connect", side_effect=connect
+    ) as mock_connect, patch("realworld.api.core.async_db._connect", new=async_connect):
+        yield mock_connect
 
 
 ####################
@@ -61,8 +140,17 @@ def mock_get_db_connection(mock_db_session):
 ####################
 
 
+def _with_isoformat_dates(row: dict) -> dict:
+    # inserted as datetimes (asyncpg takes no strings for timestamps), returned as
+    # the API renders them
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+
+
 @fixture(scope="function")
-def add_user(mock_db_session):
+def add_user(mock_db_execute):
     def _add_user(
         _id=None,
         username=None,
@@ -73,7 +161,7 @@ def add_user(mock_db_session):
         ts=None,
     ):
         _id = _id or str(uuid4())
-        ts = ts or datetime.now(tz.utc).isoformat()
+        ts = ts or datetime.now(tz.utc)
         username = username or f"mock-user-{_id}"
         password = password or "password"
         user = {
@@ -92,12 +180,12 @@ def add_user(mock_db_session):
             VALUES (:id, :username, :email, :password_hash, :image, :bio, :created_date, :updated_date)
             """
         ).bindparams(**user)
-        mock_db_session.execute(stmt)
+        mock_db_execute(stmt)
 
         # Reset user dict before returning
         user.pop("password_hash")
         user["password"] = password
-        return user
+        return _with_isoformat_dates(user)
 
     return _add_user
 
@@ -113,7 +201,7 @@ def add_user(mock_db_session):
 
 
 @fixture(scope="function")
-def add_user_follow(mock_db_session):
+def add_user_follow(mock_db_execute):
     def _add_user_follow(user_id, following_user_id):
         stmt = satext(
             """
@@ -121,14 +209,26 @@ def add_user_follow(mock_db_session):
             VALUES (:user_id, :following_user_id)
             """
         ).bindparams(user_id=user_id, following_user_id=following_user_id)
-        mock_db_session.execute(stmt)
+        mock_db_execute(stmt)
+
+        # backfill the follower's feed
+        mock_db_execute(
+            satext(
+                """
+                INSERT INTO feed_items (user_id, article_id, created_date)
+                SELECT :user_id, id, created_date
+                FROM articles
+                WHERE author_user_id = :following_user_id
+                """
+            ).bindparams(user_id=user_id, following_user_id=following_user_id)
+        )
         return True
 
     return _add_user_follow
 
 
 @fixture(scope="function")
-def add_article(mock_db_session, add_user):
+def add_article(mock_db_execute, add_user):
     def _add_article(
         _id=None,
         author_user_id=None,
@@ -140,7 +240,7 @@ def add_article(mock_db_session, add_user):
         ts=None,
     ):
         _id = _id or str(uuid4())
-        ts = ts or datetime.now(tz.utc).isoformat()
+        ts = ts or datetime.now(tz.utc)
         article = {
             "id": _id,
             "author_user_id": author_user_id or add_user()["id"],
@@ -153,7 +253,7 @@ def add_article(mock_db_session, add_user):
             "updated_date": ts,
         }
 
-        mock_db_session.execute(
+        mock_db_execute(
             satext(
                 """
                 INSERT INTO articles (id, author_user_id, slug, title, description, body, created_date, updated_date)
@@ -163,8 +263,21 @@ def add_article(mock_db_session, add_user):
             article,
         )
 
+        # fan out to the author's followers' feeds
+        mock_db_execute(
+            satext(
+                """
+                INSERT INTO feed_items (user_id, article_id, created_date)
+                SELECT user_id, :id, :created_date
+                FROM user_follows
+                WHERE following_user_id = :author_user_id
+                """
+            ),
+            article,
+        )
+
         if article["tags"]:
-            mock_db_session.execute(
+            mock_db_execute(
                 satext(
                     """
                     WITH upserted_tags AS (
@@ -181,13 +294,13 @@ def add_article(mock_db_session, add_user):
                 [{"name": tag, "article_id": article["id"]} for tag in article["tags"]],
             )
 
-        return article
+        return _with_isoformat_dates(article)
 
     return _add_article
 
 
 @fixture(scope="function")
-def add_article_favorite(mock_db_session):
+def add_article_favorite(mock_db_execute):
     def _add_article_favorite(user_id=None, article_id=None):
         article_favorite = {
             "user_id": user_id or str(uuid4()),
@@ -196,11 +309,17 @@ def add_article_favorite(mock_db_session):
 
         stmt = satext(
             """
-            INSERT INTO article_favorites (user_id, article_id)
-            VALUES (:user_id, :article_id)
+            WITH inserted AS (
+                INSERT INTO article_favorites (user_id, article_id)
+                VALUES (:user_id, :article_id)
+                RETURNING article_id
+            )
+            UPDATE articles
+            SET favorites_count = favorites_count + 1
+            WHERE id IN (SELECT article_id FROM inserted)
             """
         )
-        mock_db_session.execute(stmt, article_favorite)
+        mock_db_execute(stmt, article_favorite)
 
         return article_favorite
 
@@ -208,12 +327,12 @@ def add_article_favorite(mock_db_session):
 
 
 @fixture(scope="function")
-def add_article_comment(mock_db_session, add_user, add_article):
+def add_article_comment(mock_db_execute, add_user, add_article):
     def _add_article_comment(
         _id=None, article_id=None, commenter_user_id=None, body=None, ts=None
     ):
         _id = _id or str(uuid4())
-        ts = ts or datetime.now(tz.utc).isoformat()
+        ts = ts or datetime.now(tz.utc)
         article_id = article_id or add_article()["id"]
         article_comment = {
             "id": _id,
@@ -230,9 +349,9 @@ def add_article_comment(mock_db_session, add_user, add_article):
             VALUES (:id, :article_id, :commenter_user_id, :body, :created_date, :updated_date)
             """
         )
-        mock_db_session.execute(stmt, article_comment)
+        mock_db_execute(stmt, article_comment)
 
-        return article_comment
+        return _with_isoformat_dates(article_comment)
 
     return _add_article_comment
 